@@ -0,0 +1,105 @@
+# agents/agent_pool.py
+import threading
+import time
+from typing import Optional
+
+from agents.catalog import load_agent_class
+
+
+class AgentPool:
+    """
+    Guarda uma instância de cada agente por processo, construída na primeira
+    vez que é pedida a partir da config e do model_mapping compartilhados e
+    reaproveitada por todos os eventos seguintes. Os agentes não guardam
+    estado entre chamadas, então a mesma instância serve etapas em paralelo.
+
+    Quando a config mudar, chame `invalidate()` (ou `reconfigure`) para que
+    os próximos `get` construam agentes novos.
+    """
+
+    _shared: Optional["AgentPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, config: dict, model_mapping: Optional[dict] = None):
+        self.config = config
+        self.model_mapping = (
+            model_mapping
+            if model_mapping is not None
+            else config.get("model_mapping", {})
+        )
+        self._agents: dict = {}
+        self._locks: dict = {}
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._hits = 0
+        self._build_seconds = 0.0
+
+    @classmethod
+    def shared(cls, config: dict, model_mapping: Optional[dict] = None) -> "AgentPool":
+        """
+        Pool do processo. Se a config (ou o mapping) recebida for diferente
+        da atual, o pool é reconfigurado e os agentes antigos descartados.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(config, model_mapping)
+            else:
+                cls._shared.reconfigure(config, model_mapping)
+            return cls._shared
+
+    def get(self, name: str):
+        """Retorna a instância do agente `name`, construindo-a se necessário."""
+        agent = self._agents.get(name)
+        if agent is not None:
+            with self._lock:
+                self._hits += 1
+            return agent
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        # um lock por agente: construções de agentes diferentes não se bloqueiam
+        with lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                start = time.perf_counter()
+                agent = load_agent_class(name)(self.config, self.model_mapping)
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._agents[name] = agent
+                    self._builds += 1
+                    self._build_seconds += elapsed
+            else:
+                with self._lock:
+                    self._hits += 1
+        return agent
+
+    def factory(self, name: str):
+        """Fábrica sem argumentos no formato esperado pelo `AgentRouter`."""
+        return lambda: self.get(name)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Descarta um agente (ou todos): o próximo `get` o reconstrói."""
+        with self._lock:
+            if name is None:
+                self._agents.clear()
+            else:
+                self._agents.pop(name, None)
+
+    def reconfigure(self, config: dict, model_mapping: Optional[dict] = None):
+        """Troca a config; se ela mudou de fato, invalida todos os agentes."""
+        if model_mapping is None:
+            model_mapping = config.get("model_mapping", {})
+        if config == self.config and model_mapping == self.model_mapping:
+            return
+        with self._lock:
+            self.config = config
+            self.model_mapping = model_mapping
+        self.invalidate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "agents": len(self._agents),
+                "builds": self._builds,
+                "hits": self._hits,
+                "build_seconds": self._build_seconds,
+            }
@@ -1,35 +1,382 @@
 # agents/agent_router.py
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
 from rich.console import Console
 from rich.rule import Rule
 
+from utils.rate_limiter import TokenBudget
+from utils.tracing import propagate, span
+
 console = Console()
 
+CONTINUE = "continue"
+FAIL_FAST = "fail_fast"
+
+
+def _normalize(name: str) -> str:
+    """'Go-to-Market_Copilot', 'go_to_market_copilot' -> 'gotomarketcopilot'."""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def build_dag(steps: list, rules: dict) -> dict:
+    """
+    Monta etapa -> conjunto de etapas das quais ela depende, a partir da
+    seção `dependencies` do rules.yaml. Chaves e dependências podem ser
+    nomes de etapa (analyze_risks) ou de agente (Go-to-Market_Copilot,
+    via `step_agents`); "A/B" vale como A ou B. Dependências que não fazem
+    parte do workflow são ignoradas. Levanta ValueError se houver ciclo.
+    """
+    step_agents = rules.get("step_agents") or {}
+    aliases: dict = {}
+    for step in steps:
+        aliases.setdefault(_normalize(step), set()).add(step)
+        if step in step_agents:
+            aliases.setdefault(_normalize(step_agents[step]), set()).add(step)
+
+    def resolve(name: str) -> set:
+        found = set()
+        for part in str(name).split("/"):
+            found |= aliases.get(_normalize(part), set())
+        return found
+
+    dag: dict = {step: set() for step in steps}
+    for key, deps in (rules.get("dependencies") or {}).items():
+        for step in resolve(key):
+            for dep in deps or []:
+                dag[step] |= resolve(dep) - {step}
+
+    # Kahn: se sobrar etapa sem ordem topológica, há ciclo
+    pending = {step: set(deps) for step, deps in dag.items()}
+    while pending:
+        ready = [step for step, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Ciclo nas dependências entre: {sorted(pending)}")
+        for step in ready:
+            del pending[step]
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return dag
+
 
 class AgentRouter:
     """
     Recebe eventos e despacha para os agentes especialistas
     corretos com base em fluxos de trabalho definidos em um arquivo de regras.
+
+    `agents` mapeia cada etapa do workflow para uma fábrica de agente
+    (classe ou callable sem argumentos; ver `agents.catalog`). As etapas
+    formam um DAG (`dependencies` do rules.yaml): etapas independentes
+    rodam em paralelo, até `workflow.max_workers` ao mesmo tempo; com
+    `workflow.fusion`, as que ficam prontas juntas e usam o mesmo modelo
+    podem ir numa única requisição ao LLM.
+
+    `token_budget` (ex.: `token_budget.per_run` da config) é o limite de
+    tokens de cada evento: todas as etapas de um `route_event` gastam do
+    mesmo `TokenBudget`. None = sem limite.
     """
 
-    def __init__(self, agents: dict, rules: dict, dry_run: bool = False):
+    def __init__(
+        self,
+        agents: dict,
+        rules: dict,
+        dry_run: bool = False,
+        store=None,
+        force: bool = False,
+        token_budget: Optional[int] = None,
+    ):
         self.agents = agents
+        self.token_budget = token_budget
+        # `store` (ex.: src.step_store.StepStore) guarda a saída de cada etapa
+        # pela impressão digital das entradas; `force` ignora o que já existe
+        self.store = store
+        self.force = force
+        self.rules = rules
         self.workflows = rules.get("event_workflows", {})
         self.dry_run = dry_run
+        settings = rules.get("workflow") or {}
+        self.max_workers = max(1, int(settings.get("max_workers", 4)))
+        self.default_policy = settings.get("on_error", CONTINUE)
+        self.step_policies = rules.get("step_policies") or {}
+        fusion = settings.get("fusion") or {}
+        self.fusion_enabled = bool(fusion.get("enabled", False))
+        self.fusion_max_agents = max(1, int(fusion.get("max_agents", 3)))
 
-    def route_event(self, event_type: str, data: dict):
+    def policy(self, step: str) -> str:
+        """`continue` (padrão) ou `fail_fast` para a etapa."""
+        return (self.step_policies.get(step) or {}).get("on_error", self.default_policy)
+
+    def route_event(self, event_type: str, data: dict) -> dict:
         """
-        Roteia um evento pelo workflow configurado.
+        Roteia um evento pelo workflow configurado. Retorna, por etapa (na
+        ordem do workflow), {"output", "error", "seconds", "cached"}. Cada
+        etapa recebe em `data["upstream"]` as saídas das etapas das quais
+        depende. Com `store`, uma etapa cujas entradas não mudaram reaproveita
+        a saída guardada; só o cone a jusante de uma mudança é recalculado.
+        Uma etapa com erro e política `continue` não impede as seguintes;
+        com `fail_fast`, as etapas ainda não iniciadas são canceladas.
         """
         console.print(Rule(f" Evento: {event_type} "))
-        if event_type in self.workflows:
-            for step in self.workflows[event_type]:
-                agent_cls = self.agents.get(step)
-                if not agent_cls:
-                    console.print(f"[red]Agente '{step}' não encontrado[/red]")
-                    continue
-                agent = agent_cls()
-                agent.execute(data, dry_run=self.dry_run)
-        else:
+        results: dict = {}
+        if event_type not in self.workflows:
             console.print(
                 f"[yellow]Nenhum workflow para evento '{event_type}'[/yellow]"
             )
+            return results
+
+        with span(
+            "workflow.event",
+            event_type=event_type,
+            project=data.get("slug") or data.get("name"),
+        ) as current:
+            steps = list(dict.fromkeys(self.workflows[event_type]))
+            dag = build_dag(steps, self.rules)
+            remaining = {step: set(deps) for step, deps in dag.items()}
+            aborted = None
+            budget = TokenBudget(self.token_budget)
+
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="workflow"
+            ) as pool:
+                running: dict = {}
+
+                def submit_ready():
+                    # só entrega ao pool o que cabe nos workers: assim uma etapa
+                    # ainda não iniciada pode ser cancelada por um fail_fast
+                    ready = [s for s in steps if s in remaining and not remaining[s]]
+                    for group in self._fusion_groups(ready):
+                        if len(running) >= self.max_workers:
+                            return
+                        # ordem do workflow: o prompt (e a chave do cache)
+                        # fica estável
+                        upstreams = {}
+                        for step in group:
+                            del remaining[step]
+                            upstreams[step] = {
+                                dep: results[dep]["output"]
+                                for dep in steps
+                                if dep in dag[step]
+                            }
+                        future = pool.submit(
+                            propagate(self._run_group), group, data, upstreams, budget
+                        )
+                        running[future] = group
+
+                submit_ready()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        for step, result in future.result().items():
+                            results[step] = result
+                            for deps in remaining.values():
+                                deps.discard(step)
+                            if result["error"] and self.policy(step) == FAIL_FAST:
+                                aborted = aborted or step
+                    if aborted:
+                        remaining.clear()
+                    else:
+                        submit_ready()
+
+            for step in steps:
+                results.setdefault(step, self._skipped(step, aborted))
+            current.set(
+                steps=len(steps),
+                errors=sum(1 for r in results.values() if r["error"]),
+                cached=sum(1 for r in results.values() if r.get("cached")),
+                tokens=budget.used,
+            )
+        return {step: results[step] for step in steps}
+
+    @staticmethod
+    def _skipped(step: str, aborted: Optional[str]) -> dict:
+        return {
+            "output": None,
+            "error": f"etapa cancelada (fail_fast em '{aborted}')",
+            "seconds": 0.0,
+            "cached": False,
+        }
+
+    def _fusion_groups(self, ready: list) -> list:
+        """
+        Agrupa as etapas prontas ao mesmo tempo: com `workflow.fusion`, as
+        de agentes `fusable` com o mesmo modelo vão juntas (até
+        `max_agents`), numa única requisição; as demais vão sozinhas.
+        """
+        if not self.fusion_enabled or self.dry_run or len(ready) < 2:
+            return [[step] for step in ready]
+        groups: dict = {}
+        for step in ready:
+            factory = self.agents.get(step)
+            try:
+                agent = factory() if factory else None
+            except Exception:
+                agent = None
+            if agent is not None and getattr(agent, "fusable", False):
+                key = ("model", agent.model)
+            else:
+                key = ("step", step)
+            groups.setdefault(key, []).append(step)
+        return [
+            members[i : i + self.fusion_max_agents]
+            for members in groups.values()
+            for i in range(0, len(members), self.fusion_max_agents)
+        ]
+
+    def _run_group(
+        self, group: list, data: dict, upstreams: dict, budget: TokenBudget
+    ) -> dict:
+        if len(group) == 1:
+            step = group[0]
+            return {step: self._run_step(step, data, upstreams[step], budget)}
+        return self._run_fused(group, data, upstreams, budget)
+
+    def _run_step(
+        self, step: str, data: dict, upstream: dict, budget: TokenBudget
+    ) -> dict:
+        with span("workflow.step", step=step) as current:
+            result = self._execute_step(step, data, upstream, budget)
+            current.set(cached=result["cached"], error=result["error"])
+            return result
+
+    def _run_fused(
+        self, group: list, data: dict, upstreams: dict, budget: TokenBudget
+    ) -> dict:
+        """
+        Etapas de um grupo de fusão: as com saída guardada são reaproveitadas
+        e as demais vão numa só requisição (`BaseAgent.execute_fused`). Uma
+        etapa cuja parte não veio válida na resposta roda em separado.
+        """
+        with span("workflow.fused", steps=",".join(group)) as current:
+            start = time.perf_counter()
+            results: dict = {}
+            calls: dict = {}
+            fingerprints: dict = {}
+            for step in group:
+                step_data = (
+                    {**data, "upstream": upstreams[step]} if upstreams[step] else data
+                )
+                try:
+                    agent = self.agents[step]()
+                    fingerprint, output = self._lookup(step, agent, step_data)
+                except Exception as e:
+                    results[step] = self._failed(step, e, start)
+                    continue
+                if output is not None:
+                    results[step] = self._result(output, start, cached=True)
+                else:
+                    calls[step] = (agent, step_data)
+                    fingerprints[step] = fingerprint
+
+            outputs: dict = {}
+            names = {agent.name for agent, _ in calls.values()}
+            if len(calls) > 1 and len(names) == len(calls):
+                try:
+                    lead = next(iter(calls.values()))[0]
+                    outputs = lead.execute_fused(calls, budget=budget)
+                except Exception as e:
+                    console.print(
+                        f"[yellow]Requisição fundida falhou ({e}); "
+                        "rodando as etapas em separado[/yellow]"
+                    )
+            for step, (agent, step_data) in calls.items():
+                if step in outputs:
+                    self._save(
+                        step, agent, step_data, fingerprints[step], outputs[step]
+                    )
+                    results[step] = self._result(outputs[step], start)
+                    continue
+                try:
+                    results[step] = self._call(
+                        step, agent, step_data, fingerprints[step], start, budget
+                    )
+                except Exception as e:
+                    results[step] = self._failed(step, e, start)
+            current.set(fused=len(outputs), separate=len(calls) - len(outputs))
+            return {step: results[step] for step in group}
+
+    def _execute_step(
+        self, step: str, data: dict, upstream: dict, budget: TokenBudget
+    ) -> dict:
+        factory = self.agents.get(step)
+        if not factory:
+            console.print(f"[red]Agente '{step}' não encontrado[/red]")
+            return {
+                "output": None,
+                "error": "agente não encontrado",
+                "seconds": 0.0,
+                "cached": False,
+            }
+        if upstream:
+            data = {**data, "upstream": upstream}
+        start = time.perf_counter()
+        try:
+            agent = factory()
+            fingerprint, output = self._lookup(step, agent, data)
+            if output is not None:
+                return self._result(output, start, cached=True)
+            return self._call(step, agent, data, fingerprint, start, budget)
+        except Exception as e:
+            return self._failed(step, e, start)
+
+    def _lookup(self, step: str, agent, data: dict) -> tuple:
+        """
+        (impressão digital, saída guardada ou None); (None, None) quando a
+        etapa não reaproveita saídas (sem `store`, dry-run ou efeito colateral).
+        """
+        if (
+            self.store is None
+            or self.dry_run
+            or not getattr(agent, "reusable_output", False)
+        ):
+            return None, None
+        fingerprint = agent.fingerprint(data)
+        output = None if self.force else self.store.get(fingerprint)
+        if output is not None:
+            console.print(f"[dim]♻️  {step}: entradas inalteradas[/dim]")
+        return fingerprint, output
+
+    def _call(
+        self,
+        step: str,
+        agent,
+        data: dict,
+        fingerprint,
+        start: float,
+        budget: TokenBudget,
+    ) -> dict:
+        output = agent.execute(data, dry_run=self.dry_run, budget=budget)
+        self._save(step, agent, data, fingerprint, output)
+        return self._result(output, start)
+
+    def _save(self, step: str, agent, data: dict, fingerprint, output):
+        if fingerprint and isinstance(output, str) and output:
+            self.store.put(
+                fingerprint,
+                data.get("slug") or data.get("name"),
+                step,
+                output,
+                agent=agent.name,
+                model=agent.model,
+            )
+
+    @staticmethod
+    def _result(output, start: float, cached: bool = False) -> dict:
+        return {
+            "output": output,
+            "error": None,
+            "seconds": time.perf_counter() - start,
+            "cached": cached,
+        }
+
+    @staticmethod
+    def _failed(step: str, error: Exception, start: float) -> dict:
+        console.print(f"[red]Erro na etapa '{step}': {error}[/red]")
+        return {
+            "output": None,
+            "error": str(error),
+            "seconds": time.perf_counter() - start,
+            "cached": False,
+        }
@@ -1,34 +1,297 @@
-from abc import ABC, abstractmethod
+import hashlib
+import json
+from abc import ABC
+from typing import Optional
+
+from rich.console import Console
+from rich.live import Live
+from rich.text import Text
 
 from utils.llm_router import LLMRouter
+from utils.prompt_fusion import build_fused_prompt, split_fused_response
+from utils.prompt_registry import PromptRegistry, prompt_budget
+from utils.rate_limiter import CHARS_PER_TOKEN, TokenBudget, estimate_tokens
+from utils.tracing import span
+
+console = Console()
+
+# Limite de caracteres de cada saída de etapa anterior anexada ao prompt;
+# com o orçamento de `prompts.max_tokens` apertado, cai até UPSTREAM_MIN_CHARS
+UPSTREAM_CHARS = 2000
+UPSTREAM_MIN_CHARS = 300
 
 
 class BaseAgent(ABC):
+    # Aumente ao mudar o texto do prompt: invalida as saídas guardadas.
+    # Agentes com template em config/prompts usam a `version` do template.
+    prompt_version = "1"
+    # False para agentes com efeito colateral (ex.: sincronizar o Notion),
+    # que nunca podem ser pulados pelo reaproveitamento de saídas.
+    reusable_output = True
+    # False para agentes que não podem dividir uma requisição fundida com
+    # outros (ver `execute_fused`): os de efeito colateral, por exemplo.
+    fusable = True
+
     def __init__(self, name: str, config: dict, model_mapping: dict):
         self.name = name
         self.config = config
         self.model = model_mapping.get(name)
-        self.router = LLMRouter(config)
+        self.router = LLMRouter(config, model_mapping)
+        self.max_prompt_tokens = prompt_budget(config, self.model)
+        self.prompt_template = PromptRegistry.shared(config).get(name)
+        if self.prompt_template is not None:
+            self.prompt_version = self.prompt_template.version
 
-    @abstractmethod
     def build_prompt(self, project_data: dict) -> str:
-        """Deve retornar o prompt a ser enviado ao LLM."""
-        ...
+        """
+        Prompt a ser enviado ao LLM: por padrão, o template
+        config/prompts/<nome>.yaml; agentes sem template sobrescrevem.
+        """
+        if self.prompt_template is None:
+            raise NotImplementedError(
+                f"Agente '{self.name}' sem build_prompt nem template em config/prompts"
+            )
+        return self.prompt_template.render(
+            project_data, max_tokens=self.max_prompt_tokens
+        )
 
-    def run(self, project_data: dict, dry_run: bool = False):
+    def compose_prompt(self, project_data: dict) -> str:
+        """
+        `build_prompt` mais o contexto das etapas anteriores do workflow
+        (`project_data["upstream"]`, preenchido pelo `AgentRouter`).
+        """
         prompt = self.build_prompt(project_data)
-        if dry_run:
-            print(f"[DryRun] Etapa → {self.name}  (agente: {self.name})")
+        upstream = {
+            step: output
+            for step, output in (project_data.get("upstream") or {}).items()
+            if output
+        }
+        if not upstream:
+            return prompt
+        limit = UPSTREAM_CHARS
+        if self.max_prompt_tokens:
+            # o que sobra do orçamento, dividido entre as etapas anteriores
+            room = self.max_prompt_tokens * CHARS_PER_TOKEN - len(prompt)
+            limit = max(UPSTREAM_MIN_CHARS, min(limit, room // len(upstream)))
+        sections = "\n\n".join(
+            f"### {step}\n{str(output)[:limit]}" for step, output in upstream.items()
+        )
+        return f"{prompt}\n\nContexto das etapas anteriores:\n\n{sections}\n"
+
+    def fingerprint(self, project_data: dict) -> str:
+        """
+        Impressão digital das entradas da etapa: o prompt montado a partir
+        dos campos do projeto, as saídas das etapas anteriores, o modelo e
+        `prompt_version`. Mesma impressão digital => mesma saída.
+        """
+        base = {k: v for k, v in project_data.items() if k != "upstream"}
+        upstream = {
+            step: hashlib.sha256(str(output).encode("utf-8")).hexdigest()
+            for step, output in sorted((project_data.get("upstream") or {}).items())
+        }
+        payload = json.dumps(
+            {
+                "agent": self.name,
+                "model": self.model,
+                "prompt_version": self.prompt_version,
+                "prompt": self.build_prompt(base),
+                "upstream": upstream,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def run(
+        self,
+        project_data: dict,
+        dry_run: bool = False,
+        use_cache: bool = True,
+        stream: bool = False,
+        budget: Optional[TokenBudget] = None,
+    ):
+        """
+        Envia o prompt ao LLM, exibe e retorna a resposta (None em caso de
+        erro). Com `stream=True`, os tokens são exibidos no terminal à
+        medida que chegam. `budget` é o orçamento de tokens da execução
+        (ex.: um workflow inteiro); sem ele, vale `token_budget.per_run`.
+        """
+        try:
+            response = self.execute(
+                project_data,
+                dry_run=dry_run,
+                use_cache=use_cache,
+                stream=stream,
+                budget=budget,
+            )
+        except Exception as e:
+            print(f"❌ Erro em '{self.name}': {e}")
+            return None
+        if response and not stream:
+            print(response)
+        return response
+
+    def execute(
+        self,
+        project_data: dict,
+        dry_run: bool = False,
+        *,
+        use_cache: bool = True,
+        stream: bool = False,
+        budget: Optional[TokenBudget] = None,
+    ):
+        """
+        Núcleo de `run`, usado pelo `AgentRouter`: retorna a resposta e
+        deixa as exceções subirem para quem orquestra decidir o que fazer.
+        """
+        with span("agent.execute", agent=self.name, model=self.model) as current:
+            with span("agent.build_prompt", agent=self.name) as prompt_span:
+                prompt = self.compose_prompt(project_data)
+                prompt_span.set(prompt_chars=len(prompt))
+            if dry_run:
+                print(f"[DryRun] Etapa → {self.name}  (agente: {self.name})")
+                print(
+                    f"[DryRun] {self.name} → chamaria modelo '{self.model}' com prompt:\n\n{prompt}\n"
+                )
+                current.set(dry_run=True)
+                return None
+
+            print(f"🤖  Enviando prompt ao modelo '{self.model}'...")
+            budget = budget or TokenBudget.from_config(self.config)
+            reserved = self._reserve_tokens(budget, prompt, use_cache=use_cache)
+            try:
+                if stream:
+                    response = self.render_stream(
+                        self.router.stream(
+                            self.model,
+                            prompt,
+                            agent_name=self.name,
+                            use_cache=use_cache,
+                        )
+                    )
+                else:
+                    response = self.router.generate(
+                        self.model, prompt, agent_name=self.name, use_cache=use_cache
+                    )
+            except Exception:
+                budget.release(reserved)
+                raise
+            self._settle_tokens(budget, reserved, prompt, response)
+            current.set(response_chars=len(response or ""))
+            return response
+
+    @staticmethod
+    def execute_fused(calls: dict, budget: Optional[TokenBudget] = None) -> dict:
+        """
+        Roda vários agentes (mesmo modelo) numa única requisição ao LLM:
+        `calls` é {chave: (agente, project_data)}. Retorna {chave: resposta}
+        só com as partes que vieram válidas na resposta JSON; as que
+        faltarem devem ser refeitas em separado por quem chamou.
+        """
+        keyed = {agent.name: key for key, (agent, _) in calls.items()}
+        lead = next(iter(calls.values()))[0]
+        with span(
+            "agent.execute_fused", agents=",".join(keyed), model=lead.model
+        ) as current:
+            prompt = build_fused_prompt(
+                {
+                    agent.name: agent.compose_prompt(data)
+                    for agent, data in calls.values()
+                }
+            )
             print(
-                f"[DryRun] {self.name} → chamaria modelo '{self.model}' com prompt:\n\n{prompt}\n"
+                f"🤖  Enviando prompt fundido ({', '.join(keyed)}) ao modelo '{lead.model}'..."
+            )
+            budget = budget or TokenBudget.from_config(lead.config)
+            reserved = lead._reserve_tokens(budget, prompt, use_cache=True)
+            try:
+                response = lead.router.generate(
+                    lead.model, prompt, agent_name="+".join(keyed)
+                )
+            except Exception:
+                budget.release(reserved)
+                raise
+            lead._settle_tokens(budget, reserved, prompt, response)
+            parts = split_fused_response(response, list(keyed))
+            current.set(
+                prompt_chars=len(prompt), parsed=len(parts), expected=len(keyed)
             )
-            return
+            return {keyed[name]: text for name, text in parts.items()}
 
-        print(f"🤖  Enviando prompt ao modelo '{self.model}'...")
+    def _reserve_tokens(
+        self,
+        budget: TokenBudget,
+        prompt: str,
+        use_cache: bool = False,
+        asynchronous: bool = False,
+    ) -> int:
+        """
+        Reserva prompt + saída esperada; levanta TokenBudgetExceeded se não
+        couber. Resposta que virá do cache não gasta tokens: reserva 0.
+        """
+        if (
+            use_cache
+            and budget.limit is not None
+            and self.router.is_cached(self.model, prompt, asynchronous=asynchronous)
+        ):
+            return 0
+        tokens = estimate_tokens(prompt) + self.router.limiter.expected_output_tokens
+        budget.reserve(tokens)
+        return tokens
+
+    @staticmethod
+    def _settle_tokens(budget: TokenBudget, reserved: int, prompt: str, response):
+        """Acerta a reserva com o tamanho real (chamadas do cache não contam)."""
+        if reserved:
+            budget.settle(reserved, estimate_tokens(prompt) + estimate_tokens(response))
+
+    def run_many(self, projects_data: list, use_cache: bool = True) -> list:
+        """
+        Roda o agente sobre vários projetos numa única chamada em lote
+        (`LLMRouter.generate_many`). Retorna um resultado por projeto, na
+        mesma ordem, com "text" ou "error".
+        """
+        prompts = [self.compose_prompt(data) for data in projects_data]
+        return self.router.generate_many(
+            self.model, prompts, agent_name=self.name, use_cache=use_cache
+        )
+
+    @staticmethod
+    def render_stream(chunks) -> str:
+        """Exibe os pedaços com Rich Live conforme chegam e retorna o texto."""
+        text = Text()
+        # `Text` é mutável: o Live redesenha sozinho até 12x/s
+        with Live(text, console=console, refresh_per_second=12):
+            for chunk in chunks:
+                text.append(chunk)
+        return text.plain
+
+    async def arun(
+        self,
+        project_data: dict,
+        use_cache: bool = True,
+        budget: Optional[TokenBudget] = None,
+    ):
+        """
+        Versão assíncrona de `run`, para disparar vários agentes em paralelo
+        (ex.: `asyncio.gather(*(a.arun(data) for a in agents))`).
+        """
+        prompt = self.compose_prompt(project_data)
+        budget = budget or TokenBudget.from_config(self.config)
         try:
-            response = self.router.generate(
-                prompt, model=self.model, agent_name=self.name
+            reserved = self._reserve_tokens(
+                budget, prompt, use_cache=use_cache, asynchronous=True
             )
-            print(response)
+            try:
+                response = await self.router.agenerate(
+                    self.model, prompt, agent_name=self.name, use_cache=use_cache
+                )
+            except Exception:
+                budget.release(reserved)
+                raise
+            self._settle_tokens(budget, reserved, prompt, response)
         except Exception as e:
             print(f"❌ Erro em '{self.name}': {e}")
+            return None
+        print(response)
+        return response
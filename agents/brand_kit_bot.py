@@ -32,13 +32,14 @@ class BrandKitBot(BaseAgent):
             "}\n"
         )
 
-    def run(self, project_data: dict) -> dict:
+    def run(self, project_data: dict, stream: bool = False) -> dict:
         prompt = self.build_prompt(project_data)
-        text = (
-            self._call_openai(prompt)
-            if self.model.startswith("gpt")
-            else self._call_gemini(prompt)
-        )
+        if stream:
+            text = self.render_stream(
+                self.router.stream(self.model, prompt, agent_name=self.name)
+            )
+        else:
+            text = self.router.generate(self.model, prompt, agent_name=self.name)
 
         try:
             data = json.loads(text)
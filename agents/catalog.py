@@ -0,0 +1,55 @@
+# agents/catalog.py
+import importlib
+
+# Nome do agente (o mesmo do model_mapping) -> "módulo:Classe".
+# Os módulos só são importados quando o agente é de fato usado.
+AGENT_CLASSES = {
+    "accounting_helper": "agents.accounting_helper:AccountingHelper",
+    "brand_kit_bot": "agents.brand_kit_bot:BrandKitBot",
+    "capacity_forecaster": "agents.capacity_forecaster:CapacityForecaster",
+    "capacity_leveler": "agents.capacity_leveler:CapacityLeveler",
+    "comm_plan_builder": "agents.comm_plan_builder:CommPlanBuilder",
+    "compliance_guardian": "agents.compliance_guardian:ComplianceGuardian",
+    "contract_fabric": "agents.contract_fabric:ContractFabric",
+    "decision_supporter": "agents.decision_supporter:DecisionSupporter",
+    "doc_checklist_builder": "agents.doc_checklist_builder:DocChecklistBuilder",
+    "executive_narrator": "agents.executive_narrator:ExecutiveNarrator",
+    "feature_viability_scout": "agents.feature_viability_scout:FeatureViabilityScout",
+    "fin_modeler": "agents.fin_modeler:FinModeler",
+    "go_to_market_copilot": "agents.go_to_market_copilot:GoToMarketCopilot",
+    "it_bootstrapper": "agents.it_bootstrapper:ITBootstrapper",
+    "market_intel_bot": "agents.market_intel_bot:MarketIntelBot",
+    "notion_writer": "agents.notion_writer:NotionWriter",
+    "org_designer": "agents.org_designer:OrgDesigner",
+    "process_mapper": "agents.process_mapper:ProcessMapper",
+    "risk_sentinel": "agents.risk_sentinel:RiskSentinel",
+    "schedule_copilot": "agents.schedule_copilot:ScheduleCopilot",
+    "sensitivity_scenario_engine": (
+        "agents.sensitivity_scenario_engine:SensitivityScenarioEngine"
+    ),
+    "stakeholder_graph_bot": "agents.stakeholder_graph_bot:StakeholderGraphBot",
+    "status_collector": "agents.status_collector:StatusCollector",
+    "tam_sam_som_estimator": "agents.tam_sam_som_estimator:TAMSAMSOMEstimator",
+}
+
+
+def load_agent_class(name: str):
+    """Importa e retorna a classe do agente `name`."""
+    try:
+        module_name, class_name = AGENT_CLASSES[name].split(":")
+    except KeyError:
+        raise KeyError(f"Agente desconhecido: '{name}'") from None
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def build_step_factories(rules: dict, pool) -> dict:
+    """
+    Monta o dicionário etapa -> fábrica de agente esperado pelo
+    `AgentRouter`, a partir de `step_agents` do rules.yaml. As fábricas
+    buscam os agentes no `AgentPool`, então cada um é construído uma vez só.
+    """
+    return {
+        step: pool.factory(agent_name)
+        for step, agent_name in (rules.get("step_agents") or {}).items()
+        if agent_name in AGENT_CLASSES
+    }
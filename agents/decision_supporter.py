@@ -8,4 +8,11 @@ class DecisionSupporter(BaseAgent):
         super().__init__("decision_supporter", config, model_mapping)
 
     def build_prompt(self, project_data: Dict[str, Any]) -> str:
-        return "Forneça recomendações de decisão para situações-chave do projeto."
+        decision = project_data.get("decision")
+        if not decision:
+            return "Forneça recomendações de decisão para situações-chave do projeto."
+        name = project_data.get("name", "")
+        return (
+            f"Analise a decisão estratégica '{decision}' para o projeto '{name}'.\n"
+            "- Prós\n- Contras\n- Riscos e mitigação\n- Recomendação final"
+        )
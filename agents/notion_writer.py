@@ -1,26 +1,61 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from rich.console import Console
 
+from utils.notion_sync import NotionSync, project_properties, task_properties
+from utils.tracing import span
+
 from .base_agent import BaseAgent
 
 console = Console()
 
 
 class NotionWriter(BaseAgent):
+    reusable_output = False
+    fusable = False
+
     def __init__(self, config: Dict[str, Any], model_mapping: Dict[str, str]):
         super().__init__("notion_writer", config, model_mapping)
         self.token = config.get("notion_token")
         self.projects_db_id = config.get("notion_db", {}).get("projects_db_id")
+        self.tasks_db_id = config.get("notion_db", {}).get("tasks_db_id")
+        self._sync: Optional[NotionSync] = None
         console.print("✅ [Notion Writer] Inicializado.")
 
+    @property
+    def sync(self) -> NotionSync:
+        """Cliente da API (seção `notion_sync`), criado no primeiro uso."""
+        if self._sync is None:
+            self._sync = NotionSync.from_config(self.config)
+        return self._sync
+
+    def create_project_page(self, project_data: Dict[str, Any]) -> str:
+        """Cria a página do projeto e retorna o id dela."""
+        return self.sync.create_page(
+            self.projects_db_id, project_properties(project_data)
+        )
+
+    def create_task_pages(
+        self, tasks: list, project_relation_id: Optional[str] = None, on_progress=None
+    ) -> list:
+        """
+        Cria as páginas das tarefas em paralelo, no ritmo permitido pelo
+        Notion. Retorna, na ordem de `tasks`, {"page_id", "error"} por tarefa.
+        """
+        return self.sync.create_pages(
+            self.tasks_db_id,
+            [task_properties(task, project_relation_id) for task in tasks],
+            on_progress=on_progress,
+        )
+
     def build_prompt(self, project_data: Dict[str, Any]) -> str:
         return ""  # não usado
 
-    def run(self, project_data: Dict[str, Any], dry_run: bool = False):
+    def execute(self, project_data: Dict[str, Any], dry_run: bool = False, **kwargs):
         if dry_run:
             console.print("[DryRun] notion_writer → stub sync Notion")
             return {}
-        # aqui implementaria chamada real à API do Notion
-        console.print("[notion_writer] Sincronização com Notion (stub).")
+        with span("notion.write", project=project_data.get("slug")):
+            # aqui implementaria chamada real à API do Notion
+            console.print("[notion_writer] Sincronização com Notion (stub).")
         return {}
@@ -1,7 +1,71 @@
-from typing import Any, Dict
+import copy
+from typing import Any, Dict, List
 
 from .base_agent import BaseAgent
 
+# Cronograma-base (WBS) por tipo de projeto; `estimate` em dias. Tipos sem
+# entrada usam "default".
+SCHEDULE_TEMPLATES: Dict[str, List[Dict[str, Any]]] = {
+    "default": [
+        {
+            "name": "Kickoff e escopo",
+            "dor": "Patrocinador e objetivos definidos",
+            "dod": "Termo de abertura aprovado",
+            "estimate": 3,
+        },
+        {
+            "name": "Planejamento",
+            "dor": "Escopo aprovado",
+            "dod": "Cronograma e orçamento aprovados",
+            "estimate": 5,
+        },
+        {
+            "name": "Execução",
+            "dor": "Plano aprovado e equipe alocada",
+            "dod": "Entregas aceitas pelo patrocinador",
+            "estimate": 20,
+        },
+        {
+            "name": "Encerramento",
+            "dor": "Entregas aceitas",
+            "dod": "Lições aprendidas registradas",
+            "estimate": 2,
+        },
+    ],
+    "Software": [
+        {
+            "name": "Descoberta e requisitos",
+            "dor": "Problema e usuários-alvo definidos",
+            "dod": "Backlog priorizado",
+            "estimate": 5,
+        },
+        {
+            "name": "Arquitetura e setup",
+            "dor": "Backlog priorizado",
+            "dod": "Repositório, CI e ambientes prontos",
+            "estimate": 3,
+        },
+        {
+            "name": "Desenvolvimento do MVP",
+            "dor": "Setup pronto",
+            "dod": "Funcionalidades do MVP com testes",
+            "estimate": 20,
+        },
+        {
+            "name": "Testes e homologação",
+            "dor": "MVP completo",
+            "dod": "Sem bugs críticos abertos",
+            "estimate": 5,
+        },
+        {
+            "name": "Lançamento",
+            "dor": "Homologação aprovada",
+            "dod": "Em produção e monitorado",
+            "estimate": 2,
+        },
+    ],
+}
+
 
 class ScheduleCopilot(BaseAgent):
     def __init__(self, config: Dict[str, Any], model_mapping: Dict[str, str]):
@@ -13,3 +77,12 @@ class ScheduleCopilot(BaseAgent):
             f"Crie um cronograma básico (WBS) para um projeto do tipo '{project_type}'.\n"
             "- Fases principais\n- Marcos\n- Durações aproximadas"
         )
+
+    def generate_schedule(self, project_type: str) -> List[Dict[str, Any]]:
+        """
+        Tarefas iniciais do projeto ({"name", "dor", "dod", "estimate"}) a
+        partir de SCHEDULE_TEMPLATES, sem chamar o LLM: o `new-project` cria
+        as tarefas na hora e o cronograma detalhado fica para o workflow.
+        """
+        template = SCHEDULE_TEMPLATES.get(project_type, SCHEDULE_TEMPLATES["default"])
+        return copy.deepcopy(template)
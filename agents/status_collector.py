@@ -8,6 +8,9 @@ console = Console()
 
 
 class StatusCollector(BaseAgent):
+    reusable_output = False
+    fusable = False
+
     def __init__(self, config: Dict[str, Any], model_mapping: Dict[str, str]):
         super().__init__("status_collector", config, model_mapping)
         console.print("✅ [Status Collector] Inicializado.")
@@ -15,7 +18,7 @@ class StatusCollector(BaseAgent):
     def build_prompt(self, project_data: Dict[str, Any]) -> str:
         return ""
 
-    def run(self, project_data: Dict[str, Any], dry_run: bool = False):
+    def execute(self, project_data: Dict[str, Any], dry_run: bool = False, **kwargs):
         if dry_run:
             console.print("[DryRun] status_collector → stub coleta status")
             return {}
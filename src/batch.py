@@ -0,0 +1,192 @@
+# src/batch.py
+"""
+Execução em lote sobre o portfólio: seleciona projetos da tabela `projects`
+e roda um agente (via `BaseAgent.run_many`, em blocos) ou um workflow
+inteiro (via `AgentRouter.route_event`, num pool de threads ou processos)
+sobre todos eles, num único processo de CLI.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.catalog import build_step_factories
+from src import db, models
+from src.step_store import StepStore
+from utils.rate_limiter import TokenBudget
+
+# Estado de cada processo do pool (montado uma vez por `_init_process`)
+_process_router: Optional[AgentRouter] = None
+
+
+def select_projects(
+    session,
+    project_type: Optional[str] = None,
+    country: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list:
+    """Projetos que casam com os filtros, já no formato esperado pelos agentes."""
+    query = session.query(models.Project)
+    if project_type:
+        query = query.filter(models.Project.project_type == project_type)
+    if country:
+        query = query.filter(models.Project.country == country)
+    if status:
+        wanted = next(
+            (
+                s
+                for s in models.ProjectStatus
+                if status.lower() in (s.name.lower(), s.value.lower())
+            ),
+            None,
+        )
+        if wanted is None:
+            raise ValueError(f"Status desconhecido: '{status}'")
+        query = query.filter(models.Project.status == wanted)
+    return [
+        {
+            "slug": p.slug,
+            "name": p.name,
+            "project_type": p.project_type,
+            "country": p.country,
+        }
+        for p in query.order_by(models.Project.id)
+    ]
+
+
+def run_agent_batch(
+    agent,
+    projects: list,
+    store=None,
+    chunk_size: int = 25,
+    force: bool = False,
+    on_progress=None,
+) -> dict:
+    """
+    Roda um agente sobre os projetos em blocos de `chunk_size` chamadas
+    `run_many`. Projetos cuja saída guardada ainda vale (`store`, a menos que
+    `force`) não são reenviados ao LLM; as novas saídas de cada bloco são gravadas numa
+    única transação. Retorna slug -> {"output", "error", "cached"}.
+    """
+    results: dict = {}
+    for i in range(0, len(projects), max(1, chunk_size)):
+        chunk = projects[i : i + chunk_size]
+        fingerprints = [agent.fingerprint(data) for data in chunk]
+        pending = []
+        for data, fingerprint in zip(chunk, fingerprints):
+            output = store.get(fingerprint) if store and not force else None
+            if output is None:
+                pending.append((data, fingerprint))
+            else:
+                results[data["slug"]] = {
+                    "output": output,
+                    "error": None,
+                    "cached": True,
+                }
+
+        generated = agent.run_many([data for data, _ in pending]) if pending else []
+        rows = []
+        for (data, fingerprint), result in zip(pending, generated):
+            results[data["slug"]] = {
+                "output": result["text"],
+                "error": result["error"],
+                "cached": False,
+            }
+            if result["text"]:
+                rows.append(
+                    {
+                        "fingerprint": fingerprint,
+                        "project_key": data["slug"],
+                        "step": agent.name,
+                        "output": result["text"],
+                        "agent": agent.name,
+                        "model": agent.model,
+                    }
+                )
+        if store and rows:
+            store.put_many(rows)
+        if on_progress:
+            on_progress(len(chunk))
+    return results
+
+
+def summarize_workflow(results: dict) -> dict:
+    """Resultado de um workflow no formato do lote."""
+    errors = [f"{step}: {r['error']}" for step, r in results.items() if r["error"]]
+    return {
+        "output": {step: r["output"] for step, r in results.items()},
+        "error": "; ".join(errors) or None,
+        "cached": bool(results) and all(r.get("cached") for r in results.values()),
+    }
+
+
+def build_router(
+    agent_config: dict, rules: dict, database_url: str, force: bool = False
+) -> AgentRouter:
+    """
+    Router com agentes do pool e saídas guardadas no banco. Função de módulo
+    para poder ir, via `functools.partial`, para os processos do pool.
+    """
+    return AgentRouter(
+        build_step_factories(rules, AgentPool(agent_config)),
+        rules,
+        store=StepStore(db.get_engine(database_url)),
+        force=force,
+        token_budget=TokenBudget.limit_from_config(agent_config),
+    )
+
+
+def _init_process(router_factory):
+    global _process_router
+    _process_router = router_factory()
+
+
+def _route_in_process(event_type: str, data: dict) -> dict:
+    if _process_router is None:
+        raise RuntimeError("Processo do pool sem router (_init_process não rodou).")
+    return summarize_workflow(_process_router.route_event(event_type, data))
+
+
+def run_workflow_batch(
+    event_type: str,
+    projects: list,
+    router_factory,
+    workers: int = 4,
+    processes: bool = False,
+    on_progress=None,
+) -> dict:
+    """
+    Roda o workflow de `event_type` para cada projeto. `router_factory`
+    (sem argumentos; ex.: `partial(build_router, ...)`) monta o router: com
+    threads (padrão) um só, compartilhado por todos, com seus agentes,
+    clientes e limites de taxa; com `processes=True`, um por processo (aí
+    a fábrica precisa ser picklável). Retorna slug -> {"output", "error",
+    "cached"}.
+    """
+    if processes:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_process, initargs=(router_factory,)
+        )
+        task = _route_in_process
+    else:
+        router = router_factory()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+
+        def task(event_type, data):
+            return summarize_workflow(router.route_event(event_type, data))
+
+    results: dict = {}
+    with executor:
+        futures = {
+            executor.submit(task, event_type, data): data["slug"] for data in projects
+        }
+        for future in as_completed(futures):
+            slug = futures[future]
+            try:
+                results[slug] = future.result()
+            except Exception as e:
+                results[slug] = {"output": None, "error": str(e), "cached": False}
+            if on_progress:
+                on_progress(1)
+    return results
@@ -0,0 +1,7 @@
+# src/commands/__init__.py
+"""
+Implementação dos comandos da CLI, em módulos importados só quando o
+comando roda: `src/main.py` declara os comandos (nomes, opções e ajuda)
+com o mínimo de imports, para que `--help` e comandos leves não paguem
+SQLAlchemy, pandas, agentes e SDKs de LLM.
+"""
@@ -0,0 +1,87 @@
+# src/commands/common.py
+"""Helpers compartilhados pelos comandos: config, regras, banco e tabelas."""
+
+import typer
+import yaml
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+
+from src import db
+from src.config import ConfigError, ConfigService
+from utils import tracing
+
+load_dotenv()  # carrega variáveis de ambiente apenas uma vez
+console = Console()
+
+
+def get_config() -> dict:
+    """
+    config.yaml + model_mapping + rules + overrides do .env, via
+    `ConfigService` (o YAML só é relido quando algum arquivo muda).
+    """
+    try:
+        cfg = ConfigService.shared().get()
+    except ConfigError as e:
+        console.print(f"[bold red]Erro ao ler config:[/bold red] {e}")
+        raise typer.Exit(1)
+
+    mapping_file = cfg.get("model_mapping_file")
+    if mapping_file and not cfg.get("model_mapping"):
+        console.print(
+            f"[yellow]Aviso:[/yellow] '{mapping_file}' não encontrado; "
+            "agentes sem modelo definido."
+        )
+
+    tracing.activate(cfg)
+    db.configure(cfg)
+    return cfg
+
+
+def get_rules(config: dict) -> dict:
+    """Regras (`rules_file`) com os workflows de eventos."""
+    if "rules" in config:
+        return config["rules"]
+    path = config.get("rules_file", "config/rules.yaml")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        console.print(f"[bold red]Erro:[/bold red] '{path}' não encontrado.")
+        raise typer.Exit(1)
+
+
+def get_engine(db_url: str):
+    # um engine (e pool) por URL no processo, com WAL e busy_timeout (src/db.py)
+    return db.get_engine(db_url)
+
+
+def get_db_session(db_url: str):
+    return db.get_session(db_url)
+
+
+def workflow_table(results: dict, title: str) -> Table:
+    """Situação de cada etapa de um workflow (`AgentRouter.route_event`)."""
+    table = Table(title=title, header_style="bold cyan")
+    table.add_column("Etapa")
+    table.add_column("Situação")
+    table.add_column("Tempo", justify="right")
+    for step, result in results.items():
+        if result["error"]:
+            status = f"[red]erro: {result['error']}[/red]"
+        elif result["cached"]:
+            status = "[green]reaproveitada[/green]"
+        else:
+            status = "[yellow]recalculada[/yellow]"
+        table.add_row(step, status, f"{result['seconds'] * 1000:.0f} ms")
+    return table
+
+
+def project_to_data(project) -> dict:
+    """Converte um `models.Project` no dicionário esperado pelos agentes."""
+    return {
+        "slug": project.slug,
+        "name": project.name,
+        "project_type": project.project_type,
+        "country": project.country,
+    }
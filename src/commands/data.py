@@ -0,0 +1,93 @@
+# src/commands/data.py
+"""Comandos de banco: criação das tabelas, importação em massa e prioridades."""
+
+import typer
+from rich.progress import Progress, TextColumn, TimeElapsedColumn
+from rich.table import Table
+
+from src import importer, models
+from src.commands.common import (
+    console,
+    get_config,
+    get_db_session,
+    get_engine,
+    get_rules,
+)
+from src.priorities import ensure_task_columns
+from src.priorities import prioritize as prioritize_tasks
+
+
+def prioritize(dry_run: bool):
+    config = get_config()
+    engine = get_engine(config["database_url"])
+    ensure_task_columns(engine)
+    db_session = get_db_session(config["database_url"])
+    try:
+        report = prioritize_tasks(db_session, get_rules(config), write=not dry_run)
+    finally:
+        db_session.close()
+
+    table = Table(title="Prioridades das Tarefas", header_style="bold cyan")
+    table.add_column("Nível")
+    table.add_column("Tarefas", justify="right")
+    for level, count in sorted(report["counts"].items(), key=lambda item: -item[1]):
+        table.add_row(level or "[dim](concluídas)[/dim]", str(count))
+    console.print(table)
+    action = "mudariam" if dry_run else "atualizadas"
+    console.print(
+        f"{report['tasks']} tarefas avaliadas em "
+        f"{report['seconds'] * 1000:.1f} ms; {report['changed']} {action}."
+    )
+
+
+def import_data(path: str, fmt: str, chunk_size: int, on_existing: str, dry_run: bool):
+    config = get_config()
+    engine = get_engine(config["database_url"])
+    models.create_db_and_tables(engine)
+    ensure_task_columns(engine)
+    db_session = get_db_session(config["database_url"])
+    progress = Progress(
+        TextColumn("[bold cyan]Importando"),
+        TextColumn("{task.completed:,.0f} linhas"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    try:
+        with progress:
+            task_id = progress.add_task("import", total=None)
+            report = importer.import_file(
+                db_session,
+                path,
+                fmt=fmt,
+                chunk_size=chunk_size,
+                on_existing=on_existing,
+                dry_run=dry_run,
+                on_progress=lambda n: progress.advance(task_id, n),
+            )
+    except (OSError, ValueError) as e:
+        db_session.rollback()
+        console.print(f"[bold red]Falha na importação:[/bold red] {e}")
+        raise typer.Exit(1)
+    finally:
+        db_session.close()
+
+    action = "seriam importados" if dry_run else "importados"
+    console.print(
+        f"✅ {report['rows']} linhas em {report['seconds']:.2f}s: "
+        f"{report['projects']} projetos e {report['tasks']} tarefas {action}; "
+        f"{report['skipped']} linhas de projetos existentes ignoradas; "
+        f"{report['errors']} com erro."
+    )
+    for sample in report["error_samples"]:
+        console.print(f"  [yellow]{sample}[/yellow]")
+    if report["tasks"] and not dry_run:
+        console.print("Dica: rode `prioritize` para calcular as prioridades.")
+
+
+def init_db():
+    console.print("⚙️  Inicializando o banco de dados...")
+    config = get_config()
+    db_url = config.get("database_url")
+    engine = get_engine(db_url)
+    models.create_db_and_tables(engine)
+    console.print("✅ Banco de dados inicializado com sucesso!")
@@ -0,0 +1,92 @@
+# src/commands/events.py
+"""Comandos da fila durável de eventos: enfileirar, processar e acompanhar."""
+
+import json
+from typing import Optional
+
+import typer
+from rich.live import Live
+from rich.table import Table
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.catalog import build_step_factories
+from src import event_queue, loadgen
+from src.commands.common import console, get_config, get_engine, get_rules
+from src.step_store import StepStore
+from utils.rate_limiter import TokenBudget
+
+
+def depth_table(depth: dict, max_depth: int, processed: Optional[int] = None) -> Table:
+    """Tabela com a profundidade da fila; destaca quando há backpressure."""
+    table = Table(title="Fila de Eventos", header_style="bold cyan")
+    for column in ("Pendentes", "Em execução", "Concluídos", "Mortos"):
+        table.add_column(column, justify="right")
+    pending_style = "red" if depth["pending"] >= 0.8 * max_depth else "white"
+    table.add_row(
+        f"[{pending_style}]{depth['pending']}[/{pending_style}] / {max_depth}",
+        str(depth["running"]),
+        str(depth["done"]),
+        str(depth["dead"]),
+    )
+    if processed is not None:
+        table.caption = f"{processed} processados nesta sessão"
+    return table
+
+
+def enqueue(event_type: str, data: str, trace: str):
+    config = get_config()
+    queue = event_queue.EventQueue(get_engine(config["database_url"]), config)
+    if trace:
+        events = [(e["event_type"], e.get("data")) for e in loadgen.load_trace(trace)]
+    elif event_type:
+        events = [(event_type, json.loads(data))]
+    else:
+        console.print("[bold red]Informe um tipo de evento ou --trace.[/bold red]")
+        raise typer.Exit(1)
+    try:
+        ids = queue.enqueue_many(events)
+    except event_queue.QueueFull as e:
+        console.print(f"[bold red]Backpressure:[/bold red] {e}")
+        raise typer.Exit(2)
+    console.print(f"📥 {len(ids)} evento(s) enfileirado(s).")
+    console.print(depth_table(queue.depth(), queue.settings["max_depth"]))
+
+
+def worker(concurrency: int, drain: bool, mock: bool, force: bool):
+    config = get_config()
+    engine = get_engine(config["database_url"])
+    queue = event_queue.EventQueue(engine, config)
+    agent_config = loadgen.mock_config(config) if mock else config
+    rules = get_rules(config)
+    router = AgentRouter(
+        build_step_factories(rules, AgentPool(agent_config)),
+        rules,
+        store=StepStore(engine),
+        force=force,
+        token_budget=TokenBudget.limit_from_config(agent_config),
+    )
+    start_done = queue.depth()["done"]
+
+    def render():
+        depth = queue.depth()
+        return depth_table(
+            depth, queue.settings["max_depth"], depth["done"] - start_done
+        )
+
+    console.print("👷 Workers iniciados. Ctrl+C para parar.")
+    with Live(render(), console=console, refresh_per_second=4) as live:
+        event_queue.run_workers(
+            queue,
+            router,
+            concurrency=concurrency,
+            stop_when_empty=drain,
+            on_tick=lambda: live.update(render()),
+        )
+        live.update(render())
+
+
+def queue_status():
+    config = get_config()
+    queue = event_queue.EventQueue(get_engine(config["database_url"]), config)
+    console.print(depth_table(queue.depth(), queue.settings["max_depth"]))
@@ -0,0 +1,95 @@
+# src/commands/observability.py
+"""Comandos de observabilidade: saúde dos provedores e resumo dos spans."""
+
+from rich.table import Table
+
+from src import loadgen
+from src.commands.common import console, get_config
+from utils.provider_health import DEFAULT_SNAPSHOT_PATH, load_snapshot
+from utils.tracing import DEFAULT_TRACE_PATH, load_spans
+
+
+def provider_health():
+    config = get_config()
+    health_cfg = config.get("provider_health") or {}
+    snapshot = load_snapshot(health_cfg.get("snapshot_path", DEFAULT_SNAPSHOT_PATH))
+    if not snapshot or not snapshot.get("providers"):
+        console.print(
+            "[yellow]Nenhum dado de saúde ainda: nenhum provedor foi chamado.[/yellow]"
+        )
+        return
+
+    def fmt_ms(value):
+        return "-" if value is None else f"{value * 1000:.0f} ms"
+
+    state_style = {"closed": "green", "half_open": "yellow", "open": "red"}
+    table = Table(title="Saúde dos Provedores de LLM", header_style="bold cyan")
+    table.add_column("Provedor")
+    table.add_column("Circuito")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Erros", justify="right")
+    table.add_column("Amostras", justify="right")
+    table.add_column("Último erro", width=40)
+    for provider, info in snapshot["providers"].items():
+        style = state_style.get(info["state"], "white")
+        table.add_row(
+            provider,
+            f"[{style}]{info['state']}[/{style}]",
+            fmt_ms(info["p50"]),
+            fmt_ms(info["p95"]),
+            f"{info['error_rate']:.0%}",
+            str(info["samples"]),
+            info.get("last_error") or "",
+        )
+    console.print(table)
+
+
+def trace_summary(path: str, top: int, name: str):
+    if path is None:
+        tracing_cfg = get_config().get("tracing") or {}
+        path = tracing_cfg.get("path", DEFAULT_TRACE_PATH)
+    spans = [s for s in load_spans(path) if not name or s["name"].startswith(name)]
+    if not spans:
+        console.print(f"[yellow]Nenhum span encontrado em '{path}'.[/yellow]")
+        return
+
+    by_name: dict = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+    table = Table(title=f"Spans por tipo ({path})", header_style="bold cyan")
+    table.add_column("Span")
+    for column in ("Qtd", "p50", "p95", "Máx", "Total", "Erros"):
+        table.add_column(column, justify="right")
+    totals = {
+        key: sum(s["duration_ms"] for s in group) for key, group in by_name.items()
+    }
+    for key in sorted(by_name, key=lambda k: -totals[k]):
+        durations = [s["duration_ms"] for s in by_name[key]]
+        errors = sum(1 for s in by_name[key] if s["status"] == "error")
+        table.add_row(
+            key,
+            str(len(durations)),
+            f"{loadgen.percentile(durations, 50):.1f} ms",
+            f"{loadgen.percentile(durations, 95):.1f} ms",
+            f"{max(durations):.1f} ms",
+            f"{totals[key] / 1000:.2f} s",
+            f"[red]{errors}[/red]" if errors else "0",
+        )
+    console.print(table)
+
+    slowest = Table(title=f"{top} spans mais lentos", header_style="bold cyan")
+    slowest.add_column("Span")
+    slowest.add_column("Duração", justify="right")
+    slowest.add_column("Atributos")
+    slowest.add_column("Trace")
+    for s in sorted(spans, key=lambda s: -s["duration_ms"])[:top]:
+        attributes = ", ".join(
+            f"{k}={v}" for k, v in (s.get("attributes") or {}).items() if v is not None
+        )
+        if s.get("error"):
+            attributes = f"[red]{s['error']}[/red] {attributes}"
+        slowest.add_row(
+            s["name"], f"{s['duration_ms']:.1f} ms", attributes, s["trace_id"][:8]
+        )
+    console.print(slowest)
@@ -0,0 +1,238 @@
+# src/commands/projects.py
+"""Comandos de projeto: criação (com a análise em segundo plano) e agentes avulsos."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.panel import Panel
+from rich.rule import Rule
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.brand_kit_bot import BrandKitBot
+from agents.catalog import build_step_factories
+from agents.decision_supporter import DecisionSupporter
+from agents.notion_writer import NotionWriter
+from agents.schedule_copilot import ScheduleCopilot
+from agents.stakeholder_graph_bot import StakeholderGraphBot
+from src import event_queue, models
+from src.commands.common import (
+    console,
+    get_config,
+    get_db_session,
+    get_rules,
+    project_to_data,
+    workflow_table,
+)
+from src.step_store import StepStore
+from utils.rate_limiter import TokenBudget
+from utils.slug import legacy_slug, slugify
+from utils.tracing import propagate
+
+
+def launch_analysis(config: dict, engine, data: dict, wait: bool):
+    """
+    Dispara o workflow NEW_PROJECT_CREATED de um projeto recém-criado sem
+    esperar por ele. Com `wait`, roda numa thread deste processo e devolve
+    o future (os resultados ficam também no StepStore); sem `wait`, vai
+    para a fila durável e devolve o id do evento, para um `worker` processar.
+    """
+    if wait:
+        rules = get_rules(config)
+        router = AgentRouter(
+            build_step_factories(rules, AgentPool.shared(config)),
+            rules,
+            store=StepStore(engine),
+            token_budget=TokenBudget.limit_from_config(config),
+        )
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        future = executor.submit(
+            propagate(router.route_event), "NEW_PROJECT_CREATED", data
+        )
+        executor.shutdown(wait=False)
+        return future
+    queue = event_queue.EventQueue(engine, config)
+    return queue.enqueue("NEW_PROJECT_CREATED", data)
+
+
+def new_project(
+    name: str, project_type: str, country: str, dry_run: bool, analyze: bool, wait: bool
+) -> None:
+    console.print(f"✨ Iniciando criação do projeto: [bold green]{name}[/bold green]")
+    config = get_config()
+    db_session = get_db_session(config["database_url"])
+    slug = slugify(name)
+    # projetos antigos guardam o slug com acentos: procura as duas formas
+    taken = (
+        db_session.query(models.Project.slug)
+        .filter(models.Project.slug.in_({slug, legacy_slug(name)}))
+        .first()
+    )
+    if taken:
+        console.print(
+            f"[bold red]Erro:[/bold red] já existe um projeto com o slug '{taken[0]}'."
+        )
+        db_session.close()
+        return
+    # a análise só precisa de nome, tipo e país: começa antes do Notion e das
+    # tarefas em vez de esperar por eles
+    analysis = None
+    if analyze and not dry_run:
+        data = {
+            "slug": slug,
+            "name": name,
+            "project_type": project_type,
+            "country": country,
+        }
+        try:
+            analysis = launch_analysis(config, db_session.get_bind(), data, wait)
+        except event_queue.QueueFull as e:
+            console.print(f"[yellow]Análise não enfileirada: {e}[/yellow]")
+    created = False
+    try:
+        writer = NotionWriter(config, config.get("model_mapping", {}))
+        scheduler = ScheduleCopilot(
+            config=config, model_mapping=config.get("model_mapping", {})
+        )
+        project_data = {
+            "slug": slug,
+            "name": name,
+            "type": project_type,
+            "country": country,
+        }
+        notion_page_id = writer.create_project_page(project_data)
+        db_project = models.Project(
+            name=name,
+            slug=slug,
+            project_type=project_type,
+            country=country,
+            status=models.ProjectStatus.PLANNING,
+            notion_page_id=notion_page_id,
+        )
+        db_session.add(db_project)
+        db_session.flush()
+
+        tasks = scheduler.generate_schedule(project_type)
+        db_tasks = [
+            models.Task(
+                project_id=db_project.id,
+                template=task_item["name"],
+                dor=task_item["dor"],
+                dod=task_item["dod"],
+                estimate=task_item.get("estimate", 0),
+            )
+            for task_item in tasks
+        ]
+        db_session.add_all(db_tasks)
+        start = time.perf_counter()
+        pages = writer.create_task_pages(tasks, project_relation_id=notion_page_id)
+        for db_task, page in zip(db_tasks, pages):
+            db_task.notion_page_id = page["page_id"]
+        failed = [page["error"] for page in pages if page["error"]]
+        console.print(
+            f"📄 {len(pages) - len(failed)}/{len(pages)} tarefas no Notion "
+            f"em {time.perf_counter() - start:.1f}s"
+        )
+        for error in failed[:3]:
+            console.print(f"  [yellow]{error}[/yellow]")
+
+        db_session.commit()
+        created = True
+        console.print(
+            f"✅ Projeto '{name}' e tarefas sincronizados com sucesso! "
+            f"Slug: [bold cyan]{slug}[/bold cyan]"
+        )
+    except Exception as e:
+        console.print(f"[bold red]Falha na criação do projeto: {e}[/bold red]")
+        db_session.rollback()
+    finally:
+        if isinstance(analysis, int):
+            if created:
+                console.print(
+                    f"🧠 Análise enfileirada (evento #{analysis}); um `worker` "
+                    "processa e `queue-status` acompanha."
+                )
+            else:
+                queue = event_queue.EventQueue(db_session.get_bind(), config)
+                queue.cancel(analysis, "criação do projeto falhou")
+        elif analysis is not None:
+            if created:
+                try:
+                    results = analysis.result()
+                except Exception as e:
+                    console.print(f"[yellow]Análise falhou: {e}[/yellow]")
+                else:
+                    console.print(workflow_table(results, f"Análise – {slug}"))
+            else:
+                # não espera por uma análise que será descartada; as etapas
+                # já concluídas ficam no StepStore para uma nova tentativa
+                analysis.cancel()
+        db_session.close()
+
+
+def support_decision(project_slug: str, decision: str):
+    config = get_config()
+    db_session = get_db_session(config["database_url"])
+    try:
+        project = db_session.query(models.Project).filter_by(slug=project_slug).first()
+        if not project:
+            console.print(
+                f"[bold red]Erro:[/bold_red] Projeto '{project_slug}' não encontrado."
+            )
+            return
+        supporter = DecisionSupporter(config, config.get("model_mapping", {}))
+        console.print(Rule(f"Análise da Decisão: '{decision}'"))
+        supporter.run({**project_to_data(project), "decision": decision}, stream=True)
+        console.print(Rule())
+    except Exception as e:
+        console.print(f"[bold red]Falha na análise de decisão: {e}[/bold red]")
+    finally:
+        db_session.close()
+
+
+def map_stakeholders(project_slug: str):
+    config = get_config()
+    db_session = get_db_session(config["database_url"])
+    try:
+        project = db_session.query(models.Project).filter_by(slug=project_slug).first()
+        if not project:
+            console.print(
+                f"[bold red]Erro:[/bold_red] Projeto '{project_slug}' não encontrado."
+            )
+            return
+        mapper = StakeholderGraphBot(config, config.get("model_mapping", {}))
+        console.print(Rule(f"Stakeholders: {project.name}"))
+        mapper.run(project_to_data(project), stream=True)
+        console.print(Rule())
+    except Exception as e:
+        console.print(f"[bold red]Falha no mapa de stakeholders: {e}[/bold red]")
+    finally:
+        db_session.close()
+
+
+def generate_brand(project_slug: str):
+    config = get_config()
+    db_session = get_db_session(config["database_url"])
+    try:
+        project = db_session.query(models.Project).filter_by(slug=project_slug).first()
+        if not project:
+            console.print(
+                f"[bold red]Erro:[/bold_red] Projeto '{project_slug}' não encontrado."
+            )
+            return
+        brander = BrandKitBot(config, config.get("model_mapping", {}))
+        kit = brander.run(project_to_data(project), stream=True)["result"]
+        slogan = kit.get("slogan", "N/A")
+        mission = kit.get("mission_statement", "N/A")
+        palette = kit.get("color_palette", [])
+        colors_str = "\n".join(f"[{c.split()[0]}]███[/] {c}" for c in palette)
+        panel = Panel(
+            f"[bold]Slogan:[/bold] {slogan}\n\n"
+            f"[bold]Missão:[/bold] {mission}\n\n"
+            f"[bold]Paleta de Cores:[/bold]\n{colors_str}",
+            title=f"Kit de Marca: {project.name}",
+            border_style="yellow",
+        )
+        console.print(panel)
+    finally:
+        db_session.close()
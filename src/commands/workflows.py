@@ -0,0 +1,219 @@
+# src/commands/workflows.py
+"""
+Comandos de workflow: um projeto (`run-workflow`), o portfólio (`batch`)
+e a reprodução de um trace com o provedor mock (`load-test`).
+"""
+
+import contextlib
+import io
+import sys
+from functools import partial
+
+import typer
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    ProgressColumn,
+    TextColumn,
+    TimeElapsedColumn,
+    TimeRemainingColumn,
+)
+from rich.table import Table
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.catalog import AGENT_CLASSES, build_step_factories
+from src import batch as batch_runner
+from src import loadgen, models
+from src.commands.common import (
+    console,
+    get_config,
+    get_db_session,
+    get_engine,
+    get_rules,
+    project_to_data,
+    workflow_table,
+)
+from src.step_store import StepStore
+from utils.rate_limiter import TokenBudget
+
+
+def load_test(
+    trace: str,
+    rate: float,
+    concurrency: int,
+    repeat: int,
+    latency_ms: float,
+    error_rate: float,
+    seed: int,
+):
+    config = loadgen.mock_config(
+        get_config(), latency_ms=latency_ms, error_rate=error_rate, seed=seed
+    )
+    rules = get_rules(config)
+    events = loadgen.load_trace(trace) * max(1, repeat)
+    pool = AgentPool(config)
+    router = AgentRouter(
+        build_step_factories(rules, pool),
+        rules,
+        token_budget=TokenBudget.limit_from_config(config),
+    )
+    console.print(
+        f"🏋️  Reproduzindo {len(events)} eventos a {rate:g}/s "
+        f"(concorrência {concurrency})..."
+    )
+    report = loadgen.replay(router, events, rate=rate, concurrency=concurrency)
+
+    table = Table(title="Resultado do Teste de Carga", header_style="bold cyan")
+    table.add_column("Métrica")
+    table.add_column("Evento", justify="right")
+    table.add_column("Etapa", justify="right")
+    for key in ("p50", "p95", "p99", "max"):
+        table.add_row(
+            key,
+            f"{report['event_latency'][key] * 1000:.0f} ms",
+            f"{report['step_latency'][key] * 1000:.0f} ms",
+        )
+    console.print(table)
+    console.print(
+        f"Vazão: [bold]{report['throughput']:.2f}[/bold] eventos/s "
+        f"em {report['duration_s']:.1f}s | eventos com erro: "
+        f"{report['failed_events']} | etapas com erro: {report['failed_steps']}"
+    )
+    pool_stats = pool.stats()
+    console.print(
+        f"Agentes: {pool_stats['builds']} construídos em "
+        f"{pool_stats['build_seconds'] * 1000:.0f} ms, "
+        f"{pool_stats['hits']} reutilizados"
+    )
+    for message, count in report["top_errors"]:
+        console.print(f"  [red]{count}x[/red] {message}")
+
+
+def run_workflow(slug: str, event: str, force: bool, mock: bool):
+    config = get_config()
+    engine = get_engine(config["database_url"])
+    db_session = get_db_session(config["database_url"])
+    try:
+        project = db_session.query(models.Project).filter_by(slug=slug).first()
+        if not project:
+            console.print(f"[bold red]Projeto '{slug}' não encontrado.[/bold red]")
+            raise typer.Exit(1)
+        data = project_to_data(project)
+    finally:
+        db_session.close()
+
+    agent_config = loadgen.mock_config(config) if mock else config
+    rules = get_rules(config)
+    store = StepStore(engine)
+    router = AgentRouter(
+        build_step_factories(rules, AgentPool(agent_config)),
+        rules,
+        store=store,
+        force=force,
+        token_budget=TokenBudget.limit_from_config(agent_config),
+    )
+    results = router.route_event(event, data)
+    console.print(workflow_table(results, f"Workflow {event} – {slug}"))
+
+
+class ThroughputColumn(ProgressColumn):
+    """Projetos por segundo, pela média móvel do Rich."""
+
+    def render(self, task):
+        return f"{task.speed or 0:.2f} proj/s"
+
+
+def batch(
+    agent: str,
+    event: str,
+    project_type: str,
+    country: str,
+    status: str,
+    workers: int,
+    processes: bool,
+    chunk_size: int,
+    force: bool,
+    mock: bool,
+):
+    if bool(agent) == bool(event):
+        console.print("[bold red]Informe --agent ou --event (só um).[/bold red]")
+        raise typer.Exit(1)
+    if agent and agent not in AGENT_CLASSES:
+        console.print(f"[bold red]Agente desconhecido: '{agent}'.[/bold red]")
+        raise typer.Exit(1)
+
+    config = get_config()
+    engine = get_engine(config["database_url"])
+    db_session = get_db_session(config["database_url"])
+    try:
+        projects = batch_runner.select_projects(
+            db_session, project_type=project_type, country=country, status=status
+        )
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(1)
+    finally:
+        db_session.close()
+    if not projects:
+        console.print("[yellow]Nenhum projeto casa com os filtros.[/yellow]")
+        return
+
+    agent_config = loadgen.mock_config(config) if mock else config
+    # o Progress escreve no terminal; a saída dos agentes vai para o buffer
+    progress = Progress(
+        TextColumn("[bold cyan]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        ThroughputColumn(),
+        TimeElapsedColumn(),
+        TextColumn("ETA"),
+        TimeRemainingColumn(),
+        console=Console(file=sys.stdout),
+        redirect_stdout=False,
+        redirect_stderr=False,
+    )
+    with progress, contextlib.redirect_stdout(io.StringIO()):
+        task = progress.add_task(agent or event, total=len(projects))
+
+        def advance(n):
+            progress.advance(task, n)
+
+        if agent:
+            pool = AgentPool(agent_config)
+            results = batch_runner.run_agent_batch(
+                pool.get(agent),
+                projects,
+                store=StepStore(engine),
+                chunk_size=chunk_size,
+                force=force,
+                on_progress=advance,
+            )
+        else:
+            results = batch_runner.run_workflow_batch(
+                event,
+                projects,
+                partial(
+                    batch_runner.build_router,
+                    agent_config,
+                    get_rules(config),
+                    config["database_url"],
+                    force,
+                ),
+                workers=workers,
+                processes=processes,
+                on_progress=advance,
+            )
+        elapsed = progress.tasks[task].elapsed or 0.0
+
+    failed = {slug: r["error"] for slug, r in results.items() if r["error"]}
+    cached = sum(1 for r in results.values() if r["cached"])
+    console.print(
+        f"✅ {len(results)} projetos em {elapsed:.1f}s "
+        f"({len(results) / elapsed if elapsed else 0:.2f}/s) | "
+        f"reaproveitados: {cached} | com erro: {len(failed)}"
+    )
+    for slug, error in list(failed.items())[:10]:
+        console.print(f"  [red]{slug}[/red]: {error}")
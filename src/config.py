@@ -0,0 +1,214 @@
+# src/config.py
+"""
+Serviço único de configuração para CLI, scheduler e dashboard. Junta
+`config/config.yaml`, o `model_mapping_file` e o `rules_file` num só dict
+(chaves `model_mapping` e `rules`) e aplica por cima os overrides do `.env`
+/ ambiente.
+
+O YAML só é lido quando algum dos arquivos muda: o resultado fica em
+memória e num snapshot JSON em disco (em `.cache/`), ambos validados
+pelo mtime e tamanho de cada arquivo. Assim cada comando da CLI pula o
+parse do YAML, e processos longos (scheduler, dashboard) que chamam
+`get()` a cada rodada recarregam sozinhos quando um arquivo é editado.
+"""
+
+import contextlib
+import copy
+import json
+import os
+import threading
+from typing import Any, Callable, Optional
+
+import yaml
+from dotenv import dotenv_values
+
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+DEFAULT_SNAPSHOT_PATH = ".cache/config.json"
+DEFAULT_RULES_PATH = "config/rules.yaml"
+
+# chave da config (pontuada) <- variável do .env / ambiente
+ENV_OVERRIDES = {
+    "api_keys.openai": "OPENAI_API_KEY",
+    "api_keys.google_gemini": "GEMINI_API_KEY",
+    "api_keys.notion": "NOTION_TOKEN",
+}
+
+# muda quando o formato do snapshot muda (snapshots antigos são ignorados)
+_SNAPSHOT_VERSION = 2
+
+
+class ConfigError(RuntimeError):
+    """config.yaml ausente ou inválido."""
+
+
+def _stamp(path: str) -> Optional[list]:
+    """[mtime_ns, tamanho] do arquivo (lista: sobrevive ao JSON), ou None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _read_yaml(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def apply_env(config: dict, env: dict) -> dict:
+    """Sobrescreve as chaves de ENV_OVERRIDES com os valores de `env`."""
+    for dotted_key, env_var in ENV_OVERRIDES.items():
+        value = env.get(env_var)
+        if value:
+            ref = config
+            *parents, leaf = dotted_key.split(".")
+            for key in parents:
+                ref = ref.setdefault(key, {})
+            ref[leaf] = value
+    return config
+
+
+class ConfigService:
+    _shared: dict = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CONFIG_PATH,
+        snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH,
+        env_file: str = ".env",
+    ):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.env_file = env_file
+        self._lock = threading.Lock()
+        self._stamps: Optional[dict] = None  # {arquivo: stamp} da config carregada
+        self._config: dict = {}  # já com os overrides do .env
+        self._callbacks: list[Callable[[dict], Any]] = []
+        self.last_error: Optional[str] = None
+        self.stats = {"parses": 0, "snapshot_hits": 0, "reloads": 0}
+
+    @classmethod
+    def shared(cls, path: str = DEFAULT_CONFIG_PATH) -> "ConfigService":
+        """Serviço do processo para o arquivo `path`."""
+        with cls._shared_lock:
+            service = cls._shared.get(path)
+            if service is None:
+                service = cls._shared[path] = cls(path)
+            return service
+
+    def on_reload(self, callback):
+        """Chama `callback(config)` sempre que um arquivo mudar e a config for relida."""
+        self._callbacks.append(callback)
+
+    def _files(self, raw: dict) -> list:
+        """Arquivos dos quais a config depende (os stamps validam o cache)."""
+        files = [self.path, self.env_file]
+        if raw.get("model_mapping_file"):
+            files.append(raw["model_mapping_file"])
+        files.append(raw.get("rules_file", DEFAULT_RULES_PATH))
+        return files
+
+    def _current(self, files) -> dict:
+        return {path: _stamp(path) for path in files}
+
+    def _parse(self) -> tuple:
+        """Lê e junta os YAML; retorna (config sem .env, stamps)."""
+        if _stamp(self.path) is None:
+            raise ConfigError(f"'{self.path}' não encontrado.")
+        try:
+            raw = _read_yaml(self.path)
+        except yaml.YAMLError as e:
+            raise ConfigError(f"'{self.path}' inválido: {e}") from e
+        stamps = self._current(self._files(raw))
+        self.stats["parses"] += 1
+
+        mapping_file = raw.get("model_mapping_file")
+        if mapping_file and not raw.get("model_mapping") and stamps[mapping_file]:
+            raw["model_mapping"] = _read_yaml(mapping_file).get("model_mapping", {})
+        rules_file = raw.get("rules_file", DEFAULT_RULES_PATH)
+        if stamps[rules_file]:
+            raw["rules"] = _read_yaml(rules_file)
+        return raw, stamps
+
+    def _load_snapshot(self) -> Optional[tuple]:
+        if not self.snapshot_path:
+            return None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            version, path = snapshot["version"], snapshot["path"]
+            stamps, raw = snapshot["stamps"], snapshot["config"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if version != _SNAPSHOT_VERSION or path != self.path:
+            return None
+        if stamps != self._current(stamps):
+            return None
+        self.stats["snapshot_hits"] += 1
+        return raw, stamps
+
+    def _save_snapshot(self, raw: dict, stamps: dict):
+        if not self.snapshot_path:
+            return
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": _SNAPSHOT_VERSION,
+                        "path": self.path,
+                        "stamps": stamps,
+                        "config": raw,
+                    },
+                    f,
+                )
+            os.replace(tmp, self.snapshot_path)
+        except (OSError, TypeError, ValueError):
+            # sem snapshot (ex.: YAML com datas, que o JSON não representa)
+            # o próximo processo só relê o YAML
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+
+    def _load(self) -> tuple:
+        loaded = self._load_snapshot()
+        if not loaded:
+            loaded = self._parse()
+            self._save_snapshot(*loaded)
+        raw, stamps = loaded
+        env = {**dotenv_values(self.env_file), **os.environ}
+        return apply_env(raw, env), stamps
+
+    def changed(self) -> bool:
+        """True se algum arquivo mudou desde a última leitura."""
+        return self._stamps is None or self._stamps != self._current(self._stamps)
+
+    def get(self) -> dict:
+        """
+        Cópia da config atual, relida só se algum arquivo mudou. Numa
+        recarga com erro (ex.: YAML quebrado no meio da edição), a última
+        config válida continua valendo e o erro fica em `last_error`.
+        """
+        reloaded = None
+        with self._lock:
+            if self.changed():
+                first = self._stamps is None
+                try:
+                    self._config, self._stamps = self._load()
+                    self.last_error = None
+                except (ConfigError, OSError, yaml.YAMLError) as e:
+                    if first:
+                        raise ConfigError(str(e)) from e
+                    self.last_error = str(e)
+                    # só tenta de novo quando o arquivo mudar outra vez
+                    self._stamps = self._current(self._stamps)
+                else:
+                    if not first:
+                        self.stats["reloads"] += 1
+                        reloaded = self._config
+            config = copy.deepcopy(self._config)
+        if reloaded is not None:
+            for callback in self._callbacks:
+                callback(copy.deepcopy(reloaded))
+        return config
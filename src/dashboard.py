@@ -2,12 +2,17 @@
 # type: ignore
 
 import json
+import os
+import sys
 
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-import yaml
-from sqlalchemy import create_engine
+
+# `streamlit run src/dashboard.py` só põe `src/` no sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import db  # noqa: E402
+from src.config import ConfigService  # noqa: E402
 
 # --- Configuração da Página ---
 st.set_page_config(page_title="PMO 360° Dashboard", page_icon="📊", layout="wide")
@@ -18,14 +23,14 @@ st.set_page_config(page_title="PMO 360° Dashboard", page_icon="📊", layout="w
 def load_data_from_db():
     """Conecta no DB e carrega todas as tabelas relevantes como DataFrames."""
     try:
-        with open("config/config.yaml", "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
+        config = ConfigService.shared().get()
         db_url = config.get("database_url")
         if not db_url:
             st.error("URL do banco de dados não encontrada.")
             return [pd.DataFrame()] * 3
 
-        engine = create_engine(db_url)
+        db.configure(config)
+        engine = db.get_engine(db_url)
         projects_df = pd.read_sql_table("projects", engine)
         tasks_df = pd.read_sql_table("tasks", engine)
 
@@ -0,0 +1,138 @@
+# src/db.py
+"""
+Fábrica única de engines do SQLAlchemy. CLI, worker, scheduler, lote e
+dashboard abrem o mesmo `projects.db` ao mesmo tempo; por isso há um engine
+(com seu pool de conexões) por URL e por processo, e toda conexão SQLite
+nova recebe os PRAGMAs da seção `database` da config:
+
+- `journal_mode=WAL`: leitores não esperam escritores (e vice-versa);
+- `synchronous=NORMAL`: seguro com WAL e bem mais barato que FULL;
+- `cache_size` / `mmap_size`: cache de páginas e leitura mapeada em memória;
+- `busy_timeout`: a escrita concorrente espera o lock em vez de falhar na
+  hora com "database is locked".
+"""
+
+import os
+import threading
+from typing import Any, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+DEFAULTS: dict[str, Any] = {
+    "busy_timeout_ms": 30000,
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pragmas": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # negativo = KiB (64 MB)
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+    },
+}
+
+_settings: dict = {}
+_engines: dict = {}
+_sessions: dict = {}
+_lock = threading.Lock()
+
+
+def configure(config: dict):
+    """Guarda a seção `database` da config para os próximos engines."""
+    global _settings
+    _settings = (config or {}).get("database") or {}
+
+
+def _merged(settings: Optional[dict] = None) -> dict:
+    settings = _settings if settings is None else settings
+    merged = {**DEFAULTS, **settings}
+    merged["pragmas"] = {**DEFAULTS["pragmas"], **(settings.get("pragmas") or {})}
+    return merged
+
+
+def _in_memory(db_url: str) -> bool:
+    return db_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in db_url
+
+
+def _sqlite_pragmas(engine, pragmas: dict, busy_timeout_ms: int, memory: bool):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+            for name, value in pragmas.items():
+                if memory and name in ("journal_mode", "mmap_size"):
+                    continue  # sem arquivo, não há WAL nem mmap
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def create(db_url: str, settings: Optional[dict] = None):
+    """Engine novo (fora do cache) com pool e PRAGMAs configurados."""
+    settings = _merged(settings)
+    if not db_url.startswith("sqlite"):
+        return create_engine(
+            db_url,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_pre_ping=True,
+        )
+    memory = _in_memory(db_url)
+    connect_args = {
+        # o driver também espera o lock (em segundos) antes do busy_timeout
+        "timeout": settings["busy_timeout_ms"] / 1000,
+        "check_same_thread": False,
+    }
+    if memory:
+        # SQLite em memória: o banco vive na conexão, então o engine usa uma
+        # só (StaticPool) para todas as threads verem as mesmas tabelas
+        engine = create_engine(db_url, connect_args=connect_args, poolclass=StaticPool)
+    else:
+        engine = create_engine(
+            db_url,
+            connect_args=connect_args,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+        )
+    _sqlite_pragmas(engine, settings["pragmas"], settings["busy_timeout_ms"], memory)
+    return engine
+
+
+def get_engine(db_url: str):
+    """
+    Engine compartilhado de `db_url` neste processo (criado na primeira
+    chamada). Processos filhos (pool de processos do lote) criam o seu: as
+    conexões abertas não podem atravessar um fork.
+    """
+    key = (os.getpid(), db_url)
+    engine = _engines.get(key)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = _engines[key] = create(db_url)
+    return engine
+
+
+def get_session(db_url: str):
+    """Sessão nova sobre o engine compartilhado de `db_url`."""
+    engine = get_engine(db_url)
+    factory = _sessions.get(engine)
+    if factory is None:
+        factory = _sessions[engine] = sessionmaker(
+            autocommit=False, autoflush=False, bind=engine
+        )
+    return factory()
+
+
+def dispose_all():
+    """Fecha as conexões de todos os engines deste processo e esquece-os."""
+    with _lock:
+        for (pid, _), engine in list(_engines.items()):
+            if pid == os.getpid():
+                engine.dispose()
+        _engines.clear()
+        _sessions.clear()
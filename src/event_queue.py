@@ -0,0 +1,353 @@
+# src/event_queue.py
+"""
+Fila durável de eventos no banco do projeto (tabela `event_queue`).
+
+Produtores chamam `enqueue`; workers fazem `claim` -> `AgentRouter.route_event`
+-> `ack` (sucesso) ou `fail` (nova tentativa com backoff exponencial, até
+`max_attempts`; depois o evento fica DEAD). Eventos presos em RUNNING por
+mais de `lock_timeout_seconds` (worker que caiu) voltam para a fila.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, cast
+
+from sqlalchemy import CursorResult, func, update
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from utils.tracing import span
+
+DEFAULTS = {
+    "max_depth": 1000,
+    "max_attempts": 5,
+    "backoff_base_seconds": 2.0,
+    "backoff_max_seconds": 300.0,
+    "lock_timeout_seconds": 600.0,
+    "poll_interval_seconds": 1.0,
+    "concurrency": 4,
+}
+
+
+class QueueFull(RuntimeError):
+    """Backpressure: a fila atingiu `max_depth` eventos pendentes."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _updated(session, statement) -> int:
+    """Executa um UPDATE e retorna quantas linhas ele alterou."""
+    return cast(CursorResult, session.execute(statement)).rowcount
+
+
+class EventQueue:
+    def __init__(self, engine, config: Optional[dict] = None):
+        self.settings = {**DEFAULTS, **((config or {}).get("event_queue") or {})}
+        models.QueuedEvent.__table__.create(engine, checkfirst=True)
+        self.Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def enqueue(self, event_type: str, data: Optional[dict] = None) -> int:
+        """Grava o evento e retorna seu id. Levanta QueueFull se a fila estiver cheia."""
+        return self.enqueue_many([(event_type, data)])[0]
+
+    def enqueue_many(self, events: list) -> list:
+        """Grava vários (event_type, data) numa transação só."""
+        with (
+            span("db.write", table="event_queue", op="enqueue", rows=len(events)),
+            self.Session() as session,
+        ):
+            pending = (
+                session.query(func.count(models.QueuedEvent.id))
+                .filter(models.QueuedEvent.status == models.EventStatus.PENDING)
+                .scalar()
+            )
+            if pending + len(events) > self.settings["max_depth"]:
+                raise QueueFull(
+                    f"Fila cheia: {pending} eventos pendentes "
+                    f"(máximo {self.settings['max_depth']})."
+                )
+            now = _utcnow()
+            rows = [
+                models.QueuedEvent(
+                    event_type=event_type,
+                    payload=data or {},
+                    status=models.EventStatus.PENDING,
+                    attempts=0,
+                    available_at=now,
+                )
+                for event_type, data in events
+            ]
+            session.add_all(rows)
+            session.commit()
+            return [row.id for row in rows]
+
+    def claim(self, worker_id: str, limit: int = 1) -> list:
+        """
+        Reserva até `limit` eventos disponíveis para `worker_id`. A reserva é
+        um UPDATE condicional (status ainda PENDING), então dois workers
+        nunca pegam o mesmo evento. Retorna dicts com id, event_type, data
+        e attempts.
+        """
+        claimed: list = []
+        with self.Session() as session:
+            now = _utcnow()
+            candidates = (
+                session.query(models.QueuedEvent.id)
+                .filter(
+                    models.QueuedEvent.status == models.EventStatus.PENDING,
+                    models.QueuedEvent.available_at <= now,
+                )
+                .order_by(models.QueuedEvent.available_at, models.QueuedEvent.id)
+                .limit(limit * 4)
+                .all()
+            )
+            for (event_id,) in candidates:
+                if len(claimed) >= limit:
+                    break
+                taken = _updated(
+                    session,
+                    update(models.QueuedEvent)
+                    .where(
+                        models.QueuedEvent.id == event_id,
+                        models.QueuedEvent.status == models.EventStatus.PENDING,
+                    )
+                    .values(
+                        status=models.EventStatus.RUNNING,
+                        locked_by=worker_id,
+                        locked_at=now,
+                        attempts=models.QueuedEvent.attempts + 1,
+                    ),
+                )
+                session.commit()
+                if taken == 1:
+                    claimed.append(event_id)
+            rows = (
+                session.query(models.QueuedEvent)
+                .filter(models.QueuedEvent.id.in_(claimed))
+                .all()
+                if claimed
+                else []
+            )
+            return [
+                {
+                    "id": row.id,
+                    "event_type": row.event_type,
+                    "data": row.payload or {},
+                    "attempts": row.attempts,
+                }
+                for row in sorted(rows, key=lambda r: claimed.index(r.id))
+            ]
+
+    def ack(self, event_id: int, result: Optional[dict] = None):
+        """Marca o evento como concluído."""
+        self._finish(
+            event_id, status=models.EventStatus.DONE, result=result, last_error=None
+        )
+
+    def fail(self, event_id: int, error: str, result: Optional[dict] = None) -> bool:
+        """
+        Registra a falha. Se ainda houver tentativas, devolve o evento à fila
+        com backoff exponencial (com jitter) e retorna True; senão marca
+        como DEAD e retorna False.
+        """
+        with (
+            span("db.write", table="event_queue", op="fail", rows=1),
+            self.Session() as session,
+        ):
+            row = session.get(models.QueuedEvent, event_id)
+            if row is None:
+                return False
+            retry = row.attempts < self.settings["max_attempts"]
+            row.last_error = str(error)
+            row.result = result
+            row.locked_by = None
+            row.locked_at = None
+            if retry:
+                row.status = models.EventStatus.PENDING
+                row.available_at = _utcnow() + timedelta(
+                    seconds=self.backoff(row.attempts)
+                )
+            else:
+                row.status = models.EventStatus.DEAD
+            session.commit()
+            return retry
+
+    def cancel(self, event_id: int, reason: str) -> bool:
+        """
+        Retira da fila um evento que ainda não foi pego por um worker (fica
+        DEAD com `reason` como erro). Retorna False se ele já começou.
+        """
+        with self.Session() as session:
+            updated = _updated(
+                session,
+                update(models.QueuedEvent)
+                .where(
+                    models.QueuedEvent.id == event_id,
+                    models.QueuedEvent.status == models.EventStatus.PENDING,
+                )
+                .values(status=models.EventStatus.DEAD, last_error=reason),
+            )
+            session.commit()
+            return updated == 1
+
+    def backoff(self, attempts: int) -> float:
+        """Espera antes da próxima tentativa: base * 2^(n-1), limitada, ±25%."""
+        base = self.settings["backoff_base_seconds"] * 2 ** max(0, attempts - 1)
+        delay = min(base, self.settings["backoff_max_seconds"])
+        return delay * random.uniform(0.75, 1.25)
+
+    def requeue_stale(self) -> int:
+        """
+        Devolve à fila eventos RUNNING cujo worker sumiu. Os que já gastaram
+        `max_attempts` (ex.: um evento que derruba o worker) ficam DEAD.
+        Retorna quantos voltaram à fila.
+        """
+        limit = _utcnow() - timedelta(seconds=self.settings["lock_timeout_seconds"])
+        stale = (
+            models.QueuedEvent.status == models.EventStatus.RUNNING,
+            models.QueuedEvent.locked_at < limit,
+        )
+        with self.Session() as session:
+            updated = _updated(
+                session,
+                update(models.QueuedEvent)
+                .where(
+                    *stale,
+                    models.QueuedEvent.attempts < self.settings["max_attempts"],
+                )
+                .values(
+                    status=models.EventStatus.PENDING,
+                    locked_by=None,
+                    locked_at=None,
+                    available_at=_utcnow(),
+                ),
+            )
+            session.execute(
+                update(models.QueuedEvent)
+                .where(*stale)
+                .values(
+                    status=models.EventStatus.DEAD,
+                    locked_by=None,
+                    locked_at=None,
+                    last_error="worker sumiu e as tentativas se esgotaram",
+                )
+            )
+            session.commit()
+            return updated
+
+    def depth(self) -> dict:
+        """Quantidade de eventos por status (pending, running, done, dead)."""
+        with self.Session() as session:
+            counts = dict(
+                session.query(
+                    models.QueuedEvent.status, func.count(models.QueuedEvent.id)
+                )
+                .group_by(models.QueuedEvent.status)
+                .all()
+            )
+        return {
+            status.name.lower(): counts.get(status, 0) for status in models.EventStatus
+        }
+
+    def _finish(self, event_id: int, **values):
+        with (
+            span("db.write", table="event_queue", op="finish", rows=1),
+            self.Session() as session,
+        ):
+            session.execute(
+                update(models.QueuedEvent)
+                .where(models.QueuedEvent.id == event_id)
+                .values(locked_by=None, locked_at=None, **values)
+            )
+            session.commit()
+
+
+def summarize(results: dict) -> dict:
+    """Resultado gravado na fila: erro e duração de cada etapa (sem o texto)."""
+    return {
+        step: {"error": r["error"], "seconds": round(r["seconds"], 3)}
+        for step, r in results.items()
+    }
+
+
+def process_one(queue: EventQueue, router, worker_id: str) -> bool:
+    """
+    Pega um evento e o roteia. O evento falha (e é reenfileirado) se o
+    roteamento levantar exceção ou alguma etapa terminar com erro; as
+    etapas que já deram certo saem do cache de LLM na nova tentativa.
+    Retorna False se não havia evento disponível.
+    """
+    claimed = queue.claim(worker_id)
+    if not claimed:
+        return False
+    event = claimed[0]
+    try:
+        results = router.route_event(event["event_type"], event["data"])
+    except Exception as e:
+        queue.fail(event["id"], str(e))
+        return True
+    errors = [f"{step}: {r['error']}" for step, r in results.items() if r["error"]]
+    if errors:
+        queue.fail(event["id"], "; ".join(errors), summarize(results))
+    else:
+        queue.ack(event["id"], summarize(results))
+    return True
+
+
+def run_workers(
+    queue: EventQueue,
+    router,
+    concurrency: Optional[int] = None,
+    stop_when_empty: bool = False,
+    stop_event: Optional[threading.Event] = None,
+    on_tick=None,
+) -> threading.Event:
+    """
+    Sobe `concurrency` threads que drenam a fila até `stop_event` ser
+    acionado (ou, com `stop_when_empty`, até não haver nada pendente nem em
+    execução). Bloqueia até as threads terminarem e retorna o `stop_event`.
+    `on_tick()`, se passado, é chamado pela thread principal a cada
+    `poll_interval_seconds` (ex.: para exibir a profundidade da fila).
+    """
+    concurrency = max(1, int(concurrency or queue.settings["concurrency"]))
+    poll = float(queue.settings["poll_interval_seconds"])
+    stop_event = stop_event or threading.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    queue.requeue_stale()
+
+    def loop(n: int):
+        worker_id = f"{prefix}:{n}"
+        while not stop_event.is_set():
+            if process_one(queue, router, worker_id):
+                continue
+            if stop_when_empty:
+                depth = queue.depth()
+                if depth["pending"] == 0 and depth["running"] == 0:
+                    stop_event.set()
+                    break
+            stop_event.wait(poll)
+
+    threads = [
+        threading.Thread(target=loop, args=(n,), name=f"queue-worker-{n}", daemon=True)
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    next_tick = 0.0
+    try:
+        while any(thread.is_alive() for thread in threads):
+            if on_tick and time.monotonic() >= next_tick:
+                on_tick()
+                next_tick = time.monotonic() + poll
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        stop_event.set()
+    for thread in threads:
+        thread.join()
+    return stop_event
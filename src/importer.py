@@ -0,0 +1,282 @@
+# src/importer.py
+"""
+Importação em massa de projetos e tarefas a partir de CSV ou JSONL, em
+fluxo: as linhas passam por uma cadeia de geradores (leitura -> conversão
+-> blocos) e cada bloco vira poucos INSERTs em lote (executemany), então a
+memória não cresce com o tamanho do arquivo. Só o mapa slug -> id dos
+projetos fica em memória.
+
+Cada linha é uma tarefa com as colunas do seu projeto (CSV "achatado"):
+
+    project,project_type,country,status,task,dor,dod,estimate,start_date,...
+
+Uma linha sem `task` só declara o projeto. No JSONL, um projeto também pode
+trazer suas tarefas aninhadas em "tasks": [{...}, ...]. O slug vem da
+coluna `slug` ou do nome do projeto (`utils.slug.slugify`).
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Optional
+
+from sqlalchemy import insert, select
+
+from src import models
+from utils.slug import legacy_aliases, slugify
+
+# on_existing: o que fazer com linhas de um projeto que já está no banco
+SKIP = "skip"  # ignora (reimportar o mesmo arquivo não duplica nada)
+ATTACH = "attach"  # acrescenta as tarefas ao projeto existente
+
+_TASK_COLUMNS = (
+    "project_id",
+    "template",
+    "dependencies",
+    "start_date",
+    "end_date",
+    "mode",
+    "percent_done",
+    "raci",
+    "dor",
+    "dod",
+    "estimate",
+    "risk_score",
+)
+_MAX_ERROR_SAMPLES = 10
+
+
+class RowError(ValueError):
+    """Linha que não pode ser importada (o resto do arquivo segue)."""
+
+
+def read_rows(path: str, fmt: Optional[str] = None):
+    """
+    Gera (número da linha, dict) de um CSV ou JSONL, lendo linha a linha.
+    O formato vem de `fmt` ou da extensão do arquivo.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt in ("jsonl", "ndjson", "json"):
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, RowError(f"JSON inválido: {e.msg}")
+                    continue
+                if not isinstance(row, dict):
+                    yield line_no, RowError("esperado um objeto JSON por linha")
+                    continue
+                nested = row.pop("tasks", None)
+                if isinstance(nested, list):
+                    yield line_no, row
+                    for task in nested:
+                        yield line_no, {**row, **task}
+                else:
+                    yield line_no, row
+        else:
+            raise ValueError(f"Formato não suportado: '{fmt}' (use csv ou jsonl)")
+
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _number(value, field: str):
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        raise RowError(f"'{field}' não é um número: {value!r}") from None
+
+
+def _date(value, field: str):
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise RowError(f"'{field}' não é uma data ISO: {value!r}") from None
+
+
+def _list(value):
+    if value is None or isinstance(value, list):
+        return value
+    value = _text(value)
+    if value is None:
+        return None
+    if value.startswith("["):
+        return json.loads(value)
+    return [part.strip() for part in value.split(";") if part.strip()]
+
+
+def _enum(enum_cls, value, field: str, default):
+    value = _text(value)
+    if value is None:
+        return default
+    for member in enum_cls:
+        if value.lower() in (member.name.lower(), member.value.lower()):
+            return member
+    raise RowError(f"'{field}' desconhecido: {value!r}")
+
+
+def parse_row(row: dict) -> tuple:
+    """
+    Converte uma linha em (projeto, tarefa ou None). Levanta RowError se
+    faltar o projeto ou algum valor não puder ser convertido.
+    """
+    name = _text(row.get("project") or row.get("project_name") or row.get("name"))
+    slug = slugify(row.get("slug") or name or "")
+    if not slug:
+        raise RowError("linha sem projeto (colunas 'project' ou 'slug')")
+    project = {
+        "slug": slug,
+        "name": name or slug,
+        "project_type": _text(row.get("project_type")),
+        "country": _text(row.get("country")),
+        "status": _enum(
+            models.ProjectStatus,
+            row.get("status"),
+            "status",
+            models.ProjectStatus.PLANNING,
+        ),
+    }
+    template = _text(row.get("task") or row.get("template"))
+    if template is None:
+        return project, None
+    task = {
+        "template": template,
+        "dependencies": _list(row.get("dependencies")),
+        "start_date": _date(row.get("start_date"), "start_date"),
+        "end_date": _date(row.get("end_date"), "end_date"),
+        "mode": _enum(models.TaskMode, row.get("mode"), "mode", models.TaskMode.AUTO),
+        "percent_done": _number(row.get("percent_done"), "percent_done") or 0.0,
+        "raci": row.get("raci") if isinstance(row.get("raci"), dict) else None,
+        "dor": _text(row.get("dor")),
+        "dod": _text(row.get("dod")),
+        "estimate": _number(row.get("estimate"), "estimate"),
+        "risk_score": _number(row.get("risk_score"), "risk_score"),
+    }
+    return project, task
+
+
+def parse_rows(rows, stats: dict[str, Any]):
+    """Gera (projeto, tarefa) das linhas válidas; as inválidas vão para `stats`."""
+    for line_no, row in rows:
+        stats["rows"] += 1
+        try:
+            if isinstance(row, RowError):
+                raise row
+            yield parse_row(row)
+        except (RowError, json.JSONDecodeError) as e:
+            stats["errors"] += 1
+            if len(stats["error_samples"]) < _MAX_ERROR_SAMPLES:
+                stats["error_samples"].append(f"linha {line_no}: {e}")
+
+
+def chunked(iterable, size: int):
+    """Gera listas de até `size` itens, sem materializar o iterável."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def import_file(
+    session,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = 1000,
+    on_existing: str = SKIP,
+    dry_run: bool = False,
+    on_progress=None,
+) -> dict:
+    """
+    Importa o arquivo em blocos de `chunk_size` linhas: por bloco, um
+    INSERT em lote dos projetos novos, um SELECT dos ids deles e um INSERT
+    em lote das tarefas, seguidos de commit. Projetos cujo slug já existe
+    no banco seguem `on_existing` (skip ou attach). Com `dry_run`, só lê e
+    valida. Retorna {"rows", "projects", "tasks", "skipped", "errors",
+    "error_samples", "seconds"}.
+    """
+    if on_existing not in (SKIP, ATTACH):
+        raise ValueError(f"on_existing deve ser '{SKIP}' ou '{ATTACH}'")
+    start = time.perf_counter()
+    stats: dict[str, Any] = {
+        "rows": 0,
+        "projects": 0,
+        "tasks": 0,
+        "skipped": 0,
+        "errors": 0,
+        "error_samples": [],
+    }
+    # slug -> id de todos os projetos; os que já existiam ficam em `existing`
+    ids = dict(session.execute(select(models.Project.slug, models.Project.id)).all())
+    existing = set(ids)
+    # projetos criados com o slug antigo, acentuado (`utils.slug.legacy_slug`)
+    aliases = legacy_aliases(ids)
+
+    reported = 0
+    for chunk in chunked(parse_rows(read_rows(path, fmt), stats), chunk_size):
+        new_projects: dict = {}
+        tasks: list = []
+        for project, task in chunk:
+            slug = project["slug"] = aliases.get(project["slug"], project["slug"])
+            if slug in existing and on_existing == SKIP:
+                stats["skipped"] += 1
+                continue
+            if slug not in ids and slug not in new_projects:
+                new_projects[slug] = project
+            if task is not None:
+                tasks.append((slug, task))
+
+        stats["projects"] += len(new_projects)
+        stats["tasks"] += len(tasks)
+        if dry_run:
+            ids.update(dict.fromkeys(new_projects))
+        else:
+            if new_projects:
+                session.execute(insert(models.Project), list(new_projects.values()))
+                ids.update(
+                    session.execute(
+                        select(models.Project.slug, models.Project.id).where(
+                            models.Project.slug.in_(list(new_projects))
+                        )
+                    ).all()
+                )
+            if tasks:
+                session.execute(
+                    insert(models.Task),
+                    [
+                        {
+                            **dict.fromkeys(_TASK_COLUMNS),
+                            **task,
+                            "project_id": ids[slug],
+                        }
+                        for slug, task in tasks
+                    ],
+                )
+            session.commit()
+        if on_progress:
+            on_progress(stats["rows"] - reported)
+            reported = stats["rows"]
+
+    if on_progress and stats["rows"] > reported:
+        on_progress(stats["rows"] - reported)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,142 @@
+# src/loadgen.py
+"""
+Gerador de carga offline: reproduz um trace de eventos (JSONL) pelo
+`AgentRouter.route_event` a uma taxa alvo, usando o provedor "mock"
+(ver `utils.mock_provider`), e mede latência, vazão e erros.
+
+Formato do trace, uma linha por evento:
+    {"event_type": "NEW_PROJECT_CREATED", "data": {"name": "...", ...}}
+"""
+
+import contextlib
+import copy
+import io
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+def load_trace(path: str) -> list:
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            event = json.loads(line)
+            if "event_type" not in event:
+                raise ValueError(f"Linha {line_no}: campo 'event_type' ausente.")
+            events.append(event)
+    return events
+
+
+def mock_config(
+    config: dict,
+    latency_ms: Optional[float] = None,
+    error_rate: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    Cópia da config apontando toda a cadeia para o provedor mock, sem cache
+    de respostas (senão só a primeira rodada mediria algo) e sem gravar o
+    snapshot de saúde dos provedores reais: com `snapshot_path` nulo o mock
+    ganha um `HealthRegistry` próprio (ver `HealthRegistry.shared`).
+    """
+    cfg = copy.deepcopy(config)
+    mock = cfg.setdefault("mock_provider", {})
+    if latency_ms is not None:
+        mock["latency_ms"] = {"distribution": "fixed", "value": latency_ms}
+    if error_rate is not None:
+        mock["error_rate"] = error_rate
+    if seed is not None:
+        mock["seed"] = seed
+    cfg["fallback_chain"] = ["mock"]
+    cfg["llm_cache"] = {"enabled": False}
+    cfg.setdefault("provider_health", {})["snapshot_path"] = None
+    return cfg
+
+
+def percentile(values: list, pct: float) -> float:
+    """Percentil por interpolação linear (pct entre 0 e 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100.0
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def _summary(values: list) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def replay(
+    router, events: list, rate: float, concurrency: int = 8, quiet: bool = True
+) -> dict:
+    """
+    Dispara os eventos em "loop aberto": o evento i é agendado para
+    i / rate segundos após o início, independentemente de os anteriores
+    já terem terminado. A latência é medida a partir do horário agendado,
+    então o tempo de fila também entra na conta.
+    """
+    interval = 1.0 / rate if rate > 0 else 0.0
+    lock = threading.Lock()
+    event_latencies, step_latencies = [], []
+    failed_events, failed_steps = 0, 0
+    error_messages: Counter = Counter()
+
+    def run_one(event, scheduled):
+        nonlocal failed_events, failed_steps
+        try:
+            results = router.route_event(event["event_type"], event.get("data") or {})
+            crash = None
+        except Exception as e:
+            results, crash = {}, e
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            event_latencies.append(elapsed)
+            step_errors = [r["error"] for r in results.values() if r["error"]]
+            step_latencies.extend(r["seconds"] for r in results.values())
+            failed_steps += len(step_errors)
+            if crash or step_errors:
+                failed_events += 1
+            error_messages.update(step_errors)
+            if crash:
+                error_messages[str(crash)] += 1
+
+    output = io.StringIO() if quiet else None
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(output))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=max(1, concurrency), thread_name_prefix="loadgen"
+        ) as pool:
+            for i, event in enumerate(events):
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(run_one, event, scheduled)
+        duration = time.perf_counter() - start
+
+    return {
+        "events": len(events),
+        "duration_s": duration,
+        "target_rate": rate,
+        "throughput": len(events) / duration if duration else 0.0,
+        "event_latency": _summary(event_latencies),
+        "step_latency": _summary(step_latencies),
+        "failed_events": failed_events,
+        "failed_steps": failed_steps,
+        "top_errors": error_messages.most_common(5),
+    }
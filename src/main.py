@@ -1,135 +1,40 @@
-import os
-import re
+# src/main.py
+"""
+CLI do Productivity Engine. Este módulo só declara os comandos (nomes,
+opções e ajuda); cada um importa a sua implementação em `src/commands/`
+ao rodar. Assim `--help` e os comandos leves não importam SQLAlchemy,
+pandas, os agentes e os SDKs de LLM (ver tests/test_startup.py).
+"""
+
 import subprocess
 
-from dotenv import load_dotenv
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 import typer
-import yaml
-
-from agents.brand_kit_bot import BrandKitBot
-from agents.decision_supporter import DecisionSupporter
-from agents.notion_writer import NotionWriter
-from agents.schedule_copilot import ScheduleCopilot
-from agents.stakeholder_graph_bot import StakeholderGraphBot
-
-import models  # noqa: F401  (mantido para compatibilidade)
 
 # ---------------------------------------------------------------------
 # Bootstrap
 # ---------------------------------------------------------------------
-load_dotenv()  # carrega variáveis de ambiente apenas uma vez
-console = Console()
 app = typer.Typer(help="🚀 Productivity Engine – PMO Digital 360°")
 
-# ---------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------
-def get_config() -> dict:
-    """
-    Lê config/config.yaml e, se existirem variáveis de ambiente
-    correspondentes, sobrescreve as chaves sensíveis.
-    """
-    try:
-        with open("config/config.yaml", "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
-    except FileNotFoundError:
-        console.print("[bold red]Erro:[/bold red] 'config.yaml' não encontrado.")
-        raise typer.Exit(1)
-    except Exception as e:
-        console.print(f"[bold red]Erro ao ler config:[/bold red] {e}")
-        raise typer.Exit(1)
-
-    # --- Override por .env ---
-    env_map = {
-        "api_keys.openai": "OPENAI_API_KEY",
-        "api_keys.google_gemini": "GEMINI_API_KEY",
-        "api_keys.notion": "NOTION_TOKEN",
-    }
-    for dotted_key, env_var in env_map.items():
-        env_val = os.getenv(env_var)
-        if env_val:
-            ref = cfg
-            *parents, leaf = dotted_key.split(".")
-            for key in parents:
-                ref = ref.setdefault(key, {})
-            ref[leaf] = env_val
-
-    return cfg
-
-
-def get_db_session(db_url: str):
-    engine = create_engine(db_url)
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
-
 
 # ---------------------------------------------------------------------
-# Comandos dos Agentes
+# Projetos e agentes
 # ---------------------------------------------------------------------
-@app.command(
-    help="✨ Cria um novo projeto e seu cronograma de tarefas no DB e Notion."
-)
+@app.command(help="✨ Cria um novo projeto e seu cronograma de tarefas no DB e Notion.")
 def new_project(
     name: str,
     project_type: str = typer.Option("default", help="Tipo de projeto"),
     country: str = typer.Option("Brasil", help="País"),
     dry_run: bool = typer.Option(False, help="Não chamar APIs (simulação)"),
+    analyze: bool = typer.Option(
+        True, help="Dispara a análise (NEW_PROJECT_CREATED) já no início."
+    ),
+    wait: bool = typer.Option(
+        False, help="Roda a análise neste processo e espera por ela no fim."
+    ),
 ) -> None:
-    console.print(f"✨ Iniciando criação do projeto: [bold green]{name}[/bold green]")
-    config = get_config()
-    db_session = get_db_session(config.get("database_url"))
-    try:
-        writer = NotionWriter(
-            token=config["api_keys"]["notion"],
-            projects_db_id=config["notion_db"]["projects_db_id"],
-            tasks_db_id=config["notion_db"]["tasks_db_id"],
-        )
-        scheduler = ScheduleCopilot(config=config, model_mapping=config.get("model_mapping", {}))
-        slug = re.sub(r"[^\w-]", "", name.lower().replace(" ", "-"))
-        project_data = {
-            "slug": slug,
-            "name": name,
-            "type": project_type,
-            "country": country,
-        }
-        notion_page_id = writer.create_project_page(project_data)
-        db_project = models.Project(
-            name=name,
-            slug=slug,
-            project_type=project_type,
-            country=country,
-            status=models.ProjectStatus.PLANNING,
-            notion_page_id=notion_page_id,
-        )
-        db_session.add(db_project)
-        db_session.flush()
-
-        tasks = scheduler.generate_schedule(project_type)
-        for task_item in tasks:
-            writer.create_task_page(task_item, project_relation_id=notion_page_id)
-            db_task = models.Task(
-                project_id=db_project.id,
-                template=task_item["name"],
-                dor=task_item["dor"],
-                dod=task_item["dod"],
-                estimate=task_item.get("estimate", 0),
-            )
-            db_session.add(db_task)
-
-        db_session.commit()
-        console.print(
-            f"✅ Projeto '{name}' e tarefas sincronizados com sucesso! "
-            f"Slug: [bold cyan]{slug}[/bold cyan]"
-        )
-    except Exception as e:
-        console.print(f"[bold red]Falha na criação do projeto: {e}[/bold red]")
-        db_session.rollback()
-    finally:
-        db_session.close()
+    from src.commands import projects
+
+    projects.new_project(name, project_type, country, dry_run, analyze, wait)
 
 
 @app.command(help="🤔 Analisa prós, contras e riscos de uma decisão estratégica.")
@@ -137,90 +42,187 @@ def support_decision(
     project_slug: str = typer.Argument(..., help="O 'slug' do projeto."),
     decision: str = typer.Argument(..., help="A decisão a ser analisada."),
 ):
-    config = get_config()
-    db_session = get_db_session(config.get("database_url"))
-    try:
-        project = db_session.query(models.Project).filter_by(slug=project_slug).first()
-        if not project:
-            console.print(f"[bold red]Erro:[/bold_red] Projeto '{project_slug}' não encontrado.")
-            return
-        supporter = DecisionSupporter(api_key=config["api_keys"]["google_gemini"])
-        analysis = supporter.analyze_trade_offs(project, decision)
-        console.print(f"\n--- Análise da Decisão: '{decision}' ---\n{analysis}\n" + "-" * 50)
-    except Exception as e:
-        console.print(f"[bold red]Falha na análise de decisão: {e}[/bold red]")
-    finally:
-        db_session.close()
+    from src.commands import projects
+
+    projects.support_decision(project_slug, decision)
 
 
 @app.command(help="🗺️  Mapeia os stakeholders de um projeto.")
-def map_stakeholders(project_slug: str = typer.Argument(..., help="O 'slug' do projeto.")):
-    config = get_config()
-    db_session = get_db_session(config.get("database_url"))
-    try:
-        project = db_session.query(models.Project).filter_by(slug=project_slug).first()
-        if not project:
-            console.print(f"[bold red]Erro:[/bold_red] Projeto '{project_slug}' não encontrado.")
-            return
-        mapper = StakeholderGraphBot(api_key=config["api_keys"]["google_gemini"])
-        stakeholders = mapper.map_stakeholders(project)
-        table = Table(
-            title=f"Stakeholders: {project.name}",
-            show_header=True,
-            header_style="bold green",
-        )
-        table.add_column("Stakeholder", style="dim", width=25)
-        table.add_column("Influência")
-        table.add_column("Interesse")
-        table.add_column("Estratégia", width=50)
-        for sh in stakeholders:
-            table.add_row(sh["stakeholder"], sh["influence"], sh["interest"], sh["engagement"])
-        console.print(table)
-    finally:
-        db_session.close()
+def map_stakeholders(
+    project_slug: str = typer.Argument(..., help="O 'slug' do projeto.")
+):
+    from src.commands import projects
+
+    projects.map_stakeholders(project_slug)
 
 
 @app.command(help="🎨 Gera um kit de identidade de marca para um projeto.")
-def generate_brand(project_slug: str = typer.Argument(..., help="O 'slug' do projeto.")):
-    config = get_config()
-    db_session = get_db_session(config.get("database_url"))
-    try:
-        project = db_session.query(models.Project).filter_by(slug=project_slug).first()
-        if not project:
-            console.print(f"[bold red]Erro:[/bold_red] Projeto '{project_slug}' não encontrado.")
-            return
-        brander = BrandKitBot(api_key=config["api_keys"]["google_gemini"])
-        kit = brander.generate_kit(project)
-        slogan = kit.get("slogan", "N/A")
-        mission = kit.get("mission_statement", "N/A")
-        palette = kit.get("color_palette", [])
-        colors_str = "\n".join(f"[{c.split()[0]}]███[/] {c}" for c in palette)
-        panel = Panel(
-            f"[bold]Slogan:[/bold] {slogan}\n\n"
-            f"[bold]Missão:[/bold] {mission}\n\n"
-            f"[bold]Paleta de Cores:[/bold]\n{colors_str}",
-            title=f"Kit de Marca: {project.name}",
-            border_style="yellow",
-        )
-        console.print(panel)
-    finally:
-        db_session.close()
+def generate_brand(
+    project_slug: str = typer.Argument(..., help="O 'slug' do projeto.")
+):
+    from src.commands import projects
+
+    projects.generate_brand(project_slug)
+
+
+# ---------------------------------------------------------------------
+# Observabilidade
+# ---------------------------------------------------------------------
+@app.command(help="🩺 Mostra a saúde dos provedores de LLM (circuito e latência).")
+def provider_health():
+    from src.commands import observability
+
+    observability.provider_health()
+
+
+@app.command(help="🔎 Resume os spans gravados: onde o tempo de cada evento foi gasto.")
+def trace_summary(
+    path: str = typer.Option(None, help="Arquivo de spans (padrão: tracing.path)."),
+    top: int = typer.Option(10, help="Quantos spans mais lentos listar."),
+    name: str = typer.Option(None, help="Só spans cujo nome começa com este prefixo."),
+):
+    from src.commands import observability
+
+    observability.trace_summary(path, top, name)
+
+
+# ---------------------------------------------------------------------
+# Workflows
+# ---------------------------------------------------------------------
+@app.command(
+    help="🏋️  Reproduz um trace de eventos com o provedor mock e mede a carga."
+)
+def load_test(
+    trace: str = typer.Argument(..., help="Arquivo JSONL de eventos."),
+    rate: float = typer.Option(10.0, help="Eventos por segundo (0 = sem pausa)."),
+    concurrency: int = typer.Option(8, help="Eventos processados em paralelo."),
+    repeat: int = typer.Option(1, help="Quantas vezes repetir o trace."),
+    latency_ms: float = typer.Option(None, help="Latência fixa do mock (ms)."),
+    error_rate: float = typer.Option(None, help="Fração de chamadas que falham."),
+    seed: int = typer.Option(None, help="Seed do mock (reprodutibilidade)."),
+):
+    from src.commands import workflows
+
+    workflows.load_test(trace, rate, concurrency, repeat, latency_ms, error_rate, seed)
+
+
+@app.command(
+    help="🔁 Roda um workflow para um projeto, reaproveitando etapas inalteradas."
+)
+def run_workflow(
+    slug: str = typer.Argument(..., help="Slug do projeto."),
+    event: str = typer.Option("NEW_PROJECT_CREATED", help="Evento do workflow."),
+    force: bool = typer.Option(False, help="Recalcula todas as etapas."),
+    mock: bool = typer.Option(False, help="Usa o provedor mock (sem rede)."),
+):
+    from src.commands import workflows
+
+    workflows.run_workflow(slug, event, force, mock)
+
+
+@app.command(help="📦 Roda um agente ou workflow sobre vários projetos do portfólio.")
+def batch(
+    agent: str = typer.Option(None, help="Agente (nome do model_mapping)."),
+    event: str = typer.Option(None, help="Workflow (ex.: NEW_PROJECT_CREATED)."),
+    project_type: str = typer.Option(None, help="Filtra pelo tipo de projeto."),
+    country: str = typer.Option(None, help="Filtra pelo país."),
+    status: str = typer.Option(None, help="Filtra pelo status (ex.: Active)."),
+    workers: int = typer.Option(4, help="Projetos em paralelo (modo workflow)."),
+    processes: bool = typer.Option(False, help="Usa processos em vez de threads."),
+    chunk_size: int = typer.Option(25, help="Projetos por lote (modo agente)."),
+    force: bool = typer.Option(False, help="Recalcula saídas já guardadas."),
+    mock: bool = typer.Option(False, help="Usa o provedor mock (sem rede)."),
+):
+    from src.commands import workflows
+
+    workflows.batch(
+        agent,
+        event,
+        project_type,
+        country,
+        status,
+        workers,
+        processes,
+        chunk_size,
+        force,
+        mock,
+    )
+
+
+# ---------------------------------------------------------------------
+# Fila de eventos
+# ---------------------------------------------------------------------
+@app.command(help="📥 Enfileira eventos para os workers (um só ou um trace JSONL).")
+def enqueue(
+    event_type: str = typer.Argument(None, help="Tipo do evento."),
+    data: str = typer.Option("{}", help="Payload do evento em JSON."),
+    trace: str = typer.Option(None, help="Arquivo JSONL com vários eventos."),
+):
+    from src.commands import events
+
+    events.enqueue(event_type, data, trace)
+
+
+@app.command(help="👷 Processa a fila de eventos com um pool de workers.")
+def worker(
+    concurrency: int = typer.Option(None, help="Eventos processados em paralelo."),
+    drain: bool = typer.Option(False, help="Sai quando a fila esvaziar."),
+    mock: bool = typer.Option(False, help="Usa o provedor mock (sem rede)."),
+    force: bool = typer.Option(False, help="Recalcula etapas já guardadas."),
+):
+    from src.commands import events
+
+    events.worker(concurrency, drain, mock, force)
+
+
+@app.command(help="📋 Mostra a profundidade da fila de eventos.")
+def queue_status():
+    from src.commands import events
+
+    events.queue_status()
+
+
+# ---------------------------------------------------------------------
+# Banco de dados
+# ---------------------------------------------------------------------
+@app.command(help="🚦 Recalcula a prioridade das tarefas pelas regras do rules.yaml.")
+def prioritize(
+    dry_run: bool = typer.Option(False, help="Só calcula, sem gravar no banco."),
+):
+    from src.commands import data
+
+    data.prioritize(dry_run)
+
+
+@app.command(
+    name="import",
+    help="📥 Importa projetos e tarefas em massa de um CSV ou JSONL.",
+)
+def import_data(
+    path: str = typer.Argument(..., help="Arquivo .csv ou .jsonl."),
+    fmt: str = typer.Option(None, "--format", help="csv ou jsonl (padrão: extensão)."),
+    chunk_size: int = typer.Option(1000, help="Linhas por INSERT em lote/commit."),
+    on_existing: str = typer.Option(
+        "skip", help="Projeto que já existe: skip (ignora) ou attach."
+    ),
+    dry_run: bool = typer.Option(False, help="Só lê e valida, sem gravar."),
+):
+    from src.commands import data
+
+    data.import_data(path, fmt, chunk_size, on_existing, dry_run)
 
 
 @app.command(help="📊 Inicia o dashboard visual de projetos.")
 def dashboard():
-    console.print("📊 Lançando o dashboard de projetos...")
+    typer.echo("📊 Lançando o dashboard de projetos...")
     subprocess.run(["streamlit", "run", "src/dashboard.py"], check=False)
 
 
 @app.command(help="⚙️  Cria o arquivo de banco de dados e as tabelas.")
 def init_db():
-    console.print("⚙️  Inicializando o banco de dados...")
-    config = get_config()
-    db_url = config.get("database_url")
-    engine = create_engine(db_url)
-    models.create_db_and_tables(engine)
-    console.print("✅ Banco de dados inicializado com sucesso!")
+    from src.commands import data
+
+    data.init_db()
 
 
 # ---------------------------------------------------------------------
@@ -2,7 +2,18 @@
 # type: ignore
 import enum
 
-from sqlalchemy import JSON, Column, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
@@ -51,6 +62,8 @@ class Task(Base):
     dor = Column(String)
     dod = Column(String)
     estimate = Column(Float)  # <-- COLUNA ADICIONADA AQUI
+    risk_score = Column(Float)  # 0 a 10
+    priority = Column(String, index=True)  # calculada pelas regras `priorities`
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     project = relationship("Project", back_populates="tasks")
@@ -82,5 +95,45 @@ class Capacity(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
 
+class EventStatus(enum.Enum):
+    PENDING = "Pending"
+    RUNNING = "Running"
+    DONE = "Done"
+    DEAD = "Dead"  # esgotou as tentativas
+
+
+class QueuedEvent(Base):
+    """Evento na fila durável processada pelos workers (ver src/event_queue.py)."""
+
+    __tablename__ = "event_queue"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON)
+    status = Column(Enum(EventStatus), default=EventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, nullable=False)  # só pode ser pego a partir daqui
+    locked_by = Column(String)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    result = Column(JSON)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    __table_args__ = (Index("ix_event_queue_claim", "status", "available_at"),)
+
+
+class StepOutput(Base):
+    """Saída de uma etapa de workflow, indexada pela impressão digital das entradas."""
+
+    __tablename__ = "step_outputs"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    fingerprint = Column(String(64), unique=True, nullable=False)
+    project_key = Column(String, index=True)  # slug (ou nome) do projeto
+    step = Column(String, nullable=False)
+    agent = Column(String)
+    model = Column(String)
+    output = Column(Text)
+    created_at = Column(DateTime, default=func.now())
+
+
 def create_db_and_tables(engine):
     Base.metadata.create_all(engine)
@@ -0,0 +1,147 @@
+# src/priorities.py
+"""
+Priorização das tarefas pelas regras `priorities` do rules.yaml, avaliadas
+de forma vetorizada (`utils.rule_compiler`) sobre todas as tarefas de uma
+vez. Usado pelo comando `prioritize` e pelo agendador.
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text, update
+
+from src import models
+from utils.rule_compiler import assign_levels
+from utils.tracing import span
+
+_FRAME_COLUMNS = (
+    "id",
+    "project_id",
+    "template",
+    "risk_score",
+    "percent_done",
+    "estimate",
+    "end_date",
+    "dependencies",
+    "priority",
+)
+
+# Colunas acrescentadas a `tasks` depois da primeira versão do schema
+_TASK_COLUMNS = {"risk_score": "FLOAT", "priority": "VARCHAR"}
+
+
+def ensure_task_columns(engine):
+    """
+    Acrescenta a bancos antigos as colunas usadas pela priorização e o
+    índice de `priority` que o modelo declara (o ALTER TABLE não o cria).
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(models.Task.__tablename__):
+        return
+    existing = {c["name"] for c in inspector.get_columns(models.Task.__tablename__)}
+    with engine.begin() as conn:
+        for name, sql_type in _TASK_COLUMNS.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE tasks ADD COLUMN {name} {sql_type}"))
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_tasks_priority ON tasks (priority)")
+        )
+
+
+def _as_list(deps) -> list:
+    """Dependências vêm como texto JSON (SQLite), lista (Postgres) ou nulas."""
+    if isinstance(deps, str):
+        deps = json.loads(deps)
+    return deps if isinstance(deps, list) else []
+
+
+def tasks_frame(session, now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Uma linha por tarefa, com as colunas que as regras podem usar:
+    risk_score, percent_done, estimate, due_date_days (dias até o fim
+    previsto; negativo se atrasada), status (done, unlocked ou locked:
+    "unlocked" quando todas as dependências já foram concluídas) e a
+    prioridade atual.
+    """
+    # cursor DBAPI direto: sem o ORM convertendo datas e JSON linha a linha;
+    # as conversões são feitas de uma vez pelo pandas logo abaixo
+    columns = list(_FRAME_COLUMNS)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {models.Task.__tablename__}")
+        frame = pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        cursor.close()
+    frame["dependencies"] = [_as_list(deps) for deps in frame["dependencies"]]
+    for column in ("risk_score", "percent_done", "estimate"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    now = now or datetime.now()
+    end = pd.to_datetime(frame["end_date"], errors="coerce")
+    frame["due_date_days"] = (end - pd.Timestamp(now)).dt.total_seconds() / 86400
+
+    done = frame["percent_done"].fillna(0).to_numpy() >= 100
+    # dependências podem ser ids ou nomes de template do mesmo projeto
+    finished = set()
+    for project_id, task_id, template in frame.loc[
+        done, ["project_id", "id", "template"]
+    ].itertuples(index=False):
+        finished.add((project_id, task_id))
+        finished.add((project_id, template))
+    unlocked = np.fromiter(
+        (
+            all((project_id, dep) in finished for dep in deps)
+            for project_id, deps in zip(frame["project_id"], frame["dependencies"])
+        ),
+        dtype=bool,
+        count=len(frame),
+    )
+    frame["status"] = np.where(done, "done", np.where(unlocked, "unlocked", "locked"))
+    return frame
+
+
+def prioritize(
+    session, rules: dict, now: Optional[datetime] = None, write: bool = True
+) -> dict:
+    """
+    Calcula a prioridade de todas as tarefas em aberto (as concluídas ficam
+    sem prioridade) e grava, num único UPDATE em lote, só as que mudaram.
+    Retorna {"tasks", "changed", "counts", "seconds"}.
+    """
+    start = time.perf_counter()
+    frame = tasks_frame(session, now=now)
+    levels = assign_levels(
+        frame, rules.get("priorities") or [], default=rules.get("default_priority")
+    )
+    levels[frame["status"].to_numpy() == "done"] = None
+
+    # o pandas converte None em NaN em colunas de texto: normaliza para None
+    current = frame["priority"].astype(object).where(frame["priority"].notna(), None)
+    current = current.to_numpy(dtype=object)
+    changed = np.fromiter(
+        (a != b for a, b in zip(levels, current)), dtype=bool, count=len(frame)
+    )
+    if write and changed.any():
+        with span("db.write", table="tasks", op="prioritize", rows=int(changed.sum())):
+            session.execute(
+                update(models.Task),
+                [
+                    {"id": int(task_id), "priority": level}
+                    for task_id, level in zip(frame["id"][changed], levels[changed])
+                ],
+            )
+            session.commit()
+
+    counts = pd.Series(levels, dtype=object).value_counts(dropna=False)
+    return {
+        "tasks": len(frame),
+        "changed": int(changed.sum()),
+        "counts": {
+            (level if isinstance(level, str) else None): int(n)
+            for level, n in counts.items()
+        },
+        "seconds": time.perf_counter() - start,
+    }
@@ -1,44 +1,98 @@
 # src/scheduler.py
 # type: ignore
-import yaml
 from apscheduler.schedulers.blocking import BlockingScheduler
 from rich.console import Console
+from sqlalchemy.orm import sessionmaker
 
+from agents.agent_pool import AgentPool
 from agents.backup_job import BackupJob
-
-# Forma de importação correta e limpa
-from agents.status_collector import StatusCollector
+from src import db
+from src.config import ConfigError, ConfigService
+from src.priorities import ensure_task_columns, prioritize
 
 console = Console()
 
+# Engine do banco usado pela priorização; refeito a cada recarga da config
+# (a URL ou os PRAGMAs da seção `database` podem ter mudado)
+engine = None
+
 
 def get_config():
-    """Função auxiliar para carregar o config.yaml."""
+    """
+    Config atual (`ConfigService`): cada tarefa a pede de novo, então uma
+    edição nos YAML vale a partir da próxima rodada, sem reiniciar.
+    """
+    service = ConfigService.shared()
     try:
-        with open("config/config.yaml", "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
+        config = service.get()
+    except ConfigError as e:
         console.print(
-            "[bold red]ERRO FATAL:[/bold red] 'config.yaml' não encontrado. O agendador não pode iniciar."
+            f"[bold red]ERRO FATAL:[/bold red] {e} O agendador não pode iniciar."
         )
         return None
+    if service.last_error:
+        console.print(
+            f"[yellow]Config inválida, mantendo a anterior:[/yellow] {service.last_error}"
+        )
+    return config
+
+
+def build_engine(config):
+    """Descarta os engines abertos e cria o de `database_url` com a config nova."""
+    global engine
+    db.configure(config)
+    db.dispose_all()
+    engine = db.get_engine(config["database_url"])
+    ensure_task_columns(engine)
+    return engine
+
+
+def on_config_reload(config):
+    try:
+        build_engine(config)
+    except Exception as e:
+        console.print(f"[bold red]Erro ao recriar o engine do banco:[/bold red] {e}")
+        return
+    console.print("🔄 [Agendador] Config recarregada.")
 
 
-def run_status_check(config):
+def run_status_check():
     """Função 'wrapper' para a verificação de status."""
     console.rule("[bold green]Rodando Verificação de Status[/bold green]")
     try:
-        collector = StatusCollector(
-            api_key=config["api_keys"]["notion"],
-            tasks_db_id=config["notion_db"]["tasks_db_id"],
-        )
-        collector.check_for_updates()
+        config = get_config()
+        # o agente é construído na primeira execução e reaproveitado nas demais
+        # (AgentPool.shared o reconstrói se a config recarregada mudou)
+        collector = AgentPool.shared(config).get("status_collector")
+        collector.execute({})
     except Exception as e:
         console.print(
             f"[bold red]Erro na tarefa de verificação de status:[/bold red] {e}"
         )
 
 
+def run_prioritization():
+    """Recalcula a prioridade de todas as tarefas (vetorizado: poucos ms)."""
+    try:
+        # get_config() pode recarregar a config e, pelo on_reload, o engine
+        config = get_config()
+        if config is None or engine is None:
+            return
+        rules = config.get("rules") or {}
+        session = sessionmaker(bind=engine)()
+        try:
+            report = prioritize(session, rules)
+        finally:
+            session.close()
+        if report["changed"]:
+            console.print(
+                f"🚦 Prioridades: {report['changed']} de {report['tasks']} "
+                f"tarefas mudaram ({report['seconds'] * 1000:.1f} ms)."
+            )
+    except Exception as e:
+        console.print(f"[bold red]Erro na priorização:[/bold red] {e}")
+
+
 def run_backup_job():
     """Função 'wrapper' para o job de backup."""
     console.rule("[bold blue]Rodando Job de Backup[/bold blue]")
@@ -55,12 +109,16 @@ if __name__ == "__main__":
     if config:
         scheduler = BlockingScheduler(timezone="America/Sao_Paulo")
 
-        scheduler.add_job(run_status_check, "interval", minutes=1, args=[config])
+        ConfigService.shared().on_reload(on_config_reload)
+        scheduler.add_job(run_status_check, "interval", minutes=1)
         scheduler.add_job(run_backup_job, "interval", minutes=2)
+        build_engine(config)
+        scheduler.add_job(run_prioritization, "interval", minutes=1)
 
         console.print("🚀 [Agendador] Iniciado. Pressione Ctrl+C para sair.")
         console.print("   - Verificação de status do Notion a cada 1 minuto.")
         console.print("   - Backup do banco de dados a cada 2 minutos.")
+        console.print("   - Priorização das tarefas a cada 1 minuto.")
 
         try:
             scheduler.start()
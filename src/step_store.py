@@ -0,0 +1,121 @@
+# src/step_store.py
+import threading
+from typing import Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from utils.tracing import span
+
+
+class StepStore:
+    """
+    Saídas das etapas de workflow persistidas no banco (tabela
+    `step_outputs`). O `AgentRouter` consulta pela impressão digital das
+    entradas da etapa (`BaseAgent.fingerprint`) e só chama o LLM quando ela
+    muda. Guarda apenas a saída mais recente de cada (projeto, etapa).
+    """
+
+    def __init__(self, engine):
+        models.StepOutput.__table__.create(engine, checkfirst=True)
+        self.Session = sessionmaker(bind=engine, expire_on_commit=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str):
+        """Saída guardada para a impressão digital, ou None."""
+        with self.Session() as session:
+            output = (
+                session.query(models.StepOutput.output)
+                .filter(models.StepOutput.fingerprint == fingerprint)
+                .scalar()
+            )
+        with self._lock:
+            if output is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return output
+
+    def put(
+        self,
+        fingerprint: str,
+        project_key: str,
+        step: str,
+        output: str,
+        agent: Optional[str] = None,
+        model: Optional[str] = None,
+    ):
+        self.put_many(
+            [
+                {
+                    "fingerprint": fingerprint,
+                    "project_key": project_key,
+                    "step": step,
+                    "output": output,
+                    "agent": agent,
+                    "model": model,
+                }
+            ]
+        )
+
+    def put_many(self, rows: list):
+        """
+        Grava várias saídas (dicts com as colunas de `StepOutput`) numa
+        única transação, substituindo as anteriores das mesmas etapas.
+        """
+        stale = models.StepOutput.fingerprint.in_([row["fingerprint"] for row in rows])
+        for step in {row["step"] for row in rows}:
+            keys = [
+                row["project_key"]
+                for row in rows
+                if row["step"] == step and row["project_key"] is not None
+            ]
+            if keys:
+                stale = stale | (
+                    (models.StepOutput.step == step)
+                    & models.StepOutput.project_key.in_(keys)
+                )
+        with (
+            span("db.write", table="step_outputs", rows=len(rows)),
+            self.Session() as session,
+        ):
+            session.execute(delete(models.StepOutput).where(stale))
+            self._upsert(session, rows)
+            session.commit()
+
+    @staticmethod
+    def _upsert(session, rows: list):
+        """
+        INSERT que atualiza a linha quando a impressão digital já existe
+        (outro worker a gravou ao mesmo tempo): nenhuma saída do lote se perde.
+        """
+        columns = ("project_key", "step", "agent", "model", "output")
+        if session.get_bind().dialect.name == "sqlite":
+            statement = sqlite_insert(models.StepOutput)
+            session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["fingerprint"],
+                    set_={c: statement.excluded[c] for c in columns},
+                ),
+                rows,
+            )
+            return
+        for row in rows:
+            try:
+                with session.begin_nested():
+                    session.execute(insert(models.StepOutput), [row])
+            except IntegrityError:
+                session.execute(
+                    update(models.StepOutput)
+                    .where(models.StepOutput.fingerprint == row["fingerprint"])
+                    .values({c: row.get(c) for c in columns})
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
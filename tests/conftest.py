@@ -4,7 +4,43 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from src.config import DEFAULT_CONFIG_PATH, ConfigService
 from src.models import Base
+from utils import llm_cache, provider_health, rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def config_snapshot_temporario(tmp_path, monkeypatch):
+    """
+    O `ConfigService.shared()` usado pela CLI grava o snapshot em
+    `tmp_path`, não no `.cache/` do repositório.
+    """
+    service = ConfigService(snapshot_path=str(tmp_path / "config.json"))
+    monkeypatch.setattr(ConfigService, "_shared", {DEFAULT_CONFIG_PATH: service})
+
+
+@pytest.fixture(autouse=True)
+def llm_cache_temporario(tmp_path, monkeypatch):
+    """
+    Routers montados a partir da config real (`llm_cache.path: null`)
+    gravam o cache de respostas em `tmp_path`, não ao lado do projects.db.
+    """
+    monkeypatch.setattr(
+        llm_cache, "default_cache_path", lambda config: str(tmp_path / "llm_cache.db")
+    )
+
+
+@pytest.fixture(autouse=True)
+def saude_dos_provedores_temporaria(tmp_path, monkeypatch):
+    """
+    Cada teste tem seu `HealthRegistry.shared`, com o snapshot em
+    `tmp_path` (não em `.cache/provider_health.json`).
+    """
+    monkeypatch.setattr(
+        provider_health, "DEFAULT_SNAPSHOT_PATH", str(tmp_path / "health.json")
+    )
+    monkeypatch.setattr(provider_health, "_shared_registries", {})
+    monkeypatch.setattr(rate_limiter, "_shared_limiters", {})
 
 
 @pytest.fixture(scope="function")
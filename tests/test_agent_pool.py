@@ -0,0 +1,39 @@
+# tests/test_agent_pool.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.agent_pool import AgentPool
+
+CONFIG = {"fallback_chain": ["mock"], "model_mapping": {"risk_sentinel": "m"}}
+
+
+def test_agente_e_construido_uma_vez_e_reaproveitado():
+    pool = AgentPool(CONFIG)
+    first = pool.get("risk_sentinel")
+    assert pool.get("risk_sentinel") is first
+    assert pool.factory("risk_sentinel")() is first
+    assert first.model == "m"
+    stats = pool.stats()
+    assert (stats["builds"], stats["hits"]) == (1, 2)
+
+
+def test_get_concorrente_constroi_uma_unica_instancia():
+    pool = AgentPool(CONFIG)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        agents = list(executor.map(lambda _: pool.get("org_designer"), range(32)))
+    assert len({id(agent) for agent in agents}) == 1
+    assert pool.stats()["builds"] == 1
+
+
+def test_invalidate_e_reconfigure_reconstroem():
+    pool = AgentPool(CONFIG)
+    first = pool.get("risk_sentinel")
+    pool.invalidate("risk_sentinel")
+    second = pool.get("risk_sentinel")
+    assert second is not first
+
+    pool.reconfigure(dict(CONFIG))  # mesma config: nada muda
+    assert pool.get("risk_sentinel") is second
+
+    pool.reconfigure({**CONFIG, "model_mapping": {"risk_sentinel": "outro"}})
+    assert pool.get("risk_sentinel").model == "outro"
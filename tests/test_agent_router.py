@@ -0,0 +1,147 @@
+# tests/test_agent_router.py
+
+import time
+
+import pytest
+import yaml
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter, build_dag
+from agents.catalog import build_step_factories
+from src import loadgen
+from utils.llm_clients import registry
+from utils.rate_limiter import TokenBudget
+
+
+class FakeAgent:
+    """Agente de teste: dorme `delay` segundos e devolve o nome da etapa."""
+
+    calls: list = []
+
+    def __init__(self, step, delay=0.0, fail=False):
+        self.step, self.delay, self.fail = step, delay, fail
+
+    def execute(self, data, dry_run=False, budget=None):
+        FakeAgent.calls.append((self.step, dict(data.get("upstream") or {})))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"falha em {self.step}")
+        return f"saida-{self.step}"
+
+
+def factories(delays: dict, failing=()) -> dict:
+    return {
+        step: (lambda s=step, d=delay: FakeAgent(s, d, s in failing))
+        for step, delay in delays.items()
+    }
+
+
+@pytest.fixture(autouse=True)
+def limpa_chamadas():
+    FakeAgent.calls = []
+
+
+def test_dag_do_rules_yaml_resolve_etapas_e_agentes():
+    with open("config/rules.yaml", encoding="utf-8") as f:
+        rules = yaml.safe_load(f)
+    rules["dependencies"]["Org_Designer"] = ["Go-to-Market_Copilot"]
+    rules["dependencies"]["analyze_risks"] = ["analyze_market", "Compliance_Guardian"]
+    steps = rules["event_workflows"]["NEW_PROJECT_CREATED"]
+    dag = build_dag(steps, rules)
+    assert dag["analyze_risks"] == {"analyze_market", "analyze_compliance"}
+    assert dag["design_org"] == {"plan_gtm"}
+    assert dag["analyze_market"] == set()
+
+
+def test_dag_com_ciclo_levanta_erro():
+    rules = {"dependencies": {"a": ["b"], "b": ["a"]}}
+    with pytest.raises(ValueError):
+        build_dag(["a", "b"], rules)
+
+
+def test_etapas_independentes_rodam_em_paralelo():
+    rules = {
+        "event_workflows": {"E": ["a", "b", "c", "d"]},
+        "dependencies": {"d": ["a", "b"]},
+        "workflow": {"max_workers": 4},
+    }
+    router = AgentRouter(factories({"a": 0.2, "b": 0.2, "c": 0.2, "d": 0.2}), rules)
+    start = time.perf_counter()
+    results = router.route_event("E", {"name": "X"})
+    elapsed = time.perf_counter() - start
+
+    assert list(results) == ["a", "b", "c", "d"]
+    assert all(r["error"] is None for r in results.values())
+    # caminho crítico a -> d (0.4s), não a soma das etapas (0.8s)
+    assert elapsed < 0.6
+    upstream = dict(FakeAgent.calls)["d"]
+    assert upstream == {"a": "saida-a", "b": "saida-b"}
+
+
+def test_continue_segue_e_fail_fast_cancela():
+    rules = {
+        "event_workflows": {"E": ["a", "b", "c"]},
+        "dependencies": {"c": ["b"]},
+        "workflow": {"max_workers": 1},
+    }
+    results = AgentRouter(factories({"a": 0, "b": 0, "c": 0}, failing={"a"}), rules)
+    results = results.route_event("E", {})
+    assert results["a"]["error"] == "falha em a"
+    assert results["c"]["output"] == "saida-c"
+
+    rules["step_policies"] = {"a": {"on_error": "fail_fast"}}
+    router = AgentRouter(factories({"a": 0, "b": 0, "c": 0}, failing={"a"}), rules)
+    results = router.route_event("E", {})
+    assert "cancelada" in results["b"]["error"]
+    assert "cancelada" in results["c"]["error"]
+
+
+BUDGET_RULES = {
+    "event_workflows": {"E": ["analyze_market", "analyze_risks"]},
+    "step_agents": {
+        "analyze_market": "market_intel_bot",
+        "analyze_risks": "risk_sentinel",
+    },
+    "workflow": {"max_workers": 1},
+}
+
+
+def mock_agents(**overrides) -> dict:
+    registry.clear()
+    config = loadgen.mock_config({"model_mapping": {}}, latency_ms=0, seed=1)
+    return build_step_factories(BUDGET_RULES, AgentPool({**config, **overrides}))
+
+
+def test_orcamento_vale_para_o_evento_inteiro():
+    # cada chamada reserva ~80 tokens de prompt + 512 de saída e gasta ~100:
+    # 650 cabem numa etapa, mas não nas duas do mesmo evento
+    router = AgentRouter(mock_agents(), BUDGET_RULES, token_budget=650)
+    for _ in range(2):  # cada evento começa com o orçamento cheio
+        results = router.route_event("E", {"name": "Projeto"})
+        assert results["analyze_market"]["error"] is None
+        assert "Orçamento de tokens esgotado" in results["analyze_risks"]["error"]
+
+    results = AgentRouter(mock_agents(), BUDGET_RULES).route_event("E", {"name": "P"})
+    assert all(r["error"] is None for r in results.values())
+
+
+def test_chamada_com_erro_devolve_a_reserva():
+    agent = mock_agents(mock_provider={"error_rate": 1.0, "seed": 1})[
+        "analyze_market"
+    ]()
+    budget = TokenBudget(limit=10_000)
+    with pytest.raises(Exception):
+        agent.execute({"name": "Projeto"}, budget=budget)
+    assert budget.used == 0
+
+
+def test_resposta_do_cache_nao_gasta_orcamento(tmp_path):
+    cache = {"enabled": True, "path": str(tmp_path / "llm_cache.db")}
+    agent = mock_agents(llm_cache=cache)["analyze_market"]()
+    budget = TokenBudget(limit=10_000)
+    first = agent.execute({"name": "Projeto"}, budget=budget)
+    used = budget.used
+    assert used > 0
+
+    assert agent.execute({"name": "Projeto"}, budget=budget) == first
+    assert budget.used == used
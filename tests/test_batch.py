@@ -0,0 +1,79 @@
+# tests/test_batch.py
+
+import pytest
+from sqlalchemy import create_engine
+
+from src import batch
+from src.models import Project, ProjectStatus
+from src.step_store import StepStore
+
+
+class FakeAgent:
+    name = "fake_agent"
+    model = "modelo-x"
+
+    def __init__(self):
+        self.sent = []
+
+    def fingerprint(self, data):
+        return f"fp-{data['slug']}"
+
+    def run_many(self, projects):
+        self.sent.extend(p["slug"] for p in projects)
+        return [{"text": f"saida-{p['slug']}", "error": None} for p in projects]
+
+
+class FakeRouter:
+    def route_event(self, event_type, data):
+        error = "falhou" if data["slug"] == "p3" else None
+        return {"etapa": {"output": data["name"], "error": error, "cached": False}}
+
+
+def test_select_projects_filtra(test_db_session):
+    for i, (ptype, status) in enumerate(
+        [("Software", ProjectStatus.ACTIVE), ("Fintech", ProjectStatus.ACTIVE)]
+        + [("Software", ProjectStatus.ON_HOLD)]
+    ):
+        test_db_session.add(
+            Project(slug=f"p{i}", name=f"P{i}", project_type=ptype, status=status)
+        )
+    test_db_session.commit()
+
+    found = batch.select_projects(
+        test_db_session, project_type="Software", status="active"
+    )
+    assert [p["slug"] for p in found] == ["p0"]
+    assert len(batch.select_projects(test_db_session, status="On Hold")) == 1
+    with pytest.raises(ValueError):
+        batch.select_projects(test_db_session, status="inexistente")
+
+
+def test_agent_batch_grava_em_lote_e_reaproveita(tmp_path):
+    store = StepStore(create_engine(f"sqlite:///{tmp_path / 'lote.db'}"))
+    projects = [{"slug": f"p{i}", "name": f"P{i}"} for i in range(7)]
+    agent, progress = FakeAgent(), []
+
+    results = batch.run_agent_batch(
+        agent, projects, store=store, chunk_size=3, on_progress=progress.append
+    )
+    assert progress == [3, 3, 1]
+    assert results["p6"] == {"output": "saida-p6", "error": None, "cached": False}
+
+    agent.sent.clear()
+    results = batch.run_agent_batch(agent, projects, store=store, chunk_size=3)
+    assert agent.sent == []
+    assert all(r["cached"] for r in results.values())
+
+    batch.run_agent_batch(agent, projects[:2], store=store, force=True)
+    assert agent.sent == ["p0", "p1"]
+
+
+def test_workflow_batch_com_threads():
+    projects = [{"slug": f"p{i}", "name": f"P{i}"} for i in range(6)]
+    done = []
+    results = batch.run_workflow_batch(
+        "E", projects, FakeRouter, workers=3, on_progress=done.append
+    )
+    assert len(done) == 6
+    assert results["p1"]["output"] == {"etapa": "P1"}
+    assert results["p3"]["error"] == "etapa: falhou"
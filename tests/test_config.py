@@ -0,0 +1,80 @@
+# tests/test_config.py
+
+import json
+import os
+
+import pytest
+
+from src.config import ConfigError, ConfigService
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    (tmp_path / "mapping.yaml").write_text("model_mapping:\n  fin_modeler: mock\n")
+    (tmp_path / "rules.yaml").write_text("workflow:\n  fusion:\n    enabled: true\n")
+    (tmp_path / "config.yaml").write_text(
+        "database_url: sqlite:///x.db\n"
+        f"model_mapping_file: {tmp_path / 'mapping.yaml'}\n"
+        f"rules_file: {tmp_path / 'rules.yaml'}\n"
+        "api_keys:\n  notion: do-yaml\n"
+    )
+    (tmp_path / ".env").write_text("NOTION_TOKEN=do-env\n")
+    return tmp_path
+
+
+def servico(path):
+    return ConfigService(
+        str(path / "config.yaml"),
+        snapshot_path=str(path / "config.json"),
+        env_file=str(path / ".env"),
+    )
+
+
+def tocar(path, text):
+    """Reescreve o arquivo com outro mtime (sistemas com mtime grosseiro)."""
+    stat = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_junta_arquivos_e_env(arquivos, monkeypatch):
+    monkeypatch.delenv("NOTION_TOKEN", raising=False)
+    config = servico(arquivos).get()
+    assert config["model_mapping"] == {"fin_modeler": "mock"}
+    assert config["rules"]["workflow"]["fusion"]["enabled"] is True
+    assert config["api_keys"]["notion"] == "do-env"
+
+
+def test_cache_em_memoria_e_snapshot(arquivos):
+    service = servico(arquivos)
+    config = service.get()
+    config["database_url"] = "alterado"  # cópia: não contamina o cache
+    assert service.get()["database_url"] == "sqlite:///x.db"
+    assert service.stats["parses"] == 1
+    snapshot = json.loads((arquivos / "config.json").read_text(encoding="utf-8"))
+    assert snapshot["config"]["database_url"] == "sqlite:///x.db"
+
+    other = servico(arquivos)  # outro processo: lê o snapshot, não o YAML
+    assert other.get()["rules"] == service.get()["rules"]
+    assert other.stats == {"parses": 0, "snapshot_hits": 1, "reloads": 0}
+
+
+def test_recarrega_quando_arquivo_muda(arquivos):
+    service = servico(arquivos)
+    reloads = []
+    service.on_reload(reloads.append)
+    service.get()
+
+    tocar(arquivos / "rules.yaml", "workflow:\n  fusion:\n    enabled: false\n")
+    assert service.get()["rules"]["workflow"]["fusion"]["enabled"] is False
+    assert len(reloads) == 1 and service.stats["reloads"] == 1
+
+    # YAML quebrado no meio da edição: mantém a última config válida
+    tocar(arquivos / "config.yaml", "database_url: [sem fechar\n")
+    assert service.get()["database_url"] == "sqlite:///x.db"
+    assert service.last_error
+
+
+def test_config_ausente(tmp_path):
+    with pytest.raises(ConfigError, match="não encontrado"):
+        servico(tmp_path).get()
@@ -0,0 +1,86 @@
+# tests/test_db.py
+
+import threading
+
+from sqlalchemy import text
+
+from src import db
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_engine_compartilhado_com_pragmas(tmp_path):
+    url = f"sqlite:///{tmp_path / 'p.db'}"
+    engine = db.get_engine(url)
+    assert db.get_engine(url) is engine
+    assert pragma(engine, "journal_mode") == "wal"
+    assert pragma(engine, "synchronous") == 1  # NORMAL
+    assert pragma(engine, "busy_timeout") == 30000
+    assert pragma(engine, "cache_size") == -64000
+    session = db.get_session(url)
+    assert session.get_bind() is engine
+    session.close()
+    db.dispose_all()
+    assert db.get_engine(url) is not engine
+
+
+def test_config_sobrescreve_pragmas(tmp_path):
+    db.configure(
+        {"database": {"busy_timeout_ms": 500, "pragmas": {"cache_size": -2000}}}
+    )
+    try:
+        engine = db.create(f"sqlite:///{tmp_path / 'c.db'}")
+        assert pragma(engine, "busy_timeout") == 500
+        assert pragma(engine, "cache_size") == -2000
+        assert pragma(engine, "journal_mode") == "wal"
+    finally:
+        db.configure({})
+    memory = db.create("sqlite:///:memory:")
+    assert pragma(memory, "journal_mode") == "memory"
+
+
+def test_banco_em_memoria_e_o_mesmo_em_todas_as_threads():
+    engine = db.create("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    def writer():
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    thread.join()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+
+
+def test_leitor_nao_espera_transacao_de_escrita(tmp_path):
+    engine = db.create(f"sqlite:///{tmp_path / 'wal.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    writing, done = threading.Event(), threading.Event()
+
+    def writer():
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+            writing.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    writing.wait(5)
+    try:
+        # com WAL o leitor vê o último commit enquanto a escrita está aberta
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+    finally:
+        done.set()
+        thread.join()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 2
@@ -0,0 +1,100 @@
+# tests/test_event_queue.py
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.event_queue import EventQueue, QueueFull, run_workers
+
+
+@pytest.fixture
+def queue(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'fila.db'}", connect_args={"timeout": 30}
+    )
+    return EventQueue(
+        engine,
+        {
+            "event_queue": {
+                "max_depth": 50,
+                "max_attempts": 2,
+                "backoff_base_seconds": 0,
+                "poll_interval_seconds": 0.05,
+            }
+        },
+    )
+
+
+class FakeRouter:
+    """Falha nas primeiras `failures` chamadas de cada evento."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls: dict = {}
+        self.lock = threading.Lock()
+
+    def route_event(self, event_type, data):
+        with self.lock:
+            n = self.calls[data["n"]] = self.calls.get(data["n"], 0) + 1
+        error = "falhou" if n <= self.failures else None
+        return {"etapa": {"output": "ok", "error": error, "seconds": 0.0}}
+
+
+def test_enqueue_claim_ack(queue):
+    ids = queue.enqueue_many([("E", {"n": 1}), ("E", {"n": 2})])
+    claimed = queue.claim("w1", limit=5)
+    assert [c["id"] for c in claimed] == ids
+    assert claimed[0]["data"] == {"n": 1} and claimed[0]["attempts"] == 1
+    assert queue.claim("w2") == []
+    queue.ack(ids[0])
+    assert queue.depth() == {"pending": 0, "running": 1, "done": 1, "dead": 0}
+
+
+def test_cancel_so_retira_evento_ainda_pendente(queue):
+    primeiro, segundo = queue.enqueue_many([("E", {"n": 1}), ("E", {"n": 2})])
+    queue.claim("w1")
+    assert queue.cancel(primeiro, "desistiu") is False
+    assert queue.cancel(segundo, "desistiu") is True
+    assert queue.depth() == {"pending": 0, "running": 1, "done": 0, "dead": 1}
+
+
+def test_fail_reenfileira_ate_esgotar_tentativas(queue):
+    event_id = queue.enqueue("E", {"n": 1})
+    queue.claim("w1")
+    assert queue.fail(event_id, "erro 1") is True
+    assert queue.claim("w1")[0]["attempts"] == 2
+    assert queue.fail(event_id, "erro 2") is False
+    assert queue.depth()["dead"] == 1
+
+
+def test_requeue_stale_respeita_max_attempts(queue):
+    queue.enqueue("E", {"n": 1})
+    queue.claim("w1")
+    queue.settings["lock_timeout_seconds"] = -1  # o worker "sumiu"
+    assert queue.requeue_stale() == 1
+    assert queue.claim("w2")[0]["attempts"] == 2
+    assert queue.requeue_stale() == 0  # esgotou: não volta mais à fila
+    assert queue.depth() == {"pending": 0, "running": 0, "done": 0, "dead": 1}
+
+
+def test_backoff_exponencial_e_limitado(queue):
+    queue.settings.update(backoff_base_seconds=2, backoff_max_seconds=10)
+    assert 1.5 <= queue.backoff(1) <= 2.5
+    assert 6 <= queue.backoff(3) <= 10
+    assert queue.backoff(10) <= 12.5
+
+
+def test_fila_cheia_recusa(queue):
+    queue.enqueue_many([("E", {"n": i}) for i in range(50)])
+    with pytest.raises(QueueFull):
+        queue.enqueue("E", {"n": 99})
+
+
+def test_workers_drenam_a_fila_sem_duplicar(queue):
+    queue.enqueue_many([("E", {"n": i}) for i in range(20)])
+    router = FakeRouter(failures=1)
+    run_workers(queue, router, concurrency=4, stop_when_empty=True)
+    assert queue.depth() == {"pending": 0, "running": 0, "done": 20, "dead": 0}
+    # uma falha + uma nova tentativa por evento, nunca mais que isso
+    assert set(router.calls.values()) == {2}
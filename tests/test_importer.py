@@ -0,0 +1,82 @@
+# tests/test_importer.py
+
+import json
+
+from src.importer import ATTACH, import_file
+from src.models import Project, ProjectStatus, Task
+from utils.slug import legacy_slug, slugify
+
+CSV = """project,project_type,country,status,task,estimate,dependencies,end_date
+Clínica São João,Saúde,Brasil,Active,Briefing,3,,2026-02-01
+Clínica São João,Saúde,Brasil,Active,Protótipo,5,Briefing,2026-03-01
+Loja Online,Varejo,Portugal,,,,,
+Loja Online,Varejo,Portugal,,Catálogo,8,,
+,,,,Tarefa órfã,1,,
+Loja Online,,,,Checkout,não-sei,,
+"""
+
+
+def test_slugify_remove_acentos_e_pontuacao():
+    assert slugify("Clínica São João!") == "clinica-sao-joao"
+    assert slugify("  Loja -- Online ") == "loja-online"
+
+
+def test_importa_csv_em_blocos(tmp_path, test_db_session):
+    path = tmp_path / "carga.csv"
+    path.write_text(CSV, encoding="utf-8")
+    progress = []
+
+    report = import_file(
+        test_db_session, str(path), chunk_size=2, on_progress=progress.append
+    )
+
+    assert report["rows"] == 6 and sum(progress) == 6
+    assert (report["projects"], report["tasks"], report["errors"]) == (2, 3, 2)
+    assert "linha 6" in report["error_samples"][0]
+    clinic = test_db_session.query(Project).filter_by(slug="clinica-sao-joao").one()
+    assert clinic.status == ProjectStatus.ACTIVE
+    assert [t.template for t in clinic.tasks] == ["Briefing", "Protótipo"]
+    assert clinic.tasks[1].dependencies == ["Briefing"]
+    loja = test_db_session.query(Project).filter_by(slug="loja-online").one()
+    assert loja.status == ProjectStatus.PLANNING
+    assert [t.template for t in loja.tasks] == ["Catálogo"]
+
+
+def test_reimportar_nao_duplica_e_attach_acrescenta(tmp_path, test_db_session):
+    path = tmp_path / "carga.jsonl"
+    rows = [
+        {
+            "project": "Fintech",
+            "project_type": "Software",
+            "tasks": [{"task": "MVP", "estimate": 10}, {"task": "Beta"}],
+        }
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+
+    first = import_file(test_db_session, str(path))
+    again = import_file(test_db_session, str(path))
+    assert (first["projects"], first["tasks"]) == (1, 2)
+    assert (again["projects"], again["tasks"], again["skipped"]) == (0, 0, 3)
+    assert test_db_session.query(Task).count() == 2
+
+    attached = import_file(test_db_session, str(path), on_existing=ATTACH)
+    assert (attached["projects"], attached["tasks"]) == (0, 2)
+    assert test_db_session.query(Project).count() == 1
+    assert test_db_session.query(Task).count() == 4
+
+
+def test_projeto_com_slug_antigo_acentuado_nao_e_duplicado(tmp_path, test_db_session):
+    antigo = Project(slug=legacy_slug("Clínica São João"), name="Clínica São João")
+    test_db_session.add(antigo)
+    test_db_session.commit()
+    assert antigo.slug == "clínica-são-joão"
+
+    path = tmp_path / "carga.csv"
+    path.write_text(CSV, encoding="utf-8")
+    report = import_file(test_db_session, str(path), on_existing=ATTACH)
+
+    assert report["projects"] == 1  # só a Loja Online é nova
+    assert (
+        test_db_session.query(Project).filter_by(name="Clínica São João").count() == 1
+    )
+    assert [t.template for t in antigo.tasks] == ["Briefing", "Protótipo"]
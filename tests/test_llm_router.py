@@ -0,0 +1,512 @@
+# tests/test_llm_router.py
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from utils import provider_health
+from utils.llm_cache import LLMCache
+from utils.llm_http import AsyncHTTPPool
+from utils.llm_router import LLMRouter
+from utils.provider_health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    HealthRegistry,
+    ProviderHealth,
+)
+from utils.rate_limiter import (
+    RateLimiter,
+    TokenBucket,
+    TokenBudget,
+    TokenBudgetExceeded,
+)
+from utils.singleflight import SingleFlight
+
+
+def make_router(responses: dict, **config) -> LLMRouter:
+    """
+    Cria um LLMRouter cujos provedores são simulados por `responses`:
+    provider -> (atraso em segundos, texto ou exceção).
+    """
+    router = LLMRouter({**config, "fallback_chain": []}, {})
+    router.chain = list(responses)
+    router.clients = {provider: object() for provider in responses}
+
+    def fake_call(provider, model, prompt):
+        delay, result = responses[provider]
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    router._call_provider = fake_call  # type: ignore[method-assign]
+    router.health = HealthRegistry({"provider_health": {"snapshot_path": None}})
+    router.limiter = RateLimiter(config)
+    router.inflight = SingleFlight()
+    return router
+
+
+def test_generate_faz_fallback_sequencial():
+    router = make_router(
+        {"openai": (0, RuntimeError("fora do ar")), "gemini": (0, "ok-gemini")}
+    )
+    assert router.generate("gpt-4o-mini", "oi") == "ok-gemini"
+    stats = router.provider_stats()
+    assert stats["openai"]["errors"] == 1
+    assert stats["gemini"]["wins"] == 1
+
+
+def test_hedged_nao_espera_provedor_lento():
+    router = make_router(
+        {"openai": (1.0, "ok-openai"), "gemini": (0, "ok-gemini")},
+        hedging={"enabled": True, "delay_seconds": 0.05},
+    )
+    start = time.perf_counter()
+    assert router.generate("gpt-4o-mini", "oi") == "ok-gemini"
+    assert time.perf_counter() - start < 0.5
+    assert router.provider_stats()["gemini"]["wins"] == 1
+
+
+def test_hedged_dispara_proximo_imediatamente_em_falha():
+    router = make_router(
+        {"openai": (0, RuntimeError("429")), "gemini": (0, "ok-gemini")},
+        hedging={"enabled": True, "delay_seconds": 10},
+    )
+    start = time.perf_counter()
+    assert router.generate("gpt-4o-mini", "oi") == "ok-gemini"
+    assert time.perf_counter() - start < 1
+
+
+def test_hedged_sem_resposta_levanta_erro():
+    router = make_router(
+        {"openai": (0, RuntimeError("x")), "gemini": (0, RuntimeError("y"))},
+        hedging={"enabled": True, "delay_seconds": 0.01, "fanout": 2},
+    )
+    with pytest.raises(RuntimeError):
+        router.generate("gpt-4o-mini", "oi")
+
+
+def test_cache_reaproveita_resposta_e_respeita_bypass(tmp_path):
+    calls = []
+    router = make_router(
+        {"openai": (0, "resposta")},
+        llm_cache={"enabled": True, "path": str(tmp_path / "cache.db")},
+    )
+    original = router._call_provider
+
+    def counting_call(provider, model, prompt):
+        calls.append(provider)
+        return original(provider, model, prompt)
+
+    router._call_provider = counting_call
+
+    assert router.generate("gpt-4o-mini", "mesmo prompt") == "resposta"
+    assert router.generate("gpt-4o-mini", "mesmo prompt") == "resposta"
+    assert len(calls) == 1
+    router.generate("gpt-4o-mini", "mesmo prompt", use_cache=False)
+    assert len(calls) == 2
+    assert router.cache_stats()["hits"] == 1
+
+
+def test_cache_expira_por_ttl_e_descarta_lru(tmp_path):
+    cache = LLMCache(
+        str(tmp_path / "cache.db"),
+        max_entries=2,
+        agent_ttls={"agente_volatil": 0},
+    )
+    cache.put("openai", "m", "volatil", "x", agent_name="agente_volatil")
+    assert cache.get(["openai"], "m", "volatil") is None
+
+    cache.put("openai", "m", "a", "A")
+    cache.put("openai", "m", "b", "B")
+    assert cache.get(["openai"], "m", "a") == ("openai", "A")
+    cache.put("openai", "m", "c", "C")
+    assert cache.get(["openai"], "m", "b") is None
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.fixture
+def openai_stub():
+    """
+    Servidor HTTP local que imita /v1/chat/completions da OpenAI,
+    respondendo após `delay` segundos e registrando a concorrência máxima.
+    """
+    state = {"delay": 0.2, "active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(state["delay"])
+            with lock:
+                state["active"] -= 1
+            prompt = body["messages"][0]["content"]
+            payload = json.dumps(
+                {"choices": [{"message": {"content": f"eco: {prompt}"}}]}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+
+
+def test_agenerate_paraleliza_e_respeita_semaforo(openai_stub):
+    def async_router(concurrency):
+        return LLMRouter(
+            {
+                "fallback_chain": ["openai"],
+                "openai_key": "sk-teste",
+                "async_http": {
+                    "endpoints": {"openai": openai_stub["url"]},
+                    "concurrency": {"openai": concurrency},
+                },
+            },
+            {},
+        )
+
+    async def run_batch(router):
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(router.agenerate("gpt-4o-mini", f"p{i}") for i in range(5))
+        )
+        await router.aclose()
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run_batch(async_router(5)))
+    assert results == [f"eco: p{i}" for i in range(5)]
+    assert elapsed < 0.8  # ~1 round-trip, não 5
+
+    openai_stub["max_active"] = 0
+    _, elapsed = asyncio.run(run_batch(async_router(2)))
+    assert openai_stub["max_active"] <= 2
+    assert elapsed >= 0.5
+
+
+def test_circuit_breaker_abre_e_testa_em_half_open():
+    health = ProviderHealth(failure_threshold=2, open_seconds=10)
+    health.record(0.1, ok=False, now=0, error="timeout")
+    assert health.state == CLOSED
+    health.record(0.1, ok=False, now=1, error="timeout")
+    assert health.state == OPEN
+    assert not health.allow(now=5)
+    assert health.allow(now=12)
+    assert health.state == HALF_OPEN
+    assert not health.allow(now=12.5)  # apenas uma chamada de teste
+    health.record(0.2, ok=True, now=13)
+    assert health.state == CLOSED
+
+
+def test_router_pula_provedor_com_circuito_aberto_e_ordena_por_latencia():
+    router = make_router(
+        {
+            "openai": (0, RuntimeError("503")),
+            "gemini": (0.05, "ok-gemini"),
+            "cohere": (0, "ok-cohere"),
+        },
+        provider_health={"failure_threshold": 1, "snapshot_path": None},
+    )
+    router.health = HealthRegistry(router.config)
+
+    calls = []
+    original = router._call_provider
+
+    def counting_call(provider, model, prompt):
+        calls.append(provider)
+        return original(provider, model, prompt)
+
+    router._call_provider = counting_call
+    assert router.generate("m", "a") == "ok-gemini"
+    assert router.health.get("openai").state == OPEN
+
+    # cohere mediu p50 menor que gemini e passa à frente; openai segue pulado
+    calls.clear()
+    router.health.record("cohere", 0.001, ok=True)
+    assert router.generate("m", "b") == "ok-cohere"
+    assert calls == ["cohere"]
+
+
+def test_ordenar_nao_consome_o_teste_half_open(monkeypatch):
+    clock = SimpleNamespace(monotonic=lambda: now, time=time.time)
+    monkeypatch.setattr(provider_health, "time", clock)
+    router = make_router(
+        {"openai": (0, RuntimeError("503")), "gemini": (0, "ok-gemini")},
+        provider_health={
+            "failure_threshold": 1,
+            "open_seconds": 10,
+            "snapshot_path": None,
+        },
+    )
+    router.health = HealthRegistry(router.config)
+    now = 0.0
+    assert router.generate("m", "a") == "ok-gemini"
+    assert router.health.get("openai").state == OPEN
+
+    # depois do cooldown, ordenar (e responder pelo gemini, mais rápido)
+    # não gasta o teste do openai
+    now = 11.0
+    router.health.record("gemini", 0.001, ok=True)
+    assert router.generate("m", "b") == "ok-gemini"
+    assert router.health.order(["openai", "gemini"]) == ["gemini", "openai"]
+    assert router.health.get("openai").state == OPEN
+
+    # o teste só é reservado quando a chamada sai, e uma vez só
+    assert router.health.claim("openai")
+    assert router.health.get("openai").state == HALF_OPEN
+    assert not router.health.claim("openai")
+    assert router.health.order(["openai", "gemini"]) == ["gemini"]
+
+
+def test_registro_compartilhado_comeca_do_snapshot_recente(tmp_path):
+    path = tmp_path / "health.json"
+    snapshot = {
+        "openai": {"state": OPEN, "p50": None, "last_error": "503"},
+        "gemini": {"state": CLOSED, "p50": 0.5},
+        "cohere": {"state": CLOSED, "p50": 0.1},
+    }
+    path.write_text(json.dumps({"updated_at": time.time(), "providers": snapshot}))
+    config = {"provider_health": {"snapshot_path": str(path), "open_seconds": 30}}
+
+    health = HealthRegistry.shared(config)
+    assert health.get("openai").last_error == "503"
+    assert health.order(["openai", "gemini", "cohere"]) == ["cohere", "gemini"]
+
+    # snapshot velho não semeia
+    path.write_text(json.dumps({"updated_at": 0, "providers": snapshot}))
+    config["provider_health"]["snapshot_max_age_seconds"] = 60
+    stale = HealthRegistry.shared(config)
+    assert stale.order(["openai", "gemini"]) == ["openai", "gemini"]
+
+
+def test_stream_entrega_pedacos_e_faz_fallback_antes_do_primeiro():
+    router = make_router({"openai": (0, RuntimeError("503")), "gemini": (0, "")})
+
+    def fake_stream(provider, model, prompt):
+        if provider == "openai":
+            raise RuntimeError("503")
+        yield from ["olá", ", ", "mundo"]
+
+    router._stream_provider = fake_stream
+    assert list(router.stream("m", "oi")) == ["olá", ", ", "mundo"]
+    assert router.provider_stats()["gemini"]["wins"] == 1
+
+
+def test_stream_nao_troca_de_provedor_depois_do_primeiro_pedaco():
+    router = make_router({"openai": (0, ""), "gemini": (0, "")})
+
+    def broken_stream(provider, model, prompt):
+        yield "parcial"
+        raise RuntimeError("conexão caiu")
+
+    router._stream_provider = broken_stream
+    chunks = router.stream("m", "oi")
+    assert next(chunks) == "parcial"
+    with pytest.raises(RuntimeError, match="conexão caiu"):
+        next(chunks)
+
+
+def test_importar_router_nao_carrega_sdks():
+    """Os SDKs só devem ser importados na primeira chamada ao provedor."""
+    code = (
+        "import sys; import agents.base_agent; "
+        "sdks = ['openai', 'google.generativeai', 'anthropic', 'cohere', "
+        "'huggingface_hub', 'httpx']; "
+        "print(','.join(m for m in sdks if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    assert out.stdout.strip() == ""
+
+
+def test_clientes_sao_compartilhados_entre_routers(monkeypatch):
+    from utils import llm_clients
+
+    built = []
+    monkeypatch.setitem(
+        llm_clients.BUILDERS, "openai", lambda cfg: built.append(cfg) or object()
+    )
+    monkeypatch.setattr(llm_clients, "registry", llm_clients.ClientRegistry())
+    monkeypatch.setattr("utils.llm_router.client_registry", llm_clients.registry)
+
+    config = {"fallback_chain": [], "openai_key": "sk-1"}
+    first, second = LLMRouter(config, {}), LLMRouter(config, {})
+    assert built == []
+    assert first._client("openai") is second._client("openai")
+    assert len(built) == 1
+
+
+def test_generate_many_mantem_ordem_agrupa_e_isola_erros():
+    calls = []
+    router = make_router({"openai": (0, ""), "gemini": (0, "")})
+
+    def fake_call(provider, model, prompt):
+        calls.append((provider, prompt))
+        if prompt == "impossível":
+            raise RuntimeError(f"{provider} recusou")
+        if provider == "openai" and prompt == "b":
+            raise RuntimeError("429")
+        return f"{provider}:{prompt}"
+
+    router._call_provider = fake_call
+    results = router.generate_many("m", ["a", "b", "a", "impossível"])
+
+    assert [r["text"] for r in results] == ["openai:a", "gemini:b", "openai:a", None]
+    assert results[1]["provider"] == "gemini"
+    assert "gemini recusou" in results[3]["error"]
+    # "a" repetido vai uma vez só; gemini só recebe quem falhou no openai
+    assert sorted(calls) == sorted(
+        [
+            ("openai", "a"),
+            ("openai", "b"),
+            ("openai", "impossível"),
+            ("gemini", "b"),
+            ("gemini", "impossível"),
+        ]
+    )
+
+
+def test_token_bucket_enfileira_em_vez_de_recusar():
+    bucket = TokenBucket(per_minute=60, capacity=2)  # 1 ficha/s
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+
+
+def test_429_espera_e_repete_no_mesmo_provedor():
+    class RateLimitError(Exception):
+        http_status = 429
+
+    router = make_router(
+        {"openai": (0, "ok-openai"), "gemini": (0, "ok-gemini")},
+        rate_limits={"openai": {"default": {"rpm": 6000}}},
+    )
+    attempts = []
+    original = router._call_provider
+
+    def flaky_call(provider, model, prompt):
+        attempts.append(provider)
+        if len(attempts) == 1:
+            raise RateLimitError("Too Many Requests")
+        return original(provider, model, prompt)
+
+    router._call_provider = flaky_call
+    with patch("utils.llm_router.retry_after", return_value=0.01):
+        assert router.generate("m", "oi") == "ok-openai"
+    assert attempts == ["openai", "openai"]
+
+
+def test_orcamento_de_tokens_bloqueia_chamada_que_nao_cabe():
+    budget = TokenBudget(limit=100)
+    budget.reserve(80)
+    with pytest.raises(TokenBudgetExceeded):
+        budget.reserve(30)
+    budget.settle(80, 40)
+    assert budget.remaining == 60
+
+
+def test_prompts_identicos_concorrentes_compartilham_uma_requisicao():
+    calls = []
+    router = make_router({"openai": (0.2, "resposta")})
+    original = router._call_provider
+
+    def counting_call(provider, model, prompt):
+        calls.append(prompt)
+        return original(provider, model, prompt)
+
+    router._call_provider = counting_call
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(router.generate("m", "igual")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["resposta"] * 5
+    assert calls == ["igual"]
+    assert router.coalescing_stats()["coalesced"] == 4
+
+
+def test_rate_limiter_compartilhado_por_config_de_limites():
+    a = {"rate_limits": {"openai": {"default": {"rpm": 60}}}}
+    b = {"rate_limits": {"openai": {"default": {"rpm": 5}}}}
+    assert RateLimiter.shared(a) is RateLimiter.shared(dict(a))
+    assert RateLimiter.shared(a) is not RateLimiter.shared(b)
+
+
+def test_penalize_so_com_tpm_segura_a_proxima_chamada():
+    limiter = RateLimiter({"rate_limits": {"openai": {"default": {"tpm": 6000}}}})
+    assert limiter.penalize("openai", "m", 2.0) == 0.0
+    assert limiter.reserve("openai", "m", "oi") >= 2.0
+    # sem balde algum, quem chamou espera o retry-after
+    assert RateLimiter({"rate_limits": {}}).penalize("openai", "m", 2.0) == 2.0
+
+
+def test_pool_http_tem_clientes_por_event_loop():
+    pool = AsyncHTTPPool({})
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    async def use(name):
+        client = pool.client("openai")
+        await asyncio.to_thread(barrier.wait)  # o outro loop usa o pool agora
+        assert pool.client("openai") is client
+        await pool.aclose()
+        seen[name] = client
+
+    threads = [threading.Thread(target=asyncio.run, args=(use(n),)) for n in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert seen["a"] is not seen["b"]
+    assert seen["a"].is_closed and seen["b"].is_closed
+
+
+def test_routers_com_cadeias_diferentes_nao_compartilham_requisicao():
+    shared = SingleFlight()
+    rapido = make_router({"openai": (0.2, "do openai")})
+    outro = make_router({"gemini": (0.2, "do gemini")})
+    rapido.inflight = outro.inflight = shared
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda r=r: results.setdefault(r, r.generate("m", "p")))
+        for r in (rapido, outro)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {rapido: "do openai", outro: "do gemini"}
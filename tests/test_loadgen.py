@@ -0,0 +1,110 @@
+# tests/test_loadgen.py
+
+import json
+
+import pytest
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.catalog import build_step_factories
+from src import loadgen
+from utils.llm_clients import registry
+from utils.mock_provider import MockProvider, MockProviderError
+from utils.provider_health import HealthRegistry
+
+RULES = {
+    "event_workflows": {"NEW_PROJECT_CREATED": ["analyze_market", "analyze_risks"]},
+    "step_agents": {
+        "analyze_market": "market_intel_bot",
+        "analyze_risks": "risk_sentinel",
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def limpa_registro():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def make_router(latency_ms=0, error_rate=0.0, seed=7) -> AgentRouter:
+    config = loadgen.mock_config(
+        {"model_mapping": {}}, latency_ms=latency_ms, error_rate=error_rate, seed=seed
+    )
+    return AgentRouter(build_step_factories(RULES, AgentPool(config)), RULES)
+
+
+def eventos(n: int) -> list:
+    return [
+        {
+            "event_type": "NEW_PROJECT_CREATED",
+            "data": {"name": f"Projeto {i}", "project_type": "Software"},
+        }
+        for i in range(n)
+    ]
+
+
+def test_mock_e_deterministico_pela_seed():
+    a = MockProvider({"seed": 1, "error_rate": 0.5})
+    b = MockProvider({"seed": 1, "error_rate": 0.5})
+
+    def sequencia(provider):
+        saida = []
+        for _ in range(20):
+            try:
+                saida.append(provider.generate("m", "prompt"))
+            except MockProviderError:
+                saida.append("erro")
+        return saida
+
+    assert sequencia(a) == sequencia(b)
+    assert "erro" in sequencia(MockProvider({"seed": 1, "error_rate": 0.5}))
+
+
+def test_mock_guarda_contagem_de_poucos_prompts():
+    provider = MockProvider({"max_tracked_prompts": 2})
+    for i in range(5):
+        provider.generate("m", f"prompt {i}")
+    assert len(provider._counts) == 2
+
+
+def test_mock_stream_reconstroi_a_resposta():
+    provider = MockProvider({"seed": 3, "stream_chunks": 4})
+    texto = "".join(provider.stream("m", "um prompt qualquer"))
+    assert texto == MockProvider({"seed": 3}).generate("m", "um prompt qualquer")
+
+
+def test_replay_sem_erros_mede_latencia():
+    report = loadgen.replay(make_router(latency_ms=10), eventos(6), rate=0)
+    assert report["events"] == 6
+    assert report["failed_events"] == 0
+    assert report["step_latency"]["p50"] >= 0.01
+    assert report["event_latency"]["p99"] >= report["event_latency"]["p50"]
+
+
+def test_replay_conta_falhas_do_mock():
+    report = loadgen.replay(make_router(error_rate=1.0), eventos(3), rate=0)
+    assert report["failed_events"] == 3
+    assert report["failed_steps"] == 6
+    assert report["top_errors"]
+
+
+def test_mock_nao_compartilha_a_saude_dos_provedores_reais(tmp_path):
+    real = {"provider_health": {"snapshot_path": str(tmp_path / "health.json")}}
+    mock = loadgen.mock_config(real)
+
+    assert HealthRegistry.shared(mock) is not HealthRegistry.shared(real)
+    assert HealthRegistry.shared(mock) is HealthRegistry.shared(dict(mock))
+    assert HealthRegistry.shared(mock).snapshot_path is None
+
+
+def test_load_trace_ignora_comentarios(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    path.write_text(
+        "# comentário\n\n" + json.dumps(eventos(1)[0]) + "\n", encoding="utf-8"
+    )
+    assert len(loadgen.load_trace(str(path))) == 1
+    path.write_text('{"data": {}}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        loadgen.load_trace(str(path))
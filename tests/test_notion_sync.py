@@ -0,0 +1,92 @@
+# tests/test_notion_sync.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from agents.notion_writer import NotionWriter
+from utils import rate_limiter
+from utils.notion_stub import NotionStub
+from utils.notion_sync import NotionError, NotionSync, task_properties
+
+
+@pytest.fixture
+def stub():
+    with NotionStub(rate_limit=40, burst=4) as server:
+        yield server
+
+
+def tarefas(n: int) -> list:
+    return [
+        {"name": f"Tarefa {i}", "dor": "pronto", "dod": "feito", "estimate": i}
+        for i in range(n)
+    ]
+
+
+def test_paginas_em_paralelo_respeitam_o_ritmo(monkeypatch):
+    # relógio do balde parado: a espera devolvida a cada requisição mostra o
+    # horário reservado para ela, sem depender do agendamento das threads
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=lambda: 0.0))
+    sync = NotionSync("token", requests_per_second=4, max_workers=4)
+    waits = []
+    reserve = sync.bucket.reserve
+
+    def record(amount):
+        waits.append(reserve(amount))
+        return 0.0  # não dorme: o stub sem limite responde na hora
+
+    sync.bucket.reserve = record
+    with NotionStub(rate_limit=0) as stub:
+        sync.client.base_url = stub.url
+        items = [task_properties(t, "pagina-projeto") for t in tarefas(20)]
+        results = sync.create_pages("db-tarefas", items)
+
+    assert all(r["error"] is None for r in results)
+    assert len({r["page_id"] for r in results}) == 20
+    # uma requisição a cada 1/4 s, mesmo com 4 threads disputando o balde
+    assert sorted(waits) == pytest.approx([k / 4 for k in range(20)])
+    page = stub.pages[results[7]["page_id"]]
+    assert page["properties"]["Nome"]["title"][0]["text"]["content"] == "Tarefa 7"
+    assert page["properties"]["Projeto"]["relation"] == [{"id": "pagina-projeto"}]
+
+
+def test_429_e_5xx_sao_repetidos_com_backoff(stub):
+    stub.error_rate = 0.3
+    # sem ritmo no cliente: o stub responde 429 e o cliente espera o Retry-After
+    sync = NotionSync(
+        "token",
+        base_url=stub.url,
+        requests_per_second=1000,
+        max_workers=8,
+        max_retries=10,
+        backoff_base_seconds=0.01,
+    )
+    results = sync.create_pages("db", [task_properties(t) for t in tarefas(20)])
+    assert all(r["page_id"] for r in results)
+    assert 429 in stub.statuses and 503 in stub.statuses
+    assert sync.stats["rate_limited"] > 0
+    assert sync.stats["requests"] == len(stub.statuses)
+
+
+def test_erro_de_validacao_nao_e_repetido(stub):
+    sync = NotionSync("token", base_url=stub.url, requests_per_second=40)
+    with pytest.raises(NotionError, match="HTTP 400"):
+        sync.request("POST", "/v1/pages", {"properties": {}})
+    assert sync.stats == {"requests": 1, "retries": 0, "rate_limited": 0}
+
+
+def test_notion_writer_mapeia_ids_das_paginas(stub):
+    config = {
+        "api_keys": {"notion": "token"},
+        "notion_db": {"projects_db_id": "db-projetos", "tasks_db_id": "db-tarefas"},
+        "notion_sync": {"base_url": stub.url, "requests_per_second": 40},
+    }
+    writer = NotionWriter(config, {})
+    project_id = writer.create_project_page({"name": "P", "slug": "p"})
+    pages = writer.create_task_pages(tarefas(5), project_relation_id=project_id)
+    assert stub.pages[project_id]["parent"] == {"database_id": "db-projetos"}
+    for task, page in zip(tarefas(5), pages):
+        created = stub.pages[page["page_id"]]
+        assert created["parent"] == {"database_id": "db-tarefas"}
+        title = created["properties"]["Nome"]["title"][0]["text"]["content"]
+        assert title == task["name"]
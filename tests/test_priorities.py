@@ -0,0 +1,115 @@
+# tests/test_priorities.py
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from src.models import Project, Task
+from src.priorities import ensure_task_columns, prioritize
+from utils.rule_compiler import RuleError, assign_levels, compile_condition
+
+RULES = [
+    {"condition": "risk_score >= 8", "level": "critical"},
+    {"condition": "due_date_days <= 3", "level": "high"},
+    {"condition": "status == 'unlocked'", "level": "medium"},
+]
+
+
+def test_condicoes_compiladas_e_cacheadas():
+    frame = pd.DataFrame(
+        {"risk_score": [9, 2, None], "status": ["locked", "unlocked", "done"]}
+    )
+    rule = compile_condition("risk_score >= 8 or status in ['unlocked']")
+    assert rule is compile_condition("risk_score >= 8 or status in ['unlocked']")
+    assert rule.columns == {"risk_score", "status"}
+    assert rule(frame).tolist() == [True, True, False]
+    assert compile_condition("not 1 < risk_score < 5")(frame).tolist() == [
+        True,
+        False,
+        True,
+    ]
+    # coluna inexistente: condição falsa, sem erro
+    assert not compile_condition("nao_existe > 0")(frame).any()
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["__import__('os').system('x')", "risk_score.real > 1", "x[0] == 1", "x >="],
+)
+def test_construcoes_nao_permitidas(expression):
+    with pytest.raises(RuleError):
+        compile_condition(expression)
+
+
+def test_primeira_regra_verdadeira_vence_e_e_rapido():
+    n = 50_000
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {
+            "risk_score": rng.uniform(0, 10, n),
+            "due_date_days": rng.uniform(-5, 30, n),
+            "status": rng.choice(["locked", "unlocked"], n),
+        }
+    )
+    assign_levels(frame, RULES, default="low")  # compila
+    start = time.perf_counter()
+    levels = assign_levels(frame, RULES, default="low")
+    elapsed = time.perf_counter() - start
+
+    expected = np.where(
+        frame["risk_score"] >= 8,
+        "critical",
+        np.where(
+            frame["due_date_days"] <= 3,
+            "high",
+            np.where(frame["status"] == "unlocked", "medium", "low"),
+        ),
+    )
+    assert (levels == expected).all()
+    assert elapsed < 0.5
+
+
+def test_prioritize_grava_so_o_que_mudou(test_db_session):
+    now = datetime(2026, 1, 10)
+    project = Project(slug="p", name="P")
+    test_db_session.add(project)
+    test_db_session.flush()
+    tasks = [
+        Task(project_id=project.id, template="a", risk_score=9, percent_done=0),
+        Task(
+            project_id=project.id,
+            template="b",
+            risk_score=1,
+            end_date=now + timedelta(days=1),
+        ),
+        Task(project_id=project.id, template="c", percent_done=100),
+        Task(project_id=project.id, template="d", dependencies=["c"]),
+        Task(project_id=project.id, template="e", dependencies=["a"]),
+    ]
+    test_db_session.add_all(tasks)
+    test_db_session.commit()
+
+    rules = {"priorities": RULES, "default_priority": "low"}
+    report = prioritize(test_db_session, rules, now=now)
+    assert [t.priority for t in tasks] == ["critical", "high", None, "medium", "low"]
+    assert report["changed"] == 4
+
+    assert prioritize(test_db_session, rules, now=now)["changed"] == 0
+
+
+def test_banco_antigo_ganha_coluna_e_indice_de_prioridade(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'antigo.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY)"))
+    ensure_task_columns(engine)
+    ensure_task_columns(engine)  # idempotente
+
+    inspector = inspect(engine)
+    assert {"risk_score", "priority"} <= {
+        c["name"] for c in inspector.get_columns("tasks")
+    }
+    assert "ix_tasks_priority" in {i["name"] for i in inspector.get_indexes("tasks")}
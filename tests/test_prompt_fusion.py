@@ -0,0 +1,93 @@
+# tests/test_prompt_fusion.py
+
+import pytest
+
+from agents import base_agent
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.catalog import build_step_factories
+from src import loadgen
+from utils.llm_clients import registry
+from utils.mock_provider import MockProvider
+from utils.prompt_fusion import build_fused_prompt, fused_keys, split_fused_response
+
+RULES = {
+    "event_workflows": {"E": ["analyze_market", "analyze_compliance", "design_org"]},
+    "step_agents": {
+        "analyze_market": "market_intel_bot",
+        "analyze_compliance": "compliance_guardian",
+        "design_org": "org_designer",
+    },
+    "workflow": {"fusion": {"enabled": True}},
+}
+MAPPING = {
+    "market_intel_bot": "modelo-a",
+    "compliance_guardian": "modelo-a",
+    "org_designer": "modelo-b",
+}
+
+
+@pytest.fixture(autouse=True)
+def limpa_registro():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def chamadas(monkeypatch):
+    prompts = []
+    original = MockProvider.generate
+
+    def generate(self, model, prompt):
+        prompts.append((model, prompt))
+        return original(self, model, prompt)
+
+    monkeypatch.setattr(MockProvider, "generate", generate)
+    return prompts
+
+
+def make_router(rules=RULES) -> AgentRouter:
+    config = loadgen.mock_config({"model_mapping": MAPPING}, latency_ms=0, seed=1)
+    return AgentRouter(build_step_factories(rules, AgentPool(config)), rules)
+
+
+def test_resposta_fundida_e_separada_por_chave():
+    prompt = build_fused_prompt({"a": "Tarefa A", "b": "Tarefa B"})
+    assert fused_keys(prompt) == ["a", "b"]
+    text = '```json\n{"a": "resposta A", "b": {"x": 1}, "c": "extra"}\n```'
+    parts = split_fused_response(text, ["a", "b"])
+    assert parts["a"] == "resposta A"
+    assert '"x": 1' in parts["b"]
+    assert split_fused_response('{"a": ""}', ["a", "b"]) == {}
+    assert split_fused_response("não é JSON", ["a"]) == {}
+
+
+def test_etapas_com_mesmo_modelo_vao_numa_unica_requisicao(chamadas):
+    results = make_router().route_event("E", {"name": "Projeto Fusão"})
+    assert all(r["error"] is None for r in results.values())
+    # uma requisição fundida (modelo-a) + org_designer sozinho (modelo-b)
+    assert sorted(model for model, _ in chamadas) == ["modelo-a", "modelo-b"]
+    fused = next(p for m, p in chamadas if m == "modelo-a")
+    assert fused_keys(fused) == ["market_intel_bot", "compliance_guardian"]
+    assert "(market_intel_bot)" in results["analyze_market"]["output"]
+    assert "(compliance_guardian)" in results["analyze_compliance"]["output"]
+
+
+def test_parte_invalida_e_refeita_em_separado(chamadas, monkeypatch):
+    def so_mercado(text, keys):
+        return {"market_intel_bot": "só o mercado veio"}
+
+    monkeypatch.setattr(base_agent, "split_fused_response", so_mercado)
+    results = make_router().route_event("E", {"name": "Projeto Parcial"})
+    assert results["analyze_market"]["output"] == "só o mercado veio"
+    assert results["analyze_compliance"]["output"].startswith("[mock:modelo-a]")
+    # fundida + compliance refeita + org_designer
+    assert len(chamadas) == 3
+
+
+def test_sem_fusao_cada_etapa_faz_sua_requisicao(chamadas):
+    rules = {**RULES, "workflow": {}}
+    make_router(rules).route_event("E", {"name": "Projeto Separado"})
+    assert len(chamadas) == 3
+    assert not any(fused_keys(p) for _, p in chamadas)
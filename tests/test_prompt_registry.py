@@ -0,0 +1,67 @@
+# tests/test_prompt_registry.py
+
+import pytest
+
+from agents.catalog import load_agent_class
+from utils.prompt_registry import PromptError, PromptRegistry, PromptTemplate
+from utils.rate_limiter import estimate_tokens
+
+SECTIONS = {"formato": "Formate em tópicos."}
+
+
+def test_template_embute_secoes_e_usa_padroes():
+    template = PromptTemplate(
+        "t",
+        'Projeto "{name}" em {country}.\n{@formato}',
+        defaults={"country": "Brasil"},
+        sections=SECTIONS,
+    )
+    assert template.fields == ("name", "country")
+    assert (
+        template.render({"name": "X"}) == 'Projeto "X" em Brasil.\nFormate em tópicos.'
+    )
+
+
+def test_secao_inexistente_levanta_erro():
+    with pytest.raises(PromptError):
+        PromptTemplate("t", "{@nao_existe}", sections=SECTIONS)
+
+
+def test_campo_longo_e_resumido_para_caber_no_orcamento():
+    template = PromptTemplate("t", "Time:\n{team}\nFim.", trim=["team"])
+    team = [{"role": f"Papel {i}", "hours_per_week": 40} for i in range(200)]
+    full = template.render({"team": team})
+    prompt = template.render({"team": team}, max_tokens=100)
+    assert estimate_tokens(full) > 100
+    assert estimate_tokens(prompt) <= 100
+    assert prompt.startswith("Time:\n- role: Papel 0, hours_per_week: 40")
+    assert "itens omitidos)" in prompt and prompt.endswith("Fim.")
+
+
+def test_agente_usa_template_e_versao_do_registro():
+    config = {"model_mapping": {}, "prompts": {"max_tokens": {"default": 200}}}
+    registry = PromptRegistry.shared(config)
+    agent = load_agent_class("org_designer")(config, {})
+    assert agent.prompt_template is registry.get("org_designer")
+    assert agent.prompt_version == registry.get("org_designer").version
+
+    data = {"team_capacity": [{"role": f"Dev {i}"} for i in range(500)]}
+    prompt = agent.compose_prompt({**data, "upstream": {"design": "x" * 5000}})
+    assert "Dev 0" in prompt and "itens omitidos" in prompt
+    # o contexto das etapas anteriores também respeita o orçamento
+    assert "x" * 400 not in prompt
+
+
+def test_versao_1_reproduz_o_prompt_original_byte_a_byte():
+    # texto do antigo RiskSentinel.build_prompt (f-string), espaços inclusive
+    original = (
+        "\nVocê é um analista de riscos corporativos. \n"
+        'Liste e avalie os principais riscos do projeto "Acme":\n\n'
+        "- Riscos técnicos, de mercado, financeiros, regulatórios, operacionais\n"
+        "- Probabilidade e impacto (use escala qualitativa: baixo/médio/alto)\n"
+        "- Plano de mitigação recomendado\n\n"
+        "Formate em tabela ou bullets.\n"
+    )
+    template = PromptRegistry("config/prompts").get("risk_sentinel")
+    assert template.version == "1"
+    assert template.render({"name": "Acme"}) == original
@@ -0,0 +1,33 @@
+# tests/test_scheduler.py
+
+from sqlalchemy import text
+
+from src import db, scheduler
+
+
+def test_recarga_da_config_refaz_o_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "engine", None)
+    try:
+        scheduler.on_config_reload({"database_url": f"sqlite:///{tmp_path / 'a.db'}"})
+        first = scheduler.engine
+        scheduler.on_config_reload(
+            {
+                "database_url": f"sqlite:///{tmp_path / 'b.db'}",
+                "database": {"busy_timeout_ms": 500},
+            }
+        )
+        assert scheduler.engine is not first
+        assert scheduler.engine.url.database.endswith("b.db")
+        with scheduler.engine.connect() as conn:
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 500
+    finally:
+        db.configure({})
+        db.dispose_all()
+
+
+def test_priorizacao_sem_config_nao_roda(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(scheduler, "get_config", lambda: None)
+    monkeypatch.setattr(scheduler, "prioritize", lambda *a, **k: chamadas.append(a))
+    scheduler.run_prioritization()
+    assert chamadas == []
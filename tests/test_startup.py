@@ -0,0 +1,82 @@
+# tests/test_startup.py
+"""
+Benchmark do tempo de import da CLI. Os wrappers chamam `python -m
+src.main` centenas de vezes por hora; se um import pesado voltar para o
+topo de `src/main.py`, estes testes falham.
+
+O limite em segundos depende da máquina, então só é verificado com
+`CLI_IMPORT_BUDGET` definido (ex.: `CLI_IMPORT_BUDGET=0.5 pytest`); os
+demais testes comparam quais módulos são importados.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# import de src.main (cumulativo, -X importtime) em segundos; hoje ~0,1 s,
+# o SQLAlchemy sozinho passa de 0,2 s e a CLI inteira de 1 s
+MAX_IMPORT_SECONDS = os.environ.get("CLI_IMPORT_BUDGET")
+HEAVY_MODULES = (
+    "sqlalchemy",
+    "pandas",
+    "numpy",
+    "yaml",
+    "httpx",
+    "openai",
+    "google.generativeai",
+    "agents",
+    "src.commands",
+    "src.models",
+)
+
+
+def import_times(statement: str) -> dict:
+    """{módulo: segundos cumulativos} de `python -X importtime -c statement`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+(.+)$", line)
+        if match:
+            times[match.group(2).strip()] = int(match.group(1)) / 1e6
+    return times
+
+
+def test_main_nao_importa_dependencias_pesadas():
+    times = import_times("import src.main")
+    heavy = sorted(
+        name
+        for name in times
+        if any(name == m or name.startswith(m + ".") for m in HEAVY_MODULES)
+    )
+    assert heavy == []
+
+
+@pytest.mark.skipif(
+    not MAX_IMPORT_SECONDS, reason="defina CLI_IMPORT_BUDGET (segundos) para medir"
+)
+def test_tempo_de_import_da_cli():
+    # melhor de 3: o primeiro processo paga o cache frio do disco
+    best = min(import_times("import src.main")["src.main"] for _ in range(3))
+    assert best < float(MAX_IMPORT_SECONDS), f"import de src.main levou {best:.3f}s"
+
+
+def test_comando_importa_so_o_seu_modulo():
+    times = import_times(
+        "from typer.testing import CliRunner; from src.main import app; "
+        "CliRunner().invoke(app, ['trace-summary', '--path', '/nao/existe'])"
+    )
+    assert "src.commands.observability" in times
+    assert "src.commands.projects" not in times
+    assert not any(name.startswith("agents.") for name in times)
@@ -0,0 +1,108 @@
+# tests/test_step_store.py
+
+import pytest
+from sqlalchemy import create_engine
+
+from agents.agent_router import AgentRouter
+from agents.base_agent import BaseAgent
+from src.step_store import StepStore
+
+RULES = {
+    "event_workflows": {"E": ["mercado", "gtm", "pais"]},
+    "dependencies": {"gtm": ["mercado"]},
+}
+
+
+class CampoAgent(BaseAgent):
+    """Agente de teste cujo prompt usa um único campo do projeto."""
+
+    def __init__(self, name, field, calls):
+        super().__init__(name, {"fallback_chain": []}, {name: "modelo-x"})
+        self.field = field
+        self.calls = calls
+        self.router.generate = self.fake_generate
+
+    def fake_generate(self, model, prompt, **kwargs):
+        self.calls.append(self.name)
+        return f"{self.name}:{prompt.strip()[:40]}"
+
+    def build_prompt(self, project_data):
+        return f"Analise {project_data.get(self.field)}"
+
+
+@pytest.fixture
+def setup(tmp_path):
+    calls = []
+    agents = {
+        "mercado": CampoAgent("mercado", "name", calls),
+        "gtm": CampoAgent("gtm", "project_type", calls),
+        "pais": CampoAgent("pais", "country", calls),
+    }
+    store = StepStore(create_engine(f"sqlite:///{tmp_path / 'etapas.db'}"))
+    router = AgentRouter(
+        {s: (lambda a=a: a) for s, a in agents.items()}, RULES, store=store
+    )
+    return router, calls, store
+
+
+def test_reexecucao_sem_mudanca_nao_chama_llm(setup):
+    router, calls, store = setup
+    data = {"slug": "p", "name": "App", "project_type": "Software", "country": "BR"}
+    first = router.route_event("E", data)
+    assert sorted(calls) == ["gtm", "mercado", "pais"]
+    calls.clear()
+
+    second = router.route_event("E", data)
+    assert calls == []
+    assert all(r["cached"] for r in second.values())
+    assert {s: r["output"] for s, r in second.items()} == {
+        s: r["output"] for s, r in first.items()
+    }
+
+
+def test_mudanca_recalcula_so_o_cone_a_jusante(setup):
+    router, calls, _ = setup
+    data = {"slug": "p", "name": "App", "project_type": "Software", "country": "BR"}
+    router.route_event("E", data)
+
+    calls.clear()
+    router.route_event("E", {**data, "country": "PT"})
+    assert calls == ["pais"]
+
+    calls.clear()
+    results = router.route_event("E", {**data, "country": "PT", "name": "Outro"})
+    # gtm não usa o nome, mas depende de mercado, cuja saída mudou
+    assert sorted(calls) == ["gtm", "mercado"]
+    assert results["pais"]["cached"]
+
+
+def test_force_e_prompt_version_invalidam(setup):
+    router, calls, _ = setup
+    data = {"slug": "p", "name": "App", "project_type": "Software", "country": "BR"}
+    router.route_event("E", data)
+
+    calls.clear()
+    router.force = True
+    router.route_event("E", data)
+    assert len(calls) == 3
+
+    router.force = False
+    calls.clear()
+    agent = router.agents["pais"]()
+    agent.prompt_version = "2"
+    router.route_event("E", data)
+    assert calls == ["pais"]
+
+
+def test_put_many_com_impressao_digital_repetida_nao_perde_o_lote(tmp_path):
+    store = StepStore(create_engine(f"sqlite:///{tmp_path / 'saidas.db'}"))
+    row = {"project_key": None, "agent": "a", "model": "m"}
+    store.put_many(
+        [
+            {**row, "fingerprint": "f1", "step": "s1", "output": "velha"},
+            {**row, "fingerprint": "f2", "step": "s2", "output": "outra"},
+            {**row, "fingerprint": "f1", "step": "s1", "output": "nova"},
+        ]
+    )
+    assert store.get("f1") == "nova"
+    assert store.get("f2") == "outra"
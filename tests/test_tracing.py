@@ -0,0 +1,115 @@
+# tests/test_tracing.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.agent_pool import AgentPool
+from agents.agent_router import AgentRouter
+from agents.catalog import build_step_factories
+from src import loadgen
+from utils import tracing
+from utils.llm_clients import registry
+from utils.llm_router import LLMRouter
+from utils.tracing import Tracer, load_spans, propagate
+
+
+@pytest.fixture(autouse=True)
+def tracer_isolado(monkeypatch):
+    # cada teste começa com o tracing desligado, como num processo novo
+    monkeypatch.setattr(tracing, "_active", Tracer(enabled=False))
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def ativa(tmp_path) -> Tracer:
+    config = {"tracing": {"enabled": True, "path": str(tmp_path / "traces.jsonl")}}
+    return tracing.activate(config)
+
+
+def test_spans_aninhados_inclusive_em_threads_do_pool(tmp_path):
+    tracer = ativa(tmp_path)
+
+    def filho(i):
+        with tracing.span("filho", i=i):
+            pass
+
+    with tracing.span("raiz") as raiz:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(propagate(filho), range(3)))
+
+    spans = load_spans(tracer.path)
+    assert [s["name"] for s in spans].count("filho") == 3
+    root = next(s for s in spans if s["name"] == "raiz")
+    assert root["parent_id"] is None and root["span_id"] == raiz.span_id
+    for s in spans:
+        assert s["trace_id"] == root["trace_id"]
+        if s["name"] == "filho":
+            assert s["parent_id"] == root["span_id"]
+            assert s["duration_ms"] >= 0
+
+
+def test_excecao_marca_span_com_erro(tmp_path):
+    tracer = ativa(tmp_path)
+    with pytest.raises(RuntimeError):
+        with tracing.span("falha"):
+            raise RuntimeError("boom")
+    (record,) = load_spans(tracer.path)
+    assert record["status"] == "error"
+    assert "boom" in record["error"]
+
+
+def test_tracing_desligado_nao_grava_nada(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.activate({"tracing": {"enabled": False, "path": str(path)}})
+    with tracing.span("nada") as current:
+        current.set(x=1)
+    assert current is tracing.NOOP_SPAN
+    assert not path.exists()
+
+
+def test_construir_router_nao_troca_o_tracer_ativo(tmp_path):
+    tracer = ativa(tmp_path)
+    LLMRouter({"fallback_chain": [], "tracing": {"enabled": False}}, {})
+    assert tracing._active is tracer
+
+
+def test_workflow_gera_arvore_evento_etapa_agente_llm(tmp_path):
+    rules = {
+        "event_workflows": {"E": ["analyze_market", "analyze_risks"]},
+        "step_agents": {
+            "analyze_market": "market_intel_bot",
+            "analyze_risks": "risk_sentinel",
+        },
+        "dependencies": {"analyze_risks": ["analyze_market"]},
+    }
+    config = loadgen.mock_config({"model_mapping": {}}, latency_ms=1, seed=3)
+    config["tracing"] = {"enabled": True, "path": str(tmp_path / "traces.jsonl")}
+    tracing.activate(config)  # como faz o get_config da CLI
+    router = AgentRouter(build_step_factories(rules, AgentPool(config)), rules)
+    router.route_event("E", {"name": "Projeto"})
+
+    spans = load_spans(config["tracing"]["path"])
+    by_id = {s["span_id"]: s for s in spans}
+
+    def chain(record):
+        names = []
+        while record:
+            names.append(record["name"])
+            record = by_id.get(record["parent_id"])
+        return names
+
+    (event,) = [s for s in spans if s["name"] == "workflow.event"]
+    assert event["attributes"]["steps"] == 2
+    attempts = [s for s in spans if s["name"] == "llm.attempt"]
+    assert len(attempts) == 2
+    for attempt in attempts:
+        assert chain(attempt) == [
+            "llm.attempt",
+            "llm.generate",
+            "agent.execute",
+            "workflow.step",
+            "workflow.event",
+        ]
+        assert attempt["attributes"]["provider"] == "mock"
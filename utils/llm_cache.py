@@ -0,0 +1,198 @@
+# utils/llm_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT PRIMARY KEY,
+    provider    TEXT NOT NULL,
+    model       TEXT,
+    agent       TEXT,
+    response    TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access);
+"""
+
+# Um cache por arquivo, compartilhado por todos os agentes do processo
+_instances: dict = {}
+_instances_lock = threading.Lock()
+
+
+def default_cache_path(config: dict) -> str:
+    """
+    Coloca o cache ao lado do banco SQLite principal (`database_url`).
+    Para bancos que não são SQLite, usa o diretório atual.
+    """
+    db_url = config.get("database_url") or ""
+    prefix = "sqlite:///"
+    if db_url.startswith(prefix):
+        db_dir = os.path.dirname(db_url[len(prefix) :])
+        return os.path.join(db_dir, "llm_cache.db")
+    return "llm_cache.db"
+
+
+class LLMCache:
+    """
+    Cache persistente de respostas de LLM, endereçado por conteúdo:
+    a chave é o hash de (provedor, modelo, prompt). Cada entrada expira
+    conforme o TTL do agente e, acima de `max_entries`, as menos usadas
+    recentemente (LRU) são descartadas.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        default_ttl: float = 86400,
+        agent_ttls: Optional[dict] = None,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.agent_ttls = agent_ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["LLMCache"]:
+        """
+        Retorna a instância compartilhada configurada em `llm_cache`,
+        ou None se o cache estiver desabilitado.
+        """
+        cfg = config.get("llm_cache") or {}
+        if not cfg.get("enabled", False):
+            return None
+        path = cfg.get("path") or default_cache_path(config)
+        with _instances_lock:
+            if path not in _instances:
+                _instances[path] = cls(
+                    path,
+                    max_entries=int(cfg.get("max_entries", 5000)),
+                    default_ttl=float(cfg.get("default_ttl_seconds", 86400)),
+                    agent_ttls=cfg.get("agent_ttl_seconds") or {},
+                )
+            return _instances[path]
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str) -> str:
+        raw = "\x1f".join([provider, model or "", prompt])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def contains(self, providers: list, model: str, prompt: str) -> bool:
+        """
+        Se há resposta válida para algum dos provedores. Só consulta: não
+        conta hit/miss nem atualiza o `last_access` da LRU.
+        """
+        keys = [self.make_key(p, model, prompt) for p in providers]
+        if not keys:
+            return False
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM llm_cache WHERE key IN ({marks}) AND expires_at > ?",
+                [*keys, time.time()],
+            ).fetchone()
+        return row is not None
+
+    def get(self, providers: list, model: str, prompt: str) -> Optional[tuple]:
+        """
+        Procura uma resposta válida para qualquer um dos provedores, na
+        ordem dada. Retorna (provedor, resposta) ou None.
+        """
+        keys = {self.make_key(p, model, prompt): p for p in providers}
+        if not keys:
+            return None
+        now = time.time()
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, response FROM llm_cache "
+                f"WHERE key IN ({marks}) AND expires_at > ?",
+                [*keys, now],
+            ).fetchall()
+            if not rows:
+                self.misses += 1
+                return None
+            found = dict(rows)
+            key = next(k for k in keys if k in found)
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return keys[key], found[key]
+
+    def put(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        response: str,
+        agent_name: Optional[str] = None,
+    ):
+        ttl = float(self.agent_ttls.get(agent_name, self.default_ttl))
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, provider, model, agent, response, created_at, expires_at, "
+                "last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.make_key(provider, model, prompt),
+                    provider,
+                    model,
+                    agent_name,
+                    response,
+                    now,
+                    now + ttl,
+                    now,
+                ),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Remove expirados e, se ainda acima do limite, os menos usados."""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "path": self.path,
+        }
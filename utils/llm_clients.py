@@ -0,0 +1,113 @@
+# utils/llm_clients.py
+import importlib.util
+import threading
+from typing import Optional
+
+# Módulo de cada SDK, usado para checar disponibilidade sem importá-lo
+SDK_MODULES = {
+    "openai": "openai",
+    "gemini": "google.generativeai",
+    "anthropic": "anthropic",
+    "mistral": "huggingface_hub",
+    "cohere": "cohere",
+    "mock": "utils.mock_provider",
+}
+
+
+def _build_openai(config: dict):
+    import openai
+
+    openai.api_key = config.get("openai_key")
+    return openai
+
+
+def _build_gemini(config: dict):
+    import google.generativeai as genai
+
+    genai.configure(api_key=config.get("gemini_key"))
+    return genai
+
+
+def _build_anthropic(config: dict):
+    from anthropic import Client as AnthropicClient
+
+    return AnthropicClient(config.get("anthropic_key"))
+
+
+def _build_mistral(config: dict):
+    from huggingface_hub import InferenceClient
+
+    return InferenceClient(token=config.get("mistral_key"))
+
+
+def _build_cohere(config: dict):
+    import cohere
+
+    return cohere.Client(config.get("cohere_key"))
+
+
+def _build_mock(config: dict):
+    from utils.mock_provider import MockProvider
+
+    return MockProvider(config.get("mock_provider"))
+
+
+BUILDERS = {
+    "openai": _build_openai,
+    "gemini": _build_gemini,
+    "anthropic": _build_anthropic,
+    "mistral": _build_mistral,
+    "cohere": _build_cohere,
+    "mock": _build_mock,
+}
+
+
+class ClientRegistry:
+    """
+    Registro de clientes de LLM do processo. O SDK de cada provedor só é
+    importado, e o cliente só é construído, na primeira chamada a esse
+    provedor; depois o mesmo cliente é reaproveitado por todos os agentes.
+    """
+
+    def __init__(self):
+        self._clients: dict = {}
+        self._available: dict = {}
+        self._lock = threading.Lock()
+
+    def is_available(self, provider: str) -> bool:
+        """Diz se o SDK do provedor está instalado, sem importá-lo."""
+        if provider not in self._available:
+            module = SDK_MODULES.get(provider)
+            try:
+                found = module is not None and importlib.util.find_spec(module)
+            except ModuleNotFoundError:
+                found = False
+            self._available[provider] = bool(found)
+        return self._available[provider]
+
+    def get(self, provider: str, config: dict) -> Optional[object]:
+        """
+        Retorna o cliente do provedor para a chave configurada, criando-o
+        se necessário. Retorna None se o SDK não estiver instalado.
+        """
+        if not self.is_available(provider):
+            return None
+        key = (provider, config.get(f"{provider}_key"))
+        if provider == "mock":
+            # o mock não tem chave: cada configuração é um cliente diferente
+            key = (provider, repr(config.get("mock_provider")))
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = BUILDERS[provider](config)
+                    self._clients[key] = client
+        return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+
+registry = ClientRegistry()
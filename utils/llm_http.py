@@ -0,0 +1,174 @@
+# utils/llm_http.py
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+# URL base de cada provedor; pode ser sobrescrita em `async_http.endpoints`
+# (ex.: apontar para um servidor stub local nos testes).
+DEFAULT_ENDPOINTS = {
+    "openai": "https://api.openai.com",
+    "gemini": "https://generativelanguage.googleapis.com",
+    "anthropic": "https://api.anthropic.com",
+    "mistral": "https://api-inference.huggingface.co",
+    "cohere": "https://api.cohere.ai",
+}
+
+DEFAULT_CONCURRENCY = 8
+
+# Pools compartilhados no processo, um por seção `async_http` distinta, para
+# que o limite de concorrência valha para todos os agentes juntos.
+_shared_pools: dict = {}
+_shared_lock = threading.Lock()
+
+
+def build_request(provider: str, model: str, prompt: str, api_key: Optional[str]):
+    """
+    Monta (path, headers, params, body) da chamada REST de cada provedor,
+    equivalente às chamadas feitas via SDK em `LLMRouter._call_provider`.
+    """
+    if provider == "openai":
+        return (
+            "/v1/chat/completions",
+            {"Authorization": f"Bearer {api_key}"},
+            None,
+            {"model": model, "messages": [{"role": "user", "content": prompt}]},
+        )
+    if provider == "gemini":
+        return (
+            f"/v1beta/models/{model}:generateContent",
+            {},
+            {"key": api_key},
+            {"contents": [{"parts": [{"text": prompt}]}]},
+        )
+    if provider == "anthropic":
+        return (
+            "/v1/messages",
+            {"x-api-key": api_key or "", "anthropic-version": "2023-06-01"},
+            None,
+            {
+                "model": model,
+                "max_tokens": 1024,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        )
+    if provider == "mistral":
+        return (
+            f"/models/{model}",
+            {"Authorization": f"Bearer {api_key}"},
+            None,
+            {"inputs": prompt},
+        )
+    if provider == "cohere":
+        return (
+            "/v1/generate",
+            {"Authorization": f"Bearer {api_key}"},
+            None,
+            {"model": model, "prompt": prompt},
+        )
+    raise ValueError(f"Provedor sem suporte HTTP assíncrono: {provider}")
+
+
+def parse_response(provider: str, data) -> str:
+    """Extrai o texto gerado do JSON de resposta de cada provedor."""
+    if provider == "openai":
+        return data["choices"][0]["message"]["content"]
+    if provider == "gemini":
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+    if provider == "anthropic":
+        return data["content"][0]["text"]
+    if provider == "mistral":
+        return data[0]["generated_text"]
+    if provider == "cohere":
+        return data["generations"][0]["text"]
+    raise ValueError(f"Provedor sem suporte HTTP assíncrono: {provider}")
+
+
+class AsyncHTTPPool:
+    """
+    Um `httpx.AsyncClient` (pool de conexões keep-alive) e um semáforo por
+    provedor. O semáforo limita quantas requisições simultâneas cada
+    provedor recebe (`async_http.concurrency`).
+
+    Clientes e semáforos pertencem a um event loop: cada loop (ex.: um
+    `asyncio.run` por thread) tem os seus, e `aclose()` fecha os do loop
+    corrente. Os de loops já fechados são descartados quando outro loop
+    chega, e o estado some junto com o loop (chaves fracas).
+    """
+
+    def __init__(self, config: dict):
+        cfg = config.get("async_http") or {}
+        self.endpoints = {**DEFAULT_ENDPOINTS, **(cfg.get("endpoints") or {})}
+        self.concurrency = cfg.get("concurrency") or {}
+        self.timeout = float(cfg.get("timeout_seconds", 60))
+        self.max_keepalive = int(cfg.get("max_keepalive", 20))
+        # loop -> (clientes, semáforos)
+        self._per_loop: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, config: dict) -> "AsyncHTTPPool":
+        key = repr(sorted((config.get("async_http") or {}).items()))
+        with _shared_lock:
+            if key not in _shared_pools:
+                _shared_pools[key] = cls(config)
+            return _shared_pools[key]
+
+    def supports(self, provider: str) -> bool:
+        return provider in self.endpoints
+
+    def _state(self) -> tuple:
+        """(clientes, semáforos) do event loop corrente."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._per_loop.get(loop)
+            if state is None:
+                for old in [old for old in self._per_loop if old.is_closed()]:
+                    del self._per_loop[old]
+                state = self._per_loop[loop] = ({}, {})
+            return state
+
+    def client(self, provider: str):
+        """`httpx.AsyncClient` do provedor (httpx é importado só aqui)."""
+        clients, _ = self._state()
+        if provider not in clients:
+            import httpx
+
+            limit = self.semaphore_limit(provider)
+            clients[provider] = httpx.AsyncClient(
+                base_url=self.endpoints[provider],
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=limit,
+                    max_keepalive_connections=min(limit, self.max_keepalive),
+                ),
+            )
+        return clients[provider]
+
+    def semaphore_limit(self, provider: str) -> int:
+        return int(self.concurrency.get(provider, DEFAULT_CONCURRENCY))
+
+    def semaphore(self, provider: str) -> asyncio.Semaphore:
+        _, semaphores = self._state()
+        if provider not in semaphores:
+            semaphores[provider] = asyncio.Semaphore(self.semaphore_limit(provider))
+        return semaphores[provider]
+
+    async def call(
+        self, provider: str, model: str, prompt: str, api_key: Optional[str] = None
+    ) -> str:
+        path, headers, params, body = build_request(provider, model, prompt, api_key)
+        async with self.semaphore(provider):
+            resp = await self.client(provider).post(
+                path, headers=headers, params=params, json=body
+            )
+        resp.raise_for_status()
+        return parse_response(provider, resp.json())
+
+    async def aclose(self):
+        """Fecha os clientes do event loop corrente."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._per_loop.pop(loop, None)
+        for client in (state[0] if state else {}).values():
+            await client.aclose()
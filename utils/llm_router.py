@@ -1,28 +1,106 @@
 # utils/llm_router.py
-import google.generativeai as genai
-import openai
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional
 
-# Imports opcionais com fallback silencioso se não estiverem instalados
-try:
-    from anthropic import Client as AnthropicClient
-except ImportError:
-    AnthropicClient = None
+from utils.llm_cache import LLMCache
+from utils.llm_clients import registry as client_registry
+from utils.llm_http import AsyncHTTPPool
+from utils.provider_health import OPEN, HealthRegistry
+from utils.rate_limiter import RateLimiter, is_rate_limited, retry_after
+from utils.singleflight import inflight
+from utils.tracing import Tracer, propagate
 
-try:
-    from huggingface_hub import InferenceClient
-except ImportError:
-    InferenceClient = None
 
-try:
-    import cohere
-except ImportError:
-    cohere = None
+def _describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"[:200]
+
+
+def _no_response(errors: list) -> RuntimeError:
+    """Erro final quando nenhum provedor respondeu, com o motivo de cada um."""
+    if not errors:
+        return RuntimeError("Nenhum provedor retornou resposta.")
+    detail = "; ".join(f"{p}: {_describe(e)}" for p, e in errors)
+    return RuntimeError(f"Nenhum provedor retornou resposta ({detail}).")
+
+
+class ProviderStats:
+    """
+    Contadores por provedor: tentativas, vitórias, erros e latência acumulada.
+    Thread-safe, pois o modo hedged dispara chamadas em paralelo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: dict = {}
+
+    def _entry(self, provider: str) -> dict:
+        return self._data.setdefault(
+            provider,
+            {"attempts": 0, "wins": 0, "errors": 0, "latency_total": 0.0},
+        )
+
+    def record_attempt(self, provider: str, latency: float, ok: bool):
+        with self._lock:
+            entry = self._entry(provider)
+            entry["attempts"] += 1
+            entry["latency_total"] += latency
+            if not ok:
+                entry["errors"] += 1
+
+    def record_win(self, provider: str):
+        with self._lock:
+            self._entry(provider)["wins"] += 1
+
+    def snapshot(self) -> dict:
+        """Retorna uma cópia dos contadores com a latência média por provedor."""
+        with self._lock:
+            out = {}
+            for provider, entry in self._data.items():
+                attempts = entry["attempts"]
+                out[provider] = {
+                    **entry,
+                    "latency_avg": (
+                        entry["latency_total"] / attempts if attempts else 0.0
+                    ),
+                }
+            return out
 
 
 class LLMRouter:
     """
     Faz fallback entre múltiplos provedores de LLM
     conforme configurado em config['fallback_chain'].
+
+    Com `hedging.enabled`, as chamadas são "hedged": o primeiro provedor é
+    disparado e, se não responder em `hedging.delay_seconds`, o próximo da
+    cadeia também é disparado. A primeira resposta válida vence.
+
+    Com `llm_cache.enabled`, respostas são reaproveitadas do cache em disco
+    (ver `utils.llm_cache.LLMCache`) antes de qualquer chamada.
+
+    `agenerate` é a versão assíncrona: fala REST direto com os provedores
+    via pools httpx compartilhados, com limite de concorrência por provedor
+    (ver `utils.llm_http.AsyncHTTPPool`).
+
+    A saúde de cada provedor (circuit breaker + latência) é acompanhada por
+    `utils.provider_health.HealthRegistry`: provedores com circuito aberto
+    são pulados e a cadeia é reordenada pela latência p50 observada.
+
+    Cada (provedor, modelo) tem limites de requisições e tokens por minuto
+    (`utils.rate_limiter.RateLimiter`): chamadas acima do limite esperam
+    na fila em vez de tomar 429 e cair para um provedor pior.
+
+    Chamadas concorrentes com o mesmo (modelo, prompt) compartilham uma
+    única requisição (`utils.singleflight`), inclusive entre agentes, desde
+    que os routers tenham a mesma cadeia e o mesmo objeto de config (caso
+    dos agentes de um `AgentPool`).
+
+    Cada chamada gera um span "llm.generate" e um "llm.attempt" por
+    tentativa em provedor (ver `utils.tracing`).
     """
 
     def __init__(self, config: dict, model_mapping: dict):
@@ -30,54 +108,612 @@ class LLMRouter:
         self.chain = config.get("fallback_chain", [])
         self.mapping = model_mapping
 
-        # Configura clientes somente se as libs estiverem disponíveis
-        self.clients = {}
-        if "openai" in self.chain:
-            openai.api_key = config.get("openai_key")
-            self.clients["openai"] = openai
-        if "gemini" in self.chain:
-            genai.configure(api_key=config.get("gemini_key"))
-            self.clients["gemini"] = genai
-        if "anthropic" in self.chain and AnthropicClient:
-            self.clients["anthropic"] = AnthropicClient(config.get("anthropic_key"))
-        if "mistral" in self.chain and InferenceClient:
-            self.clients["mistral"] = InferenceClient(token=config.get("mistral_key"))
-        if "cohere" in self.chain and cohere:
-            self.clients["cohere"] = cohere.Client(config.get("cohere_key"))
-
-    def generate(self, model: str, prompt: str) -> str:
+        hedging = config.get("hedging") or {}
+        self.hedging_enabled = bool(hedging.get("enabled", False))
+        self.hedge_delay = float(hedging.get("delay_seconds", 1.5))
+        self.hedge_fanout = max(1, int(hedging.get("fanout", 1)))
+        self.stats = ProviderStats()
+        self.cache = LLMCache.from_config(config)
+        self.http = AsyncHTTPPool.shared(config)
+        self.health = HealthRegistry.shared(config)
+        self.limiter = RateLimiter.shared(config)
+        self.inflight = inflight
+        self.tracer = Tracer.shared(config)
+        self.rate_limit_retries = int(
+            (config.get("rate_limits") or {}).get("max_retries_on_429", 3)
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # Clientes são criados sob demanda e compartilhados no processo
+        # (ver `utils.llm_clients.ClientRegistry`); aqui fica só o cache local.
+        self.clients: dict = {}
+
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        agent_name: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
         """
         Tenta cada provedor na ordem do fallback_chain até obter resposta.
+        Consulta o cache antes (exceto com `use_cache=False`) e grava nele
+        a resposta do provedor vencedor.
         """
-        for provider in self.chain:
-            client = self.clients.get(provider)
-            if not client:
-                continue
-            try:
-                if provider == "openai":
-                    resp = client.ChatCompletion.create(
-                        model=model,
-                        messages=[{"role": "user", "content": prompt}],
+        with self.tracer.span(
+            "llm.generate", model=model, agent=agent_name, prompt_chars=len(prompt)
+        ) as span:
+            cache = self.cache if use_cache else None
+            if cache:
+                hit = cache.get(self._configured_providers(), model, prompt)
+                if hit:
+                    span.set(
+                        cache_hit=True, provider=hit[0], response_chars=len(hit[1])
                     )
-                    return resp.choices[0].message.content
-                if provider == "gemini":
-                    resp = client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": prompt}],
+                    return hit[1]
+
+            def fetch():
+                provider, text = self._generate_uncached(model, prompt)
+                span.set(provider=provider)
+                if cache:
+                    cache.put(provider, model, prompt, text, agent_name=agent_name)
+                return text
+
+            text = self.inflight.do(self._flight_key(model, prompt), fetch)
+            span.set(cache_hit=False, response_chars=len(text))
+            return text
+
+    def _flight_key(self, model: str, prompt: str) -> tuple:
+        """
+        Chave do singleflight: só coalesce com routers de mesma cadeia e
+        config (o objeto vive enquanto houver chamada em andamento, então o
+        id não é reaproveitado no meio dela).
+        """
+        return (tuple(self.chain), id(self.config), model, prompt)
+
+    def is_cached(self, model: str, prompt: str, asynchronous: bool = False) -> bool:
+        """
+        Se `generate`/`stream` (ou `agenerate`, com `asynchronous`) vão
+        responder do cache, sem chamar provedor: essas chamadas não gastam
+        o orçamento de tokens.
+        """
+        if not self.cache:
+            return False
+        providers = (
+            self._async_configured_providers()
+            if asynchronous
+            else self._configured_providers()
+        )
+        return self.cache.contains(providers, model, prompt)
+
+    def _generate_uncached(self, model: str, prompt: str) -> tuple:
+        """Retorna (provedor vencedor, resposta). Em modo hedged, delega."""
+        if self.hedging_enabled:
+            return self._generate_hedged(model, prompt)
+
+        errors = []
+        for provider in self._available_providers():
+            try:
+                text = self._timed_call(provider, model, prompt)
+            except Exception as e:
+                errors.append((provider, e))
+                continue
+            self.stats.record_win(provider)
+            return provider, text
+        raise _no_response(errors)
+
+    def stream(
+        self,
+        model: str,
+        prompt: str,
+        agent_name: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Iterator[str]:
+        """
+        Como `generate`, mas produz a resposta em pedaços à medida que chegam.
+
+        O fallback só acontece antes do primeiro pedaço: depois que algo foi
+        entregue ao chamador, uma falha é propagada (não dá para "desfazer"
+        o texto já exibido). Respostas em cache saem num único pedaço.
+        """
+        # gerador: o span não vira o "atual", pois o contexto não pode ser
+        # restaurado entre um yield e outro; é fechado explicitamente
+        span = self.tracer.start_span(
+            "llm.stream", model=model, agent=agent_name, prompt_chars=len(prompt)
+        )
+        error = None
+        try:
+            cache = self.cache if use_cache else None
+            if cache:
+                hit = cache.get(self._configured_providers(), model, prompt)
+                if hit:
+                    span.set(
+                        cache_hit=True, provider=hit[0], response_chars=len(hit[1])
                     )
-                    return resp.choices[0].message.content
-                if provider == "anthropic":
-                    resp = client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": prompt}],
+                    yield hit[1]
+                    return
+
+            errors: list = []
+            for provider in self._available_providers():
+                try:
+                    self._claim(provider)
+                except RuntimeError as e:
+                    errors.append((provider, e))
+                    continue
+                self.limiter.acquire(provider, model, prompt)
+                start = time.perf_counter()
+                parts: list = []
+                try:
+                    for chunk in self._stream_provider(provider, model, prompt):
+                        if chunk:
+                            if not parts:
+                                span.set(
+                                    first_chunk_ms=round(
+                                        (time.perf_counter() - start) * 1000, 3
+                                    )
+                                )
+                            parts.append(chunk)
+                            yield chunk
+                except Exception as e:
+                    self._record(provider, start, error=e)
+                    if parts:
+                        raise
+                    errors.append((provider, e))
+                    continue
+                self._record(provider, start)
+                self.stats.record_win(provider)
+                text = "".join(parts)
+                span.set(
+                    cache_hit=False,
+                    provider=provider,
+                    response_chars=len(text),
+                    failed_providers=len(errors),
+                )
+                if cache:
+                    cache.put(provider, model, prompt, text, agent_name)
+                return
+            raise _no_response(errors)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            span.end(error=error)
+
+    async def agenerate(
+        self,
+        model: str,
+        prompt: str,
+        agent_name: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """
+        Versão assíncrona de `generate`: mesmo fallback, hedging e cache,
+        mas sem bloquear o event loop, permitindo disparar vários prompts
+        em paralelo (ex.: `asyncio.gather`).
+        """
+        with self.tracer.span(
+            "llm.generate", model=model, agent=agent_name, prompt_chars=len(prompt)
+        ) as span:
+            cache = self.cache if use_cache else None
+            if cache:
+                hit = cache.get(self._async_configured_providers(), model, prompt)
+                if hit:
+                    span.set(
+                        cache_hit=True, provider=hit[0], response_chars=len(hit[1])
                     )
-                    return resp.choices[0].message.content
-                if provider == "mistral":
-                    out = client.text_generation(model=model, inputs=prompt)
-                    return out[0].generated_text
-                if provider == "cohere":
-                    out = client.generate(model=model, prompt=prompt)
-                    return out.generations[0].text
-            except Exception:
+                    return hit[1]
+
+            async def fetch():
+                providers = self.health.order(self._async_configured_providers())
+                provider, text = await self._agenerate_uncached(
+                    model, prompt, providers
+                )
+                span.set(provider=provider)
+                if cache:
+                    cache.put(provider, model, prompt, text, agent_name=agent_name)
+                return text
+
+            text = await self.inflight.ado(self._flight_key(model, prompt), fetch)
+            span.set(cache_hit=False, response_chars=len(text))
+            return text
+
+    async def _agenerate_uncached(
+        self, model: str, prompt: str, providers: list
+    ) -> tuple:
+        if self.hedging_enabled:
+            return await self._agenerate_hedged(model, prompt, providers)
+
+        errors = []
+        for provider in providers:
+            try:
+                text = await self._atimed_call(provider, model, prompt)
+            except Exception as e:
+                errors.append((provider, e))
+                continue
+            self.stats.record_win(provider)
+            return provider, text
+        raise _no_response(errors)
+
+    async def aclose(self):
+        """Fecha os pools HTTP assíncronos."""
+        await self.http.aclose()
+
+    def generate_many(
+        self,
+        model: str,
+        prompts: list,
+        agent_name: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> list:
+        """
+        Gera respostas para vários prompts de uma vez (ex.: o mesmo agente
+        sobre todo o portfólio). Retorna, na ordem dos prompts, um dict
+        {"text", "provider", "error"} por item; um item com erro não
+        derruba os demais.
+
+        Prompts repetidos são enviados uma única vez. Os pendentes vão em
+        grupo para o provedor mais saudável, com no máximo
+        `async_http.concurrency[provedor]` chamadas simultâneas; os que
+        falharem seguem, em grupo, para o próximo provedor da cadeia.
+        Nenhum SDK configurado tem endpoint síncrono de chat com vários
+        prompts por requisição (as "Batch APIs" de OpenAI/Anthropic são jobs
+        de até 24h), então não há chamada nativa em lote. Hedging não se
+        aplica aqui: o objetivo é vazão, não latência de cauda.
+        """
+        unique = list(dict.fromkeys(prompts))
+        results: dict = {}
+        last_error: dict = {}
+
+        cache = self.cache if use_cache else None
+        if cache:
+            configured = self._configured_providers()
+            for prompt in unique:
+                hit = cache.get(configured, model, prompt)
+                if hit:
+                    results[prompt] = {
+                        "text": hit[1],
+                        "provider": hit[0],
+                        "error": None,
+                    }
+
+        pending = [p for p in unique if p not in results]
+        for provider in self._available_providers():
+            if not pending:
+                break
+            done, failed = self._run_group(provider, model, pending)
+            for prompt, text in done.items():
+                results[prompt] = {"text": text, "provider": provider, "error": None}
+                self.stats.record_win(provider)
+                if cache:
+                    cache.put(provider, model, prompt, text, agent_name)
+            for prompt, error in failed.items():
+                last_error[prompt] = f"{provider}: {_describe(error)}"
+            pending = [p for p in pending if p in failed]
+
+        for prompt in pending:
+            results[prompt] = {
+                "text": None,
+                "provider": None,
+                "error": last_error.get(prompt, "Nenhum provedor retornou resposta."),
+            }
+        return [dict(results[p]) for p in prompts]
+
+    def _run_group(self, provider: str, model: str, prompts: list) -> tuple:
+        """
+        Envia um grupo de prompts a um provedor com concorrência limitada.
+        Se o circuito do provedor abrir no meio do grupo, os itens restantes
+        falham na hora e seguem para o próximo provedor.
+        """
+        health = self.health.get(provider)
+
+        def call(prompt):
+            if health.state == OPEN:
+                raise RuntimeError("circuito aberto")
+            return self._timed_call(provider, model, prompt)
+
+        done, failed = {}, {}
+        workers = max(1, min(self.http.semaphore_limit(provider), len(prompts)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"llm-batch-{provider}"
+        ) as pool:
+            call = propagate(call)
+            futures = {pool.submit(call, prompt): prompt for prompt in prompts}
+            for future in as_completed(futures):
+                prompt = futures[future]
+                error = future.exception()
+                if error is None:
+                    done[prompt] = future.result()
+                else:
+                    failed[prompt] = error
+        return done, failed
+
+    def provider_stats(self) -> dict:
+        """Contadores de vitórias/latência por provedor (ver `ProviderStats`)."""
+        return self.stats.snapshot()
+
+    def coalescing_stats(self) -> dict:
+        """Chamadas líderes vs. coalescidas em requisições idênticas em voo."""
+        return self.inflight.stats()
+
+    def cache_stats(self) -> dict:
+        """Hits/misses do cache de respostas (vazio se desabilitado)."""
+        return self.cache.stats() if self.cache else {}
+
+    # -----------------------------------------------------------------
+    # Internos
+    # -----------------------------------------------------------------
+    def _configured_providers(self) -> list:
+        return [
+            p
+            for p in self.chain
+            if p in self.clients or client_registry.is_available(p)
+        ]
+
+    def _client(self, provider: str):
+        """Cliente do provedor; na primeira chamada importa o SDK e o constrói."""
+        client = self.clients.get(provider)
+        if client is None:
+            client = client_registry.get(provider, self.config)
+            if client is None:
+                raise RuntimeError(f"SDK do provedor '{provider}' não instalado.")
+            self.clients[provider] = client
+        return client
+
+    def _available_providers(self) -> list:
+        """Provedores configurados, filtrados e ordenados pela saúde."""
+        return self.health.order(self._configured_providers())
+
+    def _record(self, provider: str, start: float, error: Optional[Exception] = None):
+        latency = time.perf_counter() - start
+        ok = error is None
+        self.stats.record_attempt(provider, latency, ok=ok)
+        self.health.record(
+            provider, latency, ok, error=None if error is None else _describe(error)
+        )
+
+    def _claim(self, provider: str):
+        """Reserva o teste half-open do provedor antes de chamá-lo."""
+        if not self.health.claim(provider):
+            raise RuntimeError("circuito em teste (half-open)")
+
+    def _timed_call(self, provider: str, model: str, prompt: str) -> str:
+        """
+        Chamada com limite de taxa: espera na fila do `RateLimiter` antes de
+        enviar e, se o provedor ainda assim responder 429, espera o
+        Retry-After e tenta de novo no mesmo provedor em vez de cair para o
+        próximo da cadeia.
+        """
+        self._claim(provider)
+        attempt = 0
+        while True:  # sai pelo return ou pelo raise
+            with self.tracer.span(
+                "llm.attempt", provider=provider, model=model, retry=attempt
+            ) as span:
+                queued = time.perf_counter()
+                self.limiter.acquire(provider, model, prompt)
+                start = time.perf_counter()
+                span.set(queue_ms=round((start - queued) * 1000, 3))
+                try:
+                    text = self._call_provider(provider, model, prompt)
+                except Exception as e:
+                    if is_rate_limited(e) and attempt < self.rate_limit_retries:
+                        span.set(rate_limited=True)
+                        time.sleep(
+                            self.limiter.penalize(provider, model, retry_after(e))
+                        )
+                        attempt += 1
+                        continue
+                    self._record(provider, start, error=e)
+                    raise
+                self._record(provider, start)
+                span.set(response_chars=len(text or ""))
+                return text
+
+    def _async_configured_providers(self) -> list:
+        return [p for p in self.chain if p == "mock" or self.http.supports(p)]
+
+    async def _acall_provider(self, provider: str, model: str, prompt: str) -> str:
+        if provider == "mock":
+            return await self._client(provider).agenerate(model, prompt)
+        return await self.http.call(
+            provider, model, prompt, api_key=self.config.get(f"{provider}_key")
+        )
+
+    async def _atimed_call(self, provider: str, model: str, prompt: str) -> str:
+        """Equivalente assíncrono de `_timed_call`."""
+        self._claim(provider)
+        attempt = 0
+        while True:  # sai pelo return ou pelo raise
+            with self.tracer.span(
+                "llm.attempt", provider=provider, model=model, retry=attempt
+            ) as span:
+                queued = time.perf_counter()
+                await self.limiter.acquire_async(provider, model, prompt)
+                start = time.perf_counter()
+                span.set(queue_ms=round((start - queued) * 1000, 3))
+                try:
+                    text = await self._acall_provider(provider, model, prompt)
+                except Exception as e:
+                    if is_rate_limited(e) and attempt < self.rate_limit_retries:
+                        span.set(rate_limited=True)
+                        await asyncio.sleep(
+                            self.limiter.penalize(provider, model, retry_after(e))
+                        )
+                        attempt += 1
+                        continue
+                    self._record(provider, start, error=e)
+                    raise
+                self._record(provider, start)
+                span.set(response_chars=len(text or ""))
+                return text
+
+    def _call_provider(self, provider: str, model: str, prompt: str) -> str:
+        """Executa uma única chamada síncrona ao provedor informado."""
+        client = self._client(provider)
+        if provider == "openai":
+            resp = client.ChatCompletion.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return resp.choices[0].message.content
+        if provider == "gemini":
+            resp = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return resp.choices[0].message.content
+        if provider == "anthropic":
+            resp = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return resp.choices[0].message.content
+        if provider == "mistral":
+            out = client.text_generation(model=model, inputs=prompt)
+            return out[0].generated_text
+        if provider == "cohere":
+            out = client.generate(model=model, prompt=prompt)
+            return out.generations[0].text
+        if provider == "mock":
+            return client.generate(model, prompt)
+        raise ValueError(f"Provedor desconhecido: {provider}")
+
+    def _stream_provider(self, provider: str, model: str, prompt: str):
+        """
+        Itera os pedaços de texto de um provedor. Quem não tem streaming
+        no SDK (cohere) devolve a resposta inteira num único pedaço.
+        """
+        client = self._client(provider)
+        messages = [{"role": "user", "content": prompt}]
+        if provider == "openai":
+            for chunk in client.ChatCompletion.create(
+                model=model, messages=messages, stream=True
+            ):
+                yield chunk.choices[0].delta.get("content") or ""
+        elif provider == "gemini":
+            gen_model = client.GenerativeModel(model)
+            for chunk in gen_model.generate_content(prompt, stream=True):
+                yield chunk.text
+        elif provider == "anthropic":
+            with client.messages.stream(
+                model=model, max_tokens=1024, messages=messages
+            ) as events:
+                yield from events.text_stream
+        elif provider == "mistral":
+            yield from client.text_generation(prompt, model=model, stream=True)
+        elif provider == "mock":
+            yield from client.stream(model, prompt)
+        else:
+            yield self._call_provider(provider, model, prompt)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(2, len(self.chain) * 2),
+                    thread_name_prefix="llm-hedge",
+                )
+            return self._executor
+
+    def _generate_hedged(self, model: str, prompt: str) -> tuple:
+        """
+        Dispara os `hedge_fanout` primeiros provedores de imediato e, a cada
+        `hedge_delay` segundos sem resposta (ou a cada falha), dispara o
+        próximo da cadeia. Retorna a primeira resposta válida e cancela as
+        demais; chamadas já em voo não podem ser interrompidas, então o
+        resultado delas é simplesmente descartado.
+        """
+        pending = self._available_providers()
+        if not pending:
+            raise _no_response([])
+
+        executor = self._get_executor()
+        done: queue.Queue = queue.Queue()
+        running = {}
+
+        def launch():
+            provider = pending.pop(0)
+            future = executor.submit(
+                propagate(self._timed_call), provider, model, prompt
+            )
+            future.add_done_callback(lambda f, p=provider: done.put((p, f)))
+            running[provider] = future
+            return time.monotonic()
+
+        errors = []
+        last_launch = 0.0
+        for _ in range(min(self.hedge_fanout, len(pending))):
+            last_launch = launch()
+
+        while running:
+            timeout = None
+            if pending:
+                timeout = max(0.0, last_launch + self.hedge_delay - time.monotonic())
+            try:
+                provider, future = done.get(timeout=timeout)
+            except queue.Empty:
+                last_launch = launch()
                 continue
-        raise RuntimeError("Nenhum provedor retornou resposta.")
+
+            running.pop(provider, None)
+            if future.exception() is None:
+                for other in running.values():
+                    other.cancel()
+                self.stats.record_win(provider)
+                return provider, future.result()
+            errors.append((provider, future.exception()))
+            if pending:
+                last_launch = launch()
+
+        raise _no_response(errors)
+
+    async def _agenerate_hedged(
+        self, model: str, prompt: str, providers: list
+    ) -> tuple:
+        """
+        Equivalente assíncrono de `_generate_hedged`. Aqui as chamadas
+        perdedoras são de fato canceladas (a requisição HTTP é abortada).
+        """
+        pending = list(providers)
+        if not pending:
+            raise _no_response([])
+
+        running: dict = {}
+        errors = []
+        loop = asyncio.get_running_loop()
+
+        def launch():
+            provider = pending.pop(0)
+            task = asyncio.ensure_future(self._atimed_call(provider, model, prompt))
+            running[task] = provider
+            return loop.time()
+
+        last_launch = 0.0
+        for _ in range(min(self.hedge_fanout, len(pending))):
+            last_launch = launch()
+
+        try:
+            while running:
+                timeout = None
+                if pending:
+                    timeout = max(0.0, last_launch + self.hedge_delay - loop.time())
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    last_launch = launch()
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None:
+                        self.stats.record_win(provider)
+                        return provider, task.result()
+                    errors.append((provider, task.exception()))
+                    if pending:
+                        last_launch = launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise _no_response(errors)
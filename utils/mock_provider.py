@@ -0,0 +1,112 @@
+# utils/mock_provider.py
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from typing import Optional
+
+from utils.prompt_fusion import fused_keys
+
+
+class MockProviderError(RuntimeError):
+    pass
+
+
+class MockProvider:
+    """
+    Provedor de LLM local e determinístico, para benchmarks e CI sem rede.
+    Entra no `fallback_chain` como "mock" e é configurado em `mock_provider`:
+
+    - latency_ms: {distribution: fixed|uniform|lognormal, ...}
+    - error_rate: fração de chamadas que falham (0.0 a 1.0)
+    - stream_chunks: em quantos pedaços a resposta é entregue no streaming
+    - seed: a mesma seed + o mesmo prompt geram a mesma sequência de
+      latências, erros e respostas, independentemente da concorrência.
+    - max_tracked_prompts: quantos prompts distintos têm a contagem de
+      chamadas guardada; além disso, os usados há mais tempo recomeçam.
+
+    Prompts fundidos (`utils.prompt_fusion`) recebem o objeto JSON pedido.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        cfg = config or {}
+        self.seed = cfg.get("seed", 0)
+        self.latency = cfg.get("latency_ms") or {"distribution": "fixed", "value": 0}
+        self.error_rate = float(cfg.get("error_rate", 0.0))
+        self.stream_chunks = max(1, int(cfg.get("stream_chunks", 8)))
+        self.max_tracked = max(1, int(cfg.get("max_tracked_prompts", 100_000)))
+        # hash(modelo, prompt) -> chamadas até agora, do menos ao mais recente
+        self._counts: dict = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, model: str, prompt: str) -> random.Random:
+        """RNG derivado de (seed, modelo, prompt, n-ésima chamada com esse prompt)."""
+        key = hashlib.sha256(f"{model}\x1f{prompt}".encode("utf-8")).digest()[:16]
+        with self._lock:
+            n = self._counts.pop(key, 0)
+            self._counts[key] = n + 1
+            if len(self._counts) > self.max_tracked:
+                del self._counts[next(iter(self._counts))]
+        raw = f"{self.seed}\x1f{model}\x1f{prompt}\x1f{n}".encode("utf-8")
+        return random.Random(int.from_bytes(hashlib.sha256(raw).digest()[:8], "big"))
+
+    def _sample_latency(self, rng: random.Random) -> float:
+        dist = self.latency.get("distribution", "fixed")
+        if dist == "uniform":
+            ms = rng.uniform(self.latency.get("min", 0), self.latency.get("max", 0))
+        elif dist == "lognormal":
+            median = self.latency.get("median", 100)
+            ms = rng.lognormvariate(math.log(median), self.latency.get("sigma", 0.5))
+        else:
+            ms = self.latency.get("value", 0)
+        return max(0.0, ms) / 1000.0
+
+    def _plan(self, model: str, prompt: str) -> tuple:
+        """Sorteia (latência, falha?, resposta) de uma chamada."""
+        rng = self._rng(model, prompt)
+        latency = self._sample_latency(rng)
+        fails = rng.random() < self.error_rate
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        text = (
+            f"[mock:{model}] resposta simulada {digest} "
+            f"para um prompt de {len(prompt)} caracteres."
+        )
+        keys = fused_keys(prompt)
+        if keys:
+            text = json.dumps(
+                {
+                    key: f"[mock:{model}] resposta simulada {digest} ({key})."
+                    for key in keys
+                },
+                ensure_ascii=False,
+            )
+        return latency, fails, text
+
+    def generate(self, model: str, prompt: str) -> str:
+        latency, fails, text = self._plan(model, prompt)
+        time.sleep(latency)
+        if fails:
+            raise MockProviderError("falha simulada do provedor mock")
+        return text
+
+    async def agenerate(self, model: str, prompt: str) -> str:
+        latency, fails, text = self._plan(model, prompt)
+        await asyncio.sleep(latency)
+        if fails:
+            raise MockProviderError("falha simulada do provedor mock")
+        return text
+
+    def stream(self, model: str, prompt: str):
+        """Entrega a resposta em `stream_chunks` pedaços ao longo da latência."""
+        latency, fails, text = self._plan(model, prompt)
+        words = text.split(" ")
+        size = math.ceil(len(words) / self.stream_chunks)
+        chunks = [" ".join(words[i : i + size]) for i in range(0, len(words), size)]
+        for i, chunk in enumerate(chunks):
+            time.sleep(latency / len(chunks))
+            if fails and i == len(chunks) // 2:
+                raise MockProviderError("falha simulada no meio do streaming")
+            yield chunk if i == 0 else " " + chunk
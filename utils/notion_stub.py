@@ -0,0 +1,164 @@
+# utils/notion_stub.py
+"""
+Servidor local que imita a criação de páginas da API do Notion
+(`POST /v1/pages`), para testar a sincronização sem rede nem token:
+
+    with NotionStub(rate_limit=3, latency_ms=150) as stub:
+        sync = NotionSync("token", base_url=stub.url)
+
+Como o Notion, aceita em média `rate_limit` requisições por segundo, com
+rajadas de até `burst`; acima disso responde 429 com Retry-After.
+`error_rate` sorteia respostas 503. Também roda avulso:
+`python -m utils.notion_stub --port 8765` (aponte `notion_sync.base_url`
+para ele).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class NotionStub:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate_limit: float = 3.0,
+        burst: Optional[float] = None,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.rate_limit = rate_limit
+        self.burst = burst or 2 * rate_limit
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.pages: dict = {}
+        self.statuses: list = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def start(self) -> "NotionStub":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="notion-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _admit(self) -> tuple:
+        """(status, headers) da próxima requisição: 200, 429 ou 503."""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate_limit:
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate_limit,
+                )
+                self._updated = now
+            if self.rate_limit and self._tokens < 1:
+                retry = (1 - self._tokens) / self.rate_limit
+                status, headers = 429, {"Retry-After": f"{retry:.2f}"}
+            else:
+                self._tokens -= 1
+                if self._random.random() < self.error_rate:
+                    status, headers = 503, {}
+                else:
+                    status, headers = 200, {}
+            self.statuses.append(status)
+            return status, headers
+
+    def _create_page(self, body: dict) -> dict:
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "parent": body.get("parent"),
+            "properties": body.get("properties") or {},
+        }
+        with self._lock:
+            self.pages[page["id"]] = page
+        return page
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(
+                self, status: int, payload: dict, headers: Optional[dict] = None
+            ):
+                raw = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.headers.get("Authorization"):
+                    return self._reply(401, {"code": "unauthorized"})
+                if self.path != "/v1/pages":
+                    return self._reply(404, {"code": "object_not_found"})
+                status, headers = stub._admit()
+                time.sleep(stub.latency)
+                if status == 429:
+                    return self._reply(429, {"code": "rate_limited"}, headers)
+                if status == 503:
+                    return self._reply(503, {"code": "service_unavailable"})
+                if "database_id" not in (body.get("parent") or {}):
+                    return self._reply(400, {"code": "validation_error"})
+                self._reply(200, stub._create_page(body))
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local da API do Notion.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    stub = NotionStub(
+        port=args.port,
+        rate_limit=args.rate_limit,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+    )
+    print(f"Stub do Notion em {stub.url} (Ctrl+C para sair)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
@@ -0,0 +1,195 @@
+# utils/notion_sync.py
+"""
+Cliente de escrita na API do Notion para sincronizar muitas páginas de uma
+vez: um pool de threads limitado, um balde de fichas no ritmo permitido pelo
+Notion (~3 requisições/s em média, seção `notion_sync` da config) e novas
+tentativas com backoff em 429 (respeitando o Retry-After) e erros 5xx/rede.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from utils.rate_limiter import TokenBucket
+from utils.tracing import propagate, span
+
+DEFAULT_BASE_URL = "https://api.notion.com"
+NOTION_VERSION = "2022-06-28"
+
+
+class NotionError(RuntimeError):
+    """Resposta de erro do Notion que não adianta repetir (ex.: 400, 401, 404)."""
+
+
+def _title(text: str) -> dict:
+    return {"title": [{"text": {"content": str(text)[:2000]}}]}
+
+
+def _rich_text(text) -> dict:
+    return {"rich_text": [{"text": {"content": str(text or "")[:2000]}}]}
+
+
+def project_properties(project_data: dict) -> dict:
+    """Propriedades da página do projeto no banco de projetos do Notion."""
+    return {
+        "Nome": _title(project_data.get("name", "")),
+        "Slug": _rich_text(project_data.get("slug")),
+        "Tipo": {"select": {"name": project_data.get("type") or "default"}},
+        "País": {"select": {"name": project_data.get("country") or "Brasil"}},
+    }
+
+
+def task_properties(task: dict, project_page_id: Optional[str] = None) -> dict:
+    """Propriedades de uma tarefa do cronograma no banco de tarefas."""
+    properties = {
+        "Nome": _title(task.get("name", "")),
+        "DoR": _rich_text(task.get("dor")),
+        "DoD": _rich_text(task.get("dod")),
+        "Estimativa": {"number": task.get("estimate", 0)},
+    }
+    if project_page_id:
+        properties["Projeto"] = {"relation": [{"id": project_page_id}]}
+    return properties
+
+
+class NotionSync:
+    """
+    Cria páginas no Notion. Thread-safe: um mesmo objeto pode (e deve) ser
+    usado por todas as threads, para que o limite de taxa valha para todas.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = DEFAULT_BASE_URL,
+        requests_per_second: float = 3.0,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+        timeout_seconds: float = 30.0,
+    ):
+        import httpx  # só quem sincroniza com o Notion precisa do httpx
+
+        self._httpx = httpx
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = int(max_retries)
+        self.backoff_base = float(backoff_base_seconds)
+        self.backoff_max = float(backoff_max_seconds)
+        # sem rajadas: requisições espaçadas de 1/rps, folga para o jitter da rede
+        self.bucket = TokenBucket(requests_per_second * 60, capacity=1)
+        self.client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout_seconds,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Notion-Version": NOTION_VERSION,
+            },
+            limits=httpx.Limits(max_connections=self.max_workers),
+        )
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "NotionSync":
+        cfg = config.get("notion_sync") or {}
+        token = (config.get("api_keys") or {}).get("notion") or config.get(
+            "notion_token"
+        )
+        return cls(
+            token or "",
+            base_url=cfg.get("base_url", DEFAULT_BASE_URL),
+            requests_per_second=float(cfg.get("requests_per_second", 3)),
+            max_workers=cfg.get("max_workers", 4),
+            max_retries=cfg.get("max_retries", 5),
+            backoff_base_seconds=cfg.get("backoff_base_seconds", 0.5),
+            backoff_max_seconds=cfg.get("backoff_max_seconds", 30),
+            timeout_seconds=cfg.get("timeout_seconds", 30),
+        )
+
+    def close(self):
+        self.client.close()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return delay * random.uniform(0.75, 1.25)
+
+    def request(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        """
+        Uma chamada à API, no ritmo do balde. 429 espera o Retry-After (e
+        segura as outras threads pelo mesmo tempo); 5xx e falhas de rede
+        esperam o backoff exponencial. Levanta NotionError nos demais erros
+        ou quando as tentativas acabam.
+        """
+        with span("notion.request", method=method, path=path) as current:
+            for attempt in range(self.max_retries + 1):
+                wait = self.bucket.reserve(1)
+                if wait > 0:
+                    time.sleep(wait)
+                self._count("requests")
+                try:
+                    resp = self.client.request(method, path, json=body)
+                except self._httpx.TransportError as e:
+                    error, delay = f"{type(e).__name__}: {e}", self._backoff(attempt)
+                else:
+                    if resp.status_code < 400:
+                        current.set(attempts=attempt + 1, status=resp.status_code)
+                        return resp.json()
+                    error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                    if resp.status_code == 429:
+                        self._count("rate_limited")
+                        try:
+                            delay = float(resp.headers.get("retry-after", 1))
+                        except ValueError:
+                            delay = 1.0
+                        self.bucket.drain(delay)
+                    elif resp.status_code >= 500:
+                        delay = self._backoff(attempt)
+                    else:
+                        raise NotionError(error)
+                if attempt == self.max_retries:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+            current.set(attempts=self.max_retries + 1)
+            raise NotionError(f"{error} (após {self.max_retries + 1} tentativas)")
+
+    def create_page(self, database_id: str, properties: dict) -> str:
+        """Cria uma página no banco `database_id` e retorna o id dela."""
+        page = self.request(
+            "POST",
+            "/v1/pages",
+            {"parent": {"database_id": database_id}, "properties": properties},
+        )
+        return page["id"]
+
+    def create_pages(self, database_id: str, items: list, on_progress=None) -> list:
+        """
+        Cria várias páginas (uma por dict de propriedades) em paralelo.
+        Retorna, na ordem de `items`, {"page_id", "error"} por página; uma
+        página com erro não impede as demais.
+        """
+
+        def create(properties):
+            try:
+                result = {
+                    "page_id": self.create_page(database_id, properties),
+                    "error": None,
+                }
+            except Exception as e:
+                result = {"page_id": None, "error": str(e)}
+            if on_progress:
+                on_progress(1)
+            return result
+
+        with span("notion.sync", database=database_id, pages=len(items)):
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="notion"
+            ) as pool:
+                return list(pool.map(propagate(create), items))
@@ -0,0 +1,68 @@
+# utils/prompt_fusion.py
+"""
+Fusão de prompts: os prompts de vários agentes sobre o mesmo projeto vão
+numa única requisição, que deve responder um objeto JSON com uma chave por
+agente. `split_fused_response` valida a resposta e a separa de volta; uma
+chave ausente ou inválida fica de fora, para o chamador refazer só aquele
+agente em separado.
+"""
+
+import json
+import re
+
+_KEYS_LINE = "Chaves obrigatórias: "
+_KEYS_RE = re.compile(rf"^{_KEYS_LINE}(\[.*\])$", re.MULTILINE)
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_fused_prompt(prompts: dict) -> str:
+    """Um prompt só a partir de {chave (nome do agente): prompt do agente}."""
+    keys = list(prompts)
+    tasks = "\n\n".join(
+        f'### Tarefa "{key}"\n{prompt.strip()}' for key, prompt in prompts.items()
+    )
+    return (
+        f"Responda a {len(keys)} tarefas independentes sobre o mesmo projeto.\n"
+        "Devolva APENAS um objeto JSON, sem texto fora dele, com uma chave por "
+        "tarefa; o valor de cada chave é a resposta completa da tarefa, em "
+        "texto (Markdown permitido).\n"
+        f"{_KEYS_LINE}{json.dumps(keys, ensure_ascii=False)}\n\n"
+        f"{tasks}\n"
+    )
+
+
+def fused_keys(prompt: str) -> list:
+    """Chaves pedidas por um prompt fundido ([] se não for um)."""
+    match = _KEYS_RE.search(prompt)
+    if not match:
+        return []
+    try:
+        keys = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return []
+    return [k for k in keys if isinstance(k, str)]
+
+
+def split_fused_response(text: str, keys: list) -> dict:
+    """
+    Separa a resposta de um prompt fundido em {chave: texto}, só com as
+    chaves presentes e não vazias. Aceita o JSON cercado de ``` ou de texto.
+    """
+    raw = _FENCE_RE.sub("", (text or "").strip())
+    start, end = raw.find("{"), raw.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(raw[start : end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    parts = {}
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False, indent=2)
+        if isinstance(value, str) and value.strip():
+            parts[key] = value.strip()
+    return parts
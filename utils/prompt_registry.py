@@ -0,0 +1,197 @@
+# utils/prompt_registry.py
+"""
+Registro de templates de prompt versionados (`config/prompts/<agente>.yaml`):
+
+    version: 2
+    defaults: {name: "", country: Brasil}   # valor de campos ausentes
+    trim: [team_capacity]                   # campos que podem ser resumidos
+    template: |
+      Faça uma análise de mercado para o projeto "{name}" no país {country}.
+      {@formato_topicos}
+
+`{campo}` vem dos dados do projeto; `{@secao}` é uma seção compartilhada de
+`_shared.yaml`, embutida no template já na compilação. O texto é usado como
+está, quebras de linha inclusive (`|-` dispensa a última). Mudou o texto?
+Aumente a `version` e diga no arquivo o que mudou. Cada arquivo é lido e
+compilado uma vez por processo; renderizar é só juntar pedaços.
+"""
+
+import glob
+import os
+import string
+import threading
+from typing import Optional
+
+import yaml
+
+from utils.rate_limiter import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_PROMPTS_DIR = "config/prompts"
+SHARED_FILE = "_shared.yaml"
+
+_OMITTED = "- … (+{n} itens omitidos)"
+_CUT = " […]"
+
+
+class PromptError(ValueError):
+    """Template inválido: sintaxe, seção compartilhada inexistente etc."""
+
+
+def format_value(value) -> str:
+    """Campo do projeto como texto: listas e dicts viram linhas "- ..."."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v}" for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return "\n".join(f"- {format_value(item)}" for item in value)
+    return str(value)
+
+
+def shrink(value, limit: int) -> str:
+    """
+    Resume um campo para caber em `limit` caracteres: listas mantêm os
+    primeiros itens e informam quantos ficaram de fora; textos são cortados.
+    """
+    text = format_value(value)
+    if len(text) <= limit:
+        return text
+    if isinstance(value, (list, tuple)):
+        lines: list = []
+        used = 0
+        for item in value:
+            line = f"- {format_value(item)}"
+            marker = _OMITTED.format(n=len(value) - len(lines) - 1)
+            if used + len(line) + len(marker) + 2 > limit:
+                break
+            lines.append(line)
+            used += len(line) + 1
+        lines.append(_OMITTED.format(n=len(value) - len(lines)))
+        return "\n".join(lines)
+    return text[: max(0, limit - len(_CUT))] + _CUT
+
+
+class PromptTemplate:
+    """Template compilado: literais alternados com nomes de campo."""
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        version="1",
+        defaults: Optional[dict] = None,
+        trim: Optional[list] = None,
+        sections: Optional[dict] = None,
+    ):
+        self.name = name
+        self.version = str(version)
+        self.defaults = dict(defaults or {})
+        self.trim = list(trim or [])
+        self._parts = self._compile(text, sections or {})
+        self.fields = tuple(dict.fromkeys(f for _, f in self._parts if f))
+
+    def _compile(self, text: str, sections: dict) -> list:
+        parts: list = []
+        literal = ""
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise PromptError(f"Template '{self.name}' inválido: {e}") from None
+        for prefix, field, _, _ in parsed:
+            literal += prefix
+            if field is None:
+                continue
+            if field.startswith("@"):
+                section = field[1:]
+                if section not in sections:
+                    raise PromptError(
+                        f"Template '{self.name}': seção compartilhada "
+                        f"'{section}' não existe em {SHARED_FILE}"
+                    )
+                literal += sections[section]
+                continue
+            if not field.isidentifier():
+                raise PromptError(f"Template '{self.name}': campo inválido '{field}'")
+            parts.append((literal, field))
+            literal = ""
+        parts.append((literal, None))
+        return parts
+
+    def render(self, data: dict, max_tokens: Optional[int] = None) -> str:
+        """
+        Preenche o template. Com `max_tokens`, se o prompt passar do
+        orçamento, os campos de `trim` são resumidos (os maiores primeiro)
+        até caber, ou até não haver mais o que resumir.
+        """
+        raw = {f: data.get(f, self.defaults.get(f)) for f in self.fields}
+        values = {f: format_value(v) for f, v in raw.items()}
+        prompt = self._join(values)
+        if max_tokens is None or estimate_tokens(prompt) <= max_tokens:
+            return prompt
+        excess = len(prompt) - max_tokens * CHARS_PER_TOKEN
+        for field in sorted(
+            (f for f in self.trim if f in values), key=lambda f: -len(values[f])
+        ):
+            if excess <= 0:
+                break
+            limit = max(0, len(values[field]) - excess)
+            shrunk = shrink(raw[field], limit)
+            excess -= len(values[field]) - len(shrunk)
+            values[field] = shrunk
+        return self._join(values)
+
+    def _join(self, values: dict) -> str:
+        return "".join(
+            literal + (values[field] if field else "") for literal, field in self._parts
+        )
+
+
+class PromptRegistry:
+    """Templates de um diretório, compilados uma vez por processo."""
+
+    _shared: dict = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: str = DEFAULT_PROMPTS_DIR):
+        self.directory = directory
+        self.sections = {}
+        shared_path = os.path.join(directory, SHARED_FILE)
+        if os.path.exists(shared_path):
+            with open(shared_path, "r", encoding="utf-8") as f:
+                sections = (yaml.safe_load(f) or {}).get("sections") or {}
+            self.sections = {k: str(v).strip() for k, v in sections.items()}
+        self.templates = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*.yaml"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name.startswith("_"):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                spec = yaml.safe_load(f) or {}
+            if "template" not in spec:
+                raise PromptError(f"'{path}' não tem a chave 'template'")
+            self.templates[name] = PromptTemplate(
+                name,
+                spec["template"],
+                version=spec.get("version", "1"),
+                defaults=spec.get("defaults"),
+                trim=spec.get("trim"),
+                sections=self.sections,
+            )
+
+    @classmethod
+    def shared(cls, config: dict) -> "PromptRegistry":
+        directory = (config.get("prompts") or {}).get("dir", DEFAULT_PROMPTS_DIR)
+        with cls._shared_lock:
+            registry = cls._shared.get(directory)
+            if registry is None:
+                registry = cls._shared[directory] = cls(directory)
+        return registry
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        return self.templates.get(name)
+
+
+def prompt_budget(config: dict, model: Optional[str]) -> Optional[int]:
+    """Máximo de tokens de prompt para o modelo (`prompts.max_tokens`)."""
+    limits = (config.get("prompts") or {}).get("max_tokens") or {}
+    return limits.get(model, limits.get("default"))
@@ -0,0 +1,284 @@
+# utils/provider_health.py
+import atexit
+import json
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_SNAPSHOT_PATH = ".cache/provider_health.json"
+
+# Um registro de saúde por seção `provider_health` da config, compartilhado
+# pelos LLMRouter do processo (o load-test com o mock tem o seu, sem snapshot)
+_shared_registries: dict = {}
+_shared_lock = threading.Lock()
+
+
+class ProviderHealth:
+    """
+    Janela deslizante de (latência, sucesso) de um provedor e o seu
+    circuit breaker:
+
+    - closed: chamadas normais;
+    - open: provedor pulado até passar `open_seconds`;
+    - half_open: uma única chamada de teste; sucesso fecha, falha reabre.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 50,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        min_samples: int = 10,
+        open_seconds: float = 30.0,
+    ):
+        self.window: deque = deque(maxlen=window_size)
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_started_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+    def _trial_running(self, now: float) -> bool:
+        # Se o teste anterior nunca foi concluído, libera outro após o cooldown
+        return (
+            self.trial_started_at is not None
+            and now - self.trial_started_at < self.open_seconds
+        )
+
+    def available(self, now: float) -> bool:
+        """Diz se o provedor pode ser chamado agora, sem mudar o estado."""
+        if self.state == OPEN:
+            return now - self.opened_at >= self.open_seconds
+        if self.state == HALF_OPEN:
+            return not self._trial_running(now)
+        return True
+
+    def allow(self, now: float) -> bool:
+        """
+        Como `available`, mas para quem vai de fato chamar o provedor:
+        depois do cooldown passa a half_open e consome o único teste.
+        """
+        if self.state == OPEN:
+            if now - self.opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+            self.trial_started_at = None
+        if self.state == HALF_OPEN:
+            if self._trial_running(now):
+                return False
+            self.trial_started_at = now
+        return True
+
+    def record(self, latency: float, ok: bool, now: float, error: Optional[str] = None):
+        self.window.append((latency, ok))
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.trial_started_at = None
+            return
+
+        self.consecutive_failures += 1
+        self.last_error = error
+        if (
+            self.state == HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+            or (
+                len(self.window) >= self.min_samples
+                and self.error_rate() >= self.error_rate_threshold
+            )
+        ):
+            self.state = OPEN
+            self.opened_at = now
+            self.trial_started_at = None
+
+    def restore(self, snapshot: dict, age: float, now: float):
+        """
+        Retoma o estado de um snapshot gravado há `age` segundos: circuito
+        aberto continua aberto pelo que falta do cooldown, e o p50 gravado
+        entra na janela como amostra, para a ordem valer desde a 1ª chamada.
+        """
+        if snapshot.get("p50") is not None:
+            self.window.append((float(snapshot["p50"]), True))
+        self.consecutive_failures = int(snapshot.get("consecutive_failures") or 0)
+        self.last_error = snapshot.get("last_error")
+        if snapshot.get("state") in (OPEN, HALF_OPEN):
+            self.state = OPEN
+            self.opened_at = now - age
+
+    def latencies(self) -> list:
+        return [lat for lat, ok in self.window if ok]
+
+    def p50(self) -> Optional[float]:
+        lats = self.latencies()
+        return statistics.median(lats) if lats else None
+
+    def p95(self) -> Optional[float]:
+        lats = sorted(self.latencies())
+        if not lats:
+            return None
+        return lats[min(len(lats) - 1, int(round(0.95 * (len(lats) - 1))))]
+
+    def error_rate(self) -> float:
+        if not self.window:
+            return 0.0
+        return sum(1 for _, ok in self.window if not ok) / len(self.window)
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "samples": len(self.window),
+            "p50": self.p50(),
+            "p95": self.p95(),
+            "error_rate": self.error_rate(),
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+class HealthRegistry:
+    """
+    Saúde de todos os provedores do processo. Ordena a cadeia de fallback
+    pela latência p50 observada, pula provedores com circuito aberto e
+    grava periodicamente um snapshot em JSON (lido pelo comando
+    `provider-health` da CLI).
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        cfg = (config or {}).get("provider_health") or {}
+        self.reorder = bool(cfg.get("reorder_by_latency", True))
+        self.snapshot_path = cfg.get("snapshot_path", DEFAULT_SNAPSHOT_PATH)
+        self.snapshot_interval = float(cfg.get("snapshot_interval_seconds", 5))
+        self.snapshot_max_age = float(cfg.get("snapshot_max_age_seconds", 300))
+        self._params: dict = {
+            "window_size": int(cfg.get("window_size", 50)),
+            "failure_threshold": int(cfg.get("failure_threshold", 3)),
+            "error_rate_threshold": float(cfg.get("error_rate_threshold", 0.5)),
+            "min_samples": int(cfg.get("min_samples", 10)),
+            "open_seconds": float(cfg.get("open_seconds", 30)),
+        }
+        self._providers: dict = {}
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    @classmethod
+    def shared(cls, config: dict) -> "HealthRegistry":
+        cfg = config.get("provider_health") or {}
+        key = repr(sorted(cfg.items()))
+        with _shared_lock:
+            registry = _shared_registries.get(key)
+            if registry is None:
+                registry = _shared_registries[key] = cls(config)
+                if registry.snapshot_path:
+                    registry.seed(load_snapshot(registry.snapshot_path))
+                    atexit.register(registry.save)
+            return registry
+
+    def seed(self, data: Optional[dict]):
+        """
+        Começa do snapshot de um processo anterior (circuitos abertos e
+        latências), se ele tiver menos de `snapshot_max_age_seconds`.
+        """
+        if not data:
+            return
+        age = max(0.0, time.time() - float(data.get("updated_at") or 0))
+        if age > self.snapshot_max_age:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for provider, snapshot in (data.get("providers") or {}).items():
+                self._get(provider).restore(snapshot, age, now)
+
+    def get(self, provider: str) -> ProviderHealth:
+        with self._lock:
+            return self._get(provider)
+
+    def _get(self, provider: str) -> ProviderHealth:
+        # chamar com self._lock
+        if provider not in self._providers:
+            self._providers[provider] = ProviderHealth(**self._params)
+        return self._providers[provider]
+
+    def order(self, providers: list) -> list:
+        """
+        Retorna os provedores que podem ser chamados agora, os de menor p50
+        primeiro. Provedores ainda sem amostras mantêm a ordem configurada,
+        depois dos já medidos. Se todos estiverem com circuito aberto,
+        devolve a lista original como último recurso. Só consulta: o teste
+        half-open é reservado por `claim`, quando a chamada sai.
+        """
+        now = time.monotonic()
+        with self._lock:
+            allowed = [p for p in providers if self._get(p).available(now)]
+            if not allowed:
+                return list(providers)
+            if not self.reorder:
+                return allowed
+            # sem amostras: infinito, depois dos medidos (sort estável mantém
+            # a ordem configurada entre eles)
+            latency = {}
+            for p in allowed:
+                p50 = self._get(p).p50()
+                latency[p] = math.inf if p50 is None else p50
+            return sorted(allowed, key=latency.__getitem__)
+
+    def claim(self, provider: str) -> bool:
+        """
+        Chamado ao despachar uma chamada ao provedor: reserva o teste
+        half-open. False se outro teste dele já está em andamento; um
+        circuito aberto ainda em cooldown (último recurso de `order`) passa.
+        """
+        with self._lock:
+            health = self._get(provider)
+            return health.allow(time.monotonic()) or health.state == OPEN
+
+    def record(
+        self, provider: str, latency: float, ok: bool, error: Optional[str] = None
+    ):
+        now = time.monotonic()
+        with self._lock:
+            self._get(provider).record(latency, ok, now, error=error)
+            due = now - self._last_save >= self.snapshot_interval
+        if due and self.snapshot_path:
+            self.save()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {p: h.snapshot() for p, h in self._providers.items()}
+
+    def save(self):
+        """Grava o snapshot em JSON de forma atômica (tmp + replace)."""
+        with self._lock:
+            self._last_save = time.monotonic()
+        data = {"updated_at": time.time(), "providers": self.snapshot()}
+        try:
+            directory = os.path.dirname(self.snapshot_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.snapshot_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError:
+            pass  # snapshot é só diagnóstico; nunca deve derrubar uma chamada
+
+
+def load_snapshot(path: str = DEFAULT_SNAPSHOT_PATH) -> Optional[dict]:
+    """Lê o último snapshot gravado, ou None se não existir."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
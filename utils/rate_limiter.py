@@ -0,0 +1,205 @@
+# utils/rate_limiter.py
+import asyncio
+import threading
+import time
+from typing import Optional
+
+# Aproximação usual: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+
+# Um limitador por seção `rate_limits` da config (o load-test com o mock
+# tem o seu, com os limites do mock)
+_shared_limiters: dict = {}
+_shared_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata de tokens a partir do tamanho do texto."""
+    return max(1, len(text or "") // CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Balde de fichas reabastecido continuamente a `per_minute` fichas por
+    minuto. `reserve` desconta as fichas na hora (o saldo pode ficar
+    negativo) e devolve quanto o chamador deve esperar: assim as chamadas
+    formam uma fila em ordem de chegada em vez de competir pelo balde.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def drain(self, seconds: float):
+        """Zera o balde e o mantém vazio por `seconds` (ex.: após um 429)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class RateLimiter:
+    """
+    Limites de requisições (rpm) e tokens (tpm) por (provedor, modelo),
+    lidos de `rate_limits`. Ordem de busca: `rate_limits[provedor][modelo]`,
+    `rate_limits[provedor].default`, `rate_limits.default`. Sem entrada,
+    o par não é limitado.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.limits = (config or {}).get("rate_limits") or {}
+        self.expected_output_tokens = int(
+            self.limits.get("expected_output_tokens", 512)
+        )
+        self._buckets: dict = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, config: dict) -> "RateLimiter":
+        key = repr(sorted((config.get("rate_limits") or {}).items()))
+        with _shared_lock:
+            limiter = _shared_limiters.get(key)
+            if limiter is None:
+                limiter = _shared_limiters[key] = cls(config)
+            return limiter
+
+    def _limits_for(self, provider: str, model: str) -> dict:
+        provider_limits = self.limits.get(provider) or {}
+        return (
+            provider_limits.get(model)
+            or provider_limits.get("default")
+            or self.limits.get("default")
+            or {}
+        )
+
+    def _buckets_for(self, provider: str, model: str) -> tuple:
+        key = (provider, model)
+        with self._lock:
+            if key not in self._buckets:
+                limits = self._limits_for(provider, model)
+                rpm, tpm = limits.get("rpm"), limits.get("tpm")
+                self._buckets[key] = (
+                    TokenBucket(rpm) if rpm else None,
+                    TokenBucket(tpm) if tpm else None,
+                )
+            return self._buckets[key]
+
+    def reserve(self, provider: str, model: str, prompt: str) -> float:
+        """Reserva 1 requisição + tokens estimados; retorna a espera em segundos."""
+        requests, tokens = self._buckets_for(provider, model)
+        wait = 0.0
+        if requests:
+            wait = max(wait, requests.reserve(1))
+        if tokens:
+            amount = estimate_tokens(prompt) + self.expected_output_tokens
+            wait = max(wait, tokens.reserve(amount))
+        return wait
+
+    def acquire(self, provider: str, model: str, prompt: str) -> float:
+        """Bloqueia até haver capacidade. Retorna quanto esperou."""
+        wait = self.reserve(provider, model, prompt)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, provider: str, model: str, prompt: str) -> float:
+        wait = self.reserve(provider, model, prompt)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, provider: str, model: str, seconds: float) -> float:
+        """
+        O provedor respondeu 429: segura novas chamadas por `seconds`,
+        esvaziando os baldes do par. Sem nenhum balde configurado, retorna
+        `seconds` para o chamador esperar ele mesmo (senão, 0).
+        """
+        buckets = [b for b in self._buckets_for(provider, model) if b]
+        for bucket in buckets:
+            bucket.drain(seconds)
+        return 0.0 if buckets else seconds
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Reconhece erros 429 dos SDKs (openai, anthropic, cohere) e do httpx."""
+    response = getattr(error, "response", None)
+    status = (
+        getattr(error, "status_code", None)
+        or getattr(error, "http_status", None)
+        or getattr(response, "status_code", None)
+    )
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def retry_after(error: Exception, default: float = 1.0) -> float:
+    """Segundos indicados no header Retry-After, se houver."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(
+        error, "headers", None
+    )
+    if headers is None:
+        return default
+    try:
+        return float(headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
+class TokenBudgetExceeded(RuntimeError):
+    pass
+
+
+class TokenBudget:
+    """
+    Orçamento de tokens de uma execução (ex.: um workflow inteiro).
+    Antes de cada chamada, `reserve` confere se cabe a estimativa; depois,
+    `settle` acerta a conta com o tamanho real da resposta, ou `release`
+    devolve a reserva se a chamada falhou.
+    """
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def limit_from_config(config: dict) -> Optional[int]:
+        """`token_budget.per_run` da config (None = sem limite)."""
+        return (config.get("token_budget") or {}).get("per_run")
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TokenBudget":
+        return cls(cls.limit_from_config(config))
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.limit is None else self.limit - self.used
+
+    def reserve(self, tokens: int):
+        with self._lock:
+            if self.limit is not None and self.used + tokens > self.limit:
+                raise TokenBudgetExceeded(
+                    f"Orçamento de tokens esgotado ({self.used}/{self.limit}, "
+                    f"chamada precisaria de ~{tokens})."
+                )
+            self.used += tokens
+
+    def settle(self, reserved: int, actual: int):
+        with self._lock:
+            self.used += actual - reserved
+
+    def release(self, reserved: int):
+        with self._lock:
+            self.used -= reserved
@@ -0,0 +1,187 @@
+# utils/rule_compiler.py
+"""
+Compilador das condições do rules.yaml (ex.: "risk_score >= 8",
+"status == 'unlocked'") para predicados vetorizados sobre um DataFrame:
+a expressão é analisada uma única vez (via `ast`, só com os nós
+permitidos, sem `eval`) e vira uma função frame -> array booleano.
+"""
+
+import ast
+import operator
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+_COMPARE = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+}
+
+
+class RuleError(ValueError):
+    """Condição com sintaxe inválida ou construção não permitida."""
+
+
+class CompiledRule:
+    """Predicado compilado: `rule(frame)` -> np.ndarray de bool, um por linha."""
+
+    def __init__(self, expression: str, fn, columns: frozenset):
+        self.expression = expression
+        self.columns = columns
+        self._fn = fn
+
+    def __call__(self, frame: pd.DataFrame) -> np.ndarray:
+        result = self._fn(frame)
+        if np.isscalar(result):
+            return np.full(len(frame), bool(result))
+        return np.asarray(pd.Series(result).fillna(False), dtype=bool)
+
+    def __repr__(self):
+        return f"CompiledRule({self.expression!r})"
+
+
+def _column(name: str):
+    def get(frame):
+        if name in frame:
+            return frame[name]
+        # coluna ausente: valores nulos, e toda comparação com eles é falsa
+        return pd.Series(np.nan, index=frame.index)
+
+    return get
+
+
+def _literal(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [_literal(item) for item in node.elts]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_literal(node.operand)
+    raise RuleError(f"Esperado um valor literal, encontrado: {ast.dump(node)}")
+
+
+def _compile(node, columns: set):
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, columns)
+
+    if isinstance(node, ast.Name):
+        columns.add(node.id)
+        return _column(node.id)
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda frame: value
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(value, columns) for value in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+
+        def boolop(frame):
+            result = _as_mask(parts[0](frame), frame)
+            for part in parts[1:]:
+                result = combine(result, _as_mask(part(frame), frame))
+            return result
+
+        return boolop
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, columns)
+        if isinstance(node.op, ast.Not):
+            return lambda frame: ~_as_mask(operand(frame), frame)
+        if isinstance(node.op, ast.USub):
+            return lambda frame: -operand(frame)
+        raise RuleError(f"Operador não permitido: {type(node.op).__name__}")
+
+    if isinstance(node, ast.BinOp):
+        op = _ARITHMETIC.get(type(node.op))
+        if op is None:
+            raise RuleError(f"Operador não permitido: {type(node.op).__name__}")
+        left, right = _compile(node.left, columns), _compile(node.right, columns)
+        return lambda frame: op(left(frame), right(frame))
+
+    if isinstance(node, ast.Compare):
+        left = _compile(node.left, columns)
+        checks: list = []
+        for op_node, comparator in zip(node.ops, node.comparators):
+            if isinstance(op_node, (ast.In, ast.NotIn)):
+                values = _literal(comparator)
+                if not isinstance(values, list):
+                    raise RuleError(
+                        "'in' exige uma lista literal, ex.: x in ['a', 'b']"
+                    )
+                checks.append((op_node, values))
+            elif type(op_node) in _COMPARE:
+                checks.append((op_node, _compile(comparator, columns)))
+            else:
+                raise RuleError(f"Comparação não permitida: {type(op_node).__name__}")
+
+        def compare(frame):
+            # a < b < c == (a < b) and (b < c), como em Python
+            current = left(frame)
+            result = None
+            for op_node, right in checks:
+                if isinstance(op_node, (ast.In, ast.NotIn)):
+                    mask = _as_series(current, frame).isin(right)
+                    if isinstance(op_node, ast.NotIn):
+                        mask = ~mask
+                    nxt = current
+                else:
+                    nxt = right(frame)
+                    mask = _as_mask(_COMPARE[type(op_node)](current, nxt), frame)
+                result = mask if result is None else result & mask
+                current = nxt
+            return result
+
+        return compare
+
+    raise RuleError(f"Construção não permitida: {type(node).__name__}")
+
+
+def _as_series(value, frame) -> pd.Series:
+    if isinstance(value, pd.Series):
+        return value
+    return pd.Series(value, index=frame.index)
+
+
+def _as_mask(value, frame) -> pd.Series:
+    return _as_series(value, frame).fillna(False).astype(bool)
+
+
+@lru_cache(maxsize=256)
+def compile_condition(expression: str) -> CompiledRule:
+    """Compila (uma vez por expressão) uma condição do rules.yaml."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise RuleError(f"Condição inválida '{expression}': {e.msg}") from None
+    columns: set = set()
+    fn = _compile(tree, columns)
+    return CompiledRule(expression, fn, frozenset(columns))
+
+
+def assign_levels(
+    frame: pd.DataFrame, rules: list, default: Optional[str] = None
+) -> np.ndarray:
+    """
+    Nível de cada linha do frame: o da primeira regra
+    ({"condition", "level"}) que ela satisfaz, ou `default`.
+    """
+    if not rules:
+        return np.full(len(frame), default, dtype=object)
+    masks = [compile_condition(rule["condition"])(frame) for rule in rules]
+    levels = [rule["level"] for rule in rules]
+    fallback = np.asarray(default, dtype=object)  # aceita None
+    return np.select(masks, levels, default=fallback).astype(object)
@@ -0,0 +1,36 @@
+# utils/slug.py
+import re
+import unicodedata
+
+
+def slugify(text: str) -> str:
+    """'Clínica Veterinária São João' -> 'clinica-veterinaria-sao-joao'."""
+    ascii_text = (
+        unicodedata.normalize("NFKD", str(text or ""))
+        .encode("ascii", "ignore")
+        .decode("ascii")
+    )
+    return re.sub(r"[^a-z0-9]+", "-", ascii_text.lower()).strip("-")
+
+
+def legacy_slug(text: str) -> str:
+    """
+    Slug das versões antigas do `new-project`, que mantinha acentos:
+    'Clínica São João' -> 'clínica-são-joão'. Projetos criados assim
+    continuam com esse slug no banco.
+    """
+    return re.sub(r"[^\w-]", "", str(text or "").lower().replace(" ", "-"))
+
+
+def legacy_aliases(slugs) -> dict:
+    """
+    slugify(slug antigo) -> slug antigo, para os slugs existentes que não
+    estão no formato atual: assim 'clinica-sao-joao' acha 'clínica-são-joão'.
+    """
+    slugs = set(slugs)
+    aliases: dict = {}
+    for slug in slugs:
+        current = slugify(slug)
+        if current != slug and current not in slugs:
+            aliases.setdefault(current, slug)
+    return aliases
@@ -0,0 +1,273 @@
+# utils/tracing.py
+"""
+Tracing por spans aninhados (evento -> etapa -> agente -> chamada de LLM ->
+tentativa por provedor, escritas no banco/Notion), gravados em JSONL:
+
+    {"trace_id", "span_id", "parent_id", "name", "start", "duration_ms",
+     "status", "error", "attributes", "thread"}
+
+O span atual vive num `contextvars.ContextVar`: filhos criados na mesma
+thread (ou em tarefas asyncio) se penduram nele sozinhos; para threads de
+um pool, use `propagate(fn)` ao submeter. Com `tracing.otel: true` e o
+pacote `opentelemetry` instalado, cada span também vira um span OTel.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+DEFAULT_TRACE_PATH = ".cache/traces.jsonl"
+
+_current: contextvars.ContextVar = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "tracer",
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start",
+        "_perf",
+        "_otel",
+        "_ended",
+    )
+
+    def __init__(self, tracer, name: str, parent: Optional["Span"], attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id: str = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id: str = os.urandom(8).hex()
+        self.parent_id: Optional[str] = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self._perf = time.perf_counter()
+        self._otel = tracer._otel_start(self, parent)
+        self._ended = False
+
+    def set(self, **attributes):
+        """Acrescenta atributos (ex.: provider, response_chars, cached)."""
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None):
+        if self._ended:
+            return
+        self._ended = True
+        duration = time.perf_counter() - self._perf
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(duration * 1000, 3),
+            "status": "error" if error else "ok",
+            "error": f"{type(error).__name__}: {error}"[:300] if error else None,
+            "attributes": self.attributes,
+            "thread": threading.current_thread().name,
+        }
+        self.tracer._otel_end(self, error)
+        self.tracer._emit(record, root=self.parent_id is None)
+
+
+class _NoopSpan:
+    """Span de quando o tracing está desligado: aceita tudo e não grava nada."""
+
+    def set(self, **attributes):
+        pass
+
+    def end(self, error: Optional[BaseException] = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Grava spans em `tracing.path` (JSONL), em lotes: o buffer é descarregado
+    quando um span raiz termina, a cada `flush_every` spans e na saída do
+    processo.
+    """
+
+    _shared: dict = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str = DEFAULT_TRACE_PATH,
+        enabled: bool = True,
+        otel: bool = False,
+        flush_every: int = 200,
+        max_bytes: int = 50 * 1024 * 1024,
+    ):
+        self.path = path
+        self.enabled = enabled and bool(path)
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self._buffer: list = []
+        self._lock = threading.Lock()
+        self._otel = None
+        self._otel_api: Any = None
+        if self.enabled and otel:
+            try:
+                from opentelemetry import trace as otel_trace
+            except ImportError:
+                otel_trace = None
+            if otel_trace is not None:
+                self._otel_api = otel_trace
+                self._otel = otel_trace.get_tracer("productivity-engine")
+
+    @classmethod
+    def shared(cls, config: dict) -> "Tracer":
+        """
+        Tracer do processo para a seção `tracing` da config. Não mexe no
+        tracer ativo (o dos `span()` do módulo): isso é com `activate`.
+        """
+        cfg = config.get("tracing") or {}
+        key = repr(sorted(cfg.items()))
+        with cls._shared_lock:
+            tracer = cls._shared.get(key)
+            if tracer is None:
+                tracer = cls(
+                    path=cfg.get("path", DEFAULT_TRACE_PATH),
+                    enabled=bool(cfg.get("enabled", False)),
+                    otel=bool(cfg.get("otel", False)),
+                )
+                atexit.register(tracer.flush)
+                cls._shared[key] = tracer
+        return tracer
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes):
+        """
+        Cria um span sem torná-lo o atual (para geradores e callbacks, onde
+        o contexto não pode ser restaurado); feche com `span.end()`.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, parent or _current.get(), attributes)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        """Span atual durante o bloco; uma exceção marca status "error"."""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = Span(self, name, _current.get(), attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(error=e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if not records:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, f"{self.path}.1")
+            except OSError:
+                pass
+            with open(self.path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str))
+                    f.write("\n")
+
+    def _emit(self, record: dict, root: bool):
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.flush_every
+        if root or full:
+            self.flush()
+
+    def _otel_start(self, span: Span, parent: Optional[Span]):
+        if self._otel is None:
+            return None
+        context = None
+        if parent is not None and getattr(parent, "_otel", None) is not None:
+            context = self._otel_api.set_span_in_context(parent._otel)
+        return self._otel.start_span(
+            span.name, context=context, start_time=int(span.start * 1e9)
+        )
+
+    def _otel_end(self, span: Span, error: Optional[BaseException] = None):
+        if span._otel is None:
+            return
+        for key, value in span.attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                span._otel.set_attribute(key, value)
+        if error is not None:
+            span._otel.record_exception(error)
+            span._otel.set_status(
+                self._otel_api.Status(self._otel_api.StatusCode.ERROR)
+            )
+        span._otel.end()
+
+
+_active = Tracer(enabled=False)
+
+
+def activate(config: dict) -> Tracer:
+    """
+    Torna o tracer da config o ativo do processo. Chamado uma vez na
+    inicialização (`get_config` da CLI), não a cada LLMRouter construído.
+    """
+    global _active
+    _active = Tracer.shared(config)
+    return _active
+
+
+def span(name: str, **attributes):
+    """Span no tracer ativo (no-op enquanto nenhuma config o habilitar)."""
+    return _active.span(name, **attributes)
+
+
+def start_span(name: str, **attributes):
+    return _active.start_span(name, **attributes)
+
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+def propagate(fn):
+    """
+    Amarra `fn` ao contexto atual, para que spans criados numa thread de
+    pool fiquem pendurados no span de quem submeteu:
+    `pool.submit(propagate(fn), *args)`.
+    """
+    context = contextvars.copy_context()
+    # uma cópia por chamada: um mesmo Context não pode rodar em duas threads
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def load_spans(path: str = DEFAULT_TRACE_PATH) -> list:
+    """Lê os spans gravados (linhas inválidas são ignoradas)."""
+    spans = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return spans